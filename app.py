@@ -1,18 +1,108 @@
-from fastapi import FastAPI, Request
+import time
+
+# Cold-start time is measured from here, before the serving stack is imported
+APP_IMPORT_STARTED_AT = time.perf_counter()
+
+import argparse
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+
+from fastapi import FastAPI, File, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.responses import HTMLResponse, RedirectResponse
 from uvicorn import run as app_run
 
 from typing import Optional
-from src.constants import APP_HOST, APP_PORT
-from src.pipeline.prediction_pipeline import VehicleData, VehicleDataClassifier
-from src.pipeline.training_pipeline import TrainPipeline
+from src.constants import (APP_HOST, APP_PORT, BULK_SCORING_CHUNK_SIZE, MODEL_WARM_UP_RETRY_SECONDS,
+                           SERVING_ONLY_ENV_KEY)
+from src.entity.config_entity import PreforkServerConfig
+from src.logger import logging
+from src.metrics import metrics
+from src.pipeline.bulk_scoring import BulkScorer
+from src.pipeline.inference_executor import InferenceExecutor
+from src.pipeline.micro_batcher import PredictionMicroBatcher
+from src.pipeline.prefork_server import PreforkServer
+from src.pipeline.prediction_pipeline import VehicleBatchData, VehicleData, VehicleDataClassifier
+
+# Serving-only replicas never import or start anything training related and reject /train
+SERVING_ONLY = os.getenv(SERVING_ONLY_ENV_KEY, "false").lower() == "true"
+
+# CPU-bound inference runs on a thread/process pool so it never blocks the event loop
+inference_executor = InferenceExecutor()
+
+# Concurrent single-row form predictions are coalesced into one vectorized predict call
+micro_batcher = PredictionMicroBatcher(predict_fn=inference_executor.predict)
+
+# Training runs as background jobs in a separate process; created on the first /train call
+training_job_manager = None
+
+# Startup timings and readiness, reported by /ready
+startup_report = {"ready": False, "serving_only": SERVING_ONLY, "model_version": None,
+                  "import_seconds": time.perf_counter() - APP_IMPORT_STARTED_AT, "executor_start_seconds": None,
+                  "model_load_seconds": None, "warm_up_seconds": None, "cold_start_seconds": None, "error": None}
+
+def get_training_job_manager():
+    """  Imports and creates the training job manager on first use, keeping it off the serving startup path.  """
+    global training_job_manager
+    if training_job_manager is None:
+        from src.pipeline.training_jobs import TrainingJobManager
+        training_job_manager = TrainingJobManager()
+    return training_job_manager
+
+async def warm_up_model():
+    """  Preloads and warms the production model, retrying until it succeeds, then marks the app ready.  """
+    while True:
+        try:
+            startup_report.update(await inference_executor.warm_up())
+            startup_report.update(ready=True, error=None, cold_start_seconds=time.perf_counter() - APP_IMPORT_STARTED_AT)
+            logging.info(f"Serving is ready: {startup_report}")
+            return
+        except Exception as e:
+            startup_report["error"] = f"{e}"
+            logging.error(f"Model warm-up failed, retrying in {MODEL_WARM_UP_RETRY_SECONDS}s: {e}")
+            await asyncio.sleep(MODEL_WARM_UP_RETRY_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """  Starts background serving components and the model warm-up on startup and stops them on shutdown.  """
+    executor_started_at = time.perf_counter()
+    inference_executor.start()
+    startup_report["executor_start_seconds"] = time.perf_counter() - executor_started_at
+    await micro_batcher.start()
+    # Warm up in the background so liveness checks pass while /ready still reports the model as cold
+    warm_up_task = asyncio.create_task(warm_up_model())
+    yield
+    warm_up_task.cancel()
+    await micro_batcher.stop()
+    inference_executor.shutdown()
+    if training_job_manager is not None:
+        training_job_manager.shutdown()
 
 # Initialize the FastAPI application.
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """  Counts requests per route and status, errors (5xx or unhandled), and times the whole request.  """
+    # /ready answers 503 by design while the model is cold, which is not an error
+    started_at = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        metrics.observe_stage("request", time.perf_counter() - started_at)
+        metrics.inc("requests_total", route=route_path, method=request.method, status=str(status))
+        if status >= 500 and route_path != "/ready":
+            metrics.inc("request_errors_total", route=route_path)
 
 # Mount the 'static' directory for serving static files (like CSS)
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -73,19 +163,41 @@ class DataForm:
 async def index(request: Request):
     """  Renders the main HTML form page for vehicle data input. """
     return templates.TemplateResponse(
-            "vehicledata.html",{"request": request, "context": "Rendering"})
+            request, "vehicledata.html", {"context": "Rendering"})
 
 # Route to trigger the model training process
 @app.get("/train")
 async def trainRouteClient():
-    """  Endpoint to initiate the model training pipeline. """
+    """
+    Endpoint to initiate the model training pipeline in a background process.
+    Returns the job id right away; triggers while a job is active return that job instead.
+    """
+    if SERVING_ONLY:
+        return JSONResponse(status_code=404, content={"status": False, "error": "Training is disabled on serving-only replicas"})
+
     try:
-        pipeline = TrainPipeline()
-        pipeline.run_pipeline()
-        return Response("Training successful!!!")
+        job, created = get_training_job_manager().submit()
+        return JSONResponse(status_code=202, content={"job_id": job.job_id, "status": job.status,
+                                                      "deduplicated": not created,
+                                                      "status_url": f"/train/{job.job_id}"})
 
     except Exception as e:
-        return Response(f"Error Occurred! {e}")
+        return JSONResponse(status_code=500, content={"status": False, "error": f"{e}"})
+
+# Route to poll the progress of a training job
+@app.get("/train/{job_id}")
+async def trainStatusRouteClient(job_id: str):
+    """  Endpoint to get the status and per-stage progress of a training job. """
+    job = None if training_job_manager is None else training_job_manager.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"status": False, "error": f"Unknown training job {job_id}"})
+    return asdict(job)
+
+# Readiness probe: ready only once the production model is loaded and warmed up
+@app.get("/ready")
+async def readyRouteClient():
+    """  Returns 200 with the startup timings once the model is hot, 503 until then. """
+    return JSONResponse(status_code=200 if startup_report["ready"] else 503, content=startup_report)
 
 # Route to handle form submission and make predictions
 @app.post("/")
@@ -93,7 +205,8 @@ async def predictRouteClient(request: Request):
     """  Endpoint to receive form data, process it, and make a prediction. """
     try:
         form = DataForm(request)
-        await form.get_vehicle_data()
+        with metrics.time_stage("form_parse"):
+            await form.get_vehicle_data()
 
         vehicle_data = VehicleData(
                                 Gender= form.Gender,
@@ -112,23 +225,128 @@ async def predictRouteClient(request: Request):
         # Convert form data into a DataFrame for the model
         vehicle_df = vehicle_data.get_vehicle_input_data_frame()
 
-        # Initialize the prediction pipeline
-        model_predictor = VehicleDataClassifier()
-
-        # Make a prediction and retrieve the result
-        value = model_predictor.predict(dataframe=vehicle_df)[0]
+        # Make a prediction through the micro-batcher and retrieve the result
+        value = (await micro_batcher.predict(vehicle_df))[0]
 
         # Interpret the prediction result as 'Response-Yes' or 'Response-No'
         status = "Response-Yes" if value == 1 else "Response-No"
 
         # Render the same HTML page with the prediction result
         return templates.TemplateResponse(
-            "vehicledata.html",{"request": request, "context": "status"})                   
+            request, "vehicledata.html", {"context": "status"})                   
 
     except Exception as e:
+        metrics.inc("request_errors_total", route="/")
         return {"status": False, "error": f"{e}"}       
 
+# Route to score a batch of records in a single vectorized prediction
+@app.post("/predict/batch")
+async def predictBatchRouteClient(request: Request):
+    """
+    Endpoint to score many rows at once. The JSON body is either a list of records,
+    {"records": [...]} or {"columns": {"Age": [...], ...}} with the model input features.
+    """
+    try:
+        payload = await request.json()
+        if isinstance(payload, dict):
+            payload = payload.get("records", payload.get("columns"))
+
+        batch_data = VehicleBatchData(payload)
+        with metrics.time_stage("dataframe_build"):
+            valid = batch_data.validate()
+        if not valid:
+            return JSONResponse(status_code=422, content={"status": False, "errors": batch_data.errors})
+
+        # One preprocessing + RandomForest call for the whole batch
+        vehicle_df = batch_data.get_vehicle_input_data_frame()
+        predictions = await inference_executor.predict(vehicle_df)
+
+        return {"status": True, "count": len(vehicle_df), "predictions": predictions.astype(int).tolist()}
+
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"status": False, "error": f"{e}"})
+
+# Route to score an uploaded CSV file, streaming predictions back chunk by chunk
+@app.post("/predict/csv")
+async def predictCsvRouteClient(file: UploadFile = File(...), output_format: str = "csv",
+                                chunk_size: int = BULK_SCORING_CHUNK_SIZE):
+    """
+    Endpoint to score a whole CSV file (raw dataset or model input layout). The file is read and
+    scored in chunks of `chunk_size` rows, and the response is streamed as CSV or NDJSON.
+    """
+    try:
+        if output_format not in BulkScorer.OUTPUT_FORMATS or chunk_size < 1:
+            return JSONResponse(status_code=422, content={
+                "status": False, "error": f"output_format must be one of {BulkScorer.OUTPUT_FORMATS} "
+                                          f"and chunk_size must be positive"})
+
+        missing_columns = BulkScorer.check_columns(file.file)
+        if missing_columns:
+            return JSONResponse(status_code=422, content={"status": False, "errors": [f"Missing columns: {missing_columns}"]})
+
+        # The generator is iterated on the threadpool by StreamingResponse, so scoring never blocks the event loop
+        bulk_scorer = BulkScorer(chunk_size=chunk_size)
+        return StreamingResponse(bulk_scorer.stream(file.file, output_format=output_format),
+                                 media_type=BulkScorer.MEDIA_TYPES[output_format])
+
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"status": False, "error": f"{e}"})
+
+# Route to expose serving metrics for Prometheus
+@app.get("/metrics")
+async def metricsRouteClient():
+    """  Returns stage latency histograms/quantiles, request and error counters, model version and batching/cache gauges. """
+    extra_gauges = {f"micro_batcher_{name}": value for name, value in micro_batcher.get_metrics().items()}
+    result_cache = VehicleDataClassifier().get_result_cache()
+    if result_cache is not None:
+        extra_gauges.update({f"prediction_cache_{name}": value for name, value in result_cache.get_metrics().items()})
+    return Response(content=metrics.render_prometheus(extra_gauges=extra_gauges),
+                    media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Route to expose micro-batching statistics
+@app.get("/metrics/batching")
+async def batchingMetricsRouteClient():
+    """  Returns batch size, queue depth and wait time statistics of the prediction micro-batcher. """
+    return micro_batcher.get_metrics()
+
+# Route to expose prediction result cache counters
+@app.get("/metrics/prediction-cache")
+async def predictionCacheMetricsRouteClient():
+    """  Returns hit/miss/eviction counters of the prediction result cache, if it is enabled. """
+    result_cache = VehicleDataClassifier().get_result_cache()
+    return {"enabled": False} if result_cache is None else {"enabled": True, **result_cache.get_metrics()}
+
 
 # Main entry point to start the FastAPI server
 if __name__ == "__main__":
-    app_run(app, host=APP_HOST, port=APP_PORT)                 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Vehicle insurance prediction service")
+    parser.add_argument("--inference-mode", choices=InferenceExecutor.EXECUTION_MODES,
+                        default=inference_executor.inference_executor_config.execution_mode,
+                        help="Run inference on a thread pool or on a process pool with a model per process. "
+                             "Process mode cannot be combined with --workers > 1: every pre-forked worker would "
+                             "start its own pool and load the model again instead of sharing the master's")
+    parser.add_argument("--inference-pool-size", type=int,
+                        default=inference_executor.inference_executor_config.pool_size,
+                        help="Number of inference workers")
+    parser.add_argument("--port", type=int, default=APP_PORT, help="Port to serve on")
+    parser.add_argument("--workers", type=int, default=PreforkServerConfig.workers,
+                        help="Number of pre-forked worker processes sharing one preloaded model (POSIX only)")
+    parser.add_argument("--max-requests", type=int, default=PreforkServerConfig.max_requests,
+                        help="Recycle a pre-forked worker after this many requests (0 disables)")
+    parser.add_argument("--serving-only", action="store_true", default=SERVING_ONLY,
+                        help="Serve predictions only: /train is disabled and the training stack is never imported")
+    args = parser.parse_args()
+
+    if args.workers > 1 and args.inference_mode == "process":
+        parser.error("--inference-mode process (or INFERENCE_EXECUTION_MODE=process) cannot be combined with "
+                     "--workers > 1; pre-forked workers share the master's model through thread mode")
+
+    SERVING_ONLY = startup_report["serving_only"] = args.serving_only
+
+    inference_executor.inference_executor_config.execution_mode = args.inference_mode
+    inference_executor.inference_executor_config.pool_size = args.inference_pool_size
+    if args.workers > 1:
+        PreforkServer(app, PreforkServerConfig(port=args.port, workers=args.workers,
+                                                max_requests=args.max_requests)).run()
+    else:
+        app_run(app, host=APP_HOST, port=args.port)                 
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+Write/read time and file size of the ingestion artifacts as CSV (previous format) vs Parquet
+(save_dataframe / load_dataframe), on a synthetic vehicle frame typed as DataIngestion stores it.
+
+Usage:
+    python -m benchmarks.feature_store_formats [--rows 1000000] [--repeats 3] [--output-dir /tmp/fs-bench]
+
+Reads are timed per pipeline stage access pattern: `full` (all columns), `projected` (all but
+`_id`, as DataTransformation / ModelEvaluation read) and `columns` (names only, as DataValidation
+reads). `dtype changes` counts columns that do not come back with the dtype they were written with.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.mongo_export_memory import SyntheticCollection
+from src.utils.main_utils import load_dataframe, read_dataframe_columns, save_dataframe
+
+
+def best_seconds(function, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output-dir", help="Defaults to a temporary directory that is removed afterwards")
+    args = parser.parse_args()
+
+    from src.data_access.vehicle_data import VehicleData
+
+    # Same frame the pipeline stores: streaming export of vehicle documents in the schema's dtypes
+    vehicle_data = VehicleData.__new__(VehicleData)
+    vehicle_data.mongoclient = type("Client", (), {"database": {"vehicles": SyntheticCollection(args.rows)}})()
+    vehicle_data.export_report = None
+    df = vehicle_data.export_collection_as_dataframe("vehicles", parallelism=1)
+    projection = [column for column in df.columns if column != "_id"]
+
+    output_dir = args.output_dir or tempfile.mkdtemp(prefix="feature-store-bench-")
+    os.makedirs(output_dir, exist_ok=True)
+    try:
+        print(f"{args.rows} rows, best of {args.repeats}")
+        print(f"{'format':>8} {'size MB':>8} {'write s':>8} {'full s':>8} {'projected s':>12} {'columns s':>10} "
+              f"{'dtype changes':>14}")
+        for file_format in ("csv", "parquet"):
+            file_path = os.path.join(output_dir, f"train.{file_format}")
+            write_seconds = best_seconds(lambda: save_dataframe(file_path, df), args.repeats)
+            full_seconds = best_seconds(lambda: load_dataframe(file_path), args.repeats)
+            projected_seconds = best_seconds(lambda: load_dataframe(file_path, columns=projection), args.repeats)
+            columns_seconds = best_seconds(lambda: read_dataframe_columns(file_path), args.repeats)
+            read_back = load_dataframe(file_path)
+            dtype_changes = sum(read_back[column].dtype != df[column].dtype for column in df.columns)
+            print(f"{file_format:>8} {os.path.getsize(file_path) / 2**20:>8.1f} {write_seconds:>8.3f} "
+                  f"{full_seconds:>8.3f} {projected_seconds:>12.3f} {columns_seconds:>10.4f} {dtype_changes:>14}")
+    finally:
+        if not args.output_dir:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
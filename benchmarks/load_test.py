@@ -0,0 +1,289 @@
+"""
+Load test of the FastAPI service against a local S3 stand-in.
+
+Usage:
+    python -m benchmarks.load_test --model <trained model.pkl> [--routes form batch] [--concurrency 1 8 32]
+        [--duration 10] [--batch-size 100] [--app-args "--workers 4"] [--output results.json]
+        [--baseline previous_results.json --max-regression 0.1]
+
+A moto S3 server is started on localhost and `--model` is uploaded to the model bucket (exported to the
+memory-mappable format first with `--artifact-format mmap`). app.py then runs in serving-only mode with
+AWS_ENDPOINT_URL pointing at moto, and the test waits for /ready. For every route and concurrency level,
+`concurrency` clients send requests back to back for `--warm-up` seconds (not recorded) and then for
+`--duration` seconds. Throughput and p50/p95/p99 latency are printed and written as JSON together with
+the git commit, so runs of different commits can be compared.
+
+With `--baseline`, every scenario is compared against the same scenario of an earlier results file and
+the exit code is 1 if its throughput dropped or its p99 latency grew by more than `--max-regression`.
+
+Needs the development dependencies (moto[server], httpx): pip install -r requirements-dev.txt.
+
+Routes: `form` posts one record to the HTML form route "/", `batch` posts `--batch-size` records to
+/predict/batch. Records are random but valid model inputs, generated from `--seed`.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import shlex
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROUTES = ("form", "batch")
+READY_TIMEOUT_SECONDS = 180.0
+
+
+def get_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_git_revision() -> dict:
+    def git(*args: str) -> str:
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+    return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def generate_records(count: int, rng: np.random.Generator) -> list:
+    """  Random records in the model input layout (the same fields as the HTML form).  """
+    vehicle_age = rng.integers(0, 3, count)  # 0: < 1 Year, 1: 1-2 Year, 2: > 2 Years
+    columns = {
+        "Gender": rng.integers(0, 2, count),
+        "Age": rng.integers(20, 86, count),
+        "Driving_License": rng.integers(0, 2, count),
+        "Region_Code": rng.integers(0, 53, count).astype(float),
+        "Previously_Insured": rng.integers(0, 2, count),
+        "Annual_Premium": rng.integers(2630, 100000, count).astype(float),
+        "Policy_Sales_Channel": rng.integers(1, 164, count).astype(float),
+        "Vintage": rng.integers(10, 300, count),
+        "Vehicle_Age_lt_1_Year": (vehicle_age == 0).astype(int),
+        "Vehicle_Age_gt_2_Years": (vehicle_age == 2).astype(int),
+        "Vehicle_Damage_Yes": rng.integers(0, 2, count),
+    }
+    return [{name: values[i].item() for name, values in columns.items()} for i in range(count)]
+
+
+def seed_s3(endpoint_url: str, model_path: str, artifact_format: str) -> str:
+    """  Creates the model bucket in the S3 stand-in and uploads the model; returns the uploaded key.  """
+    import boto3
+    from src.constants import MODEL_BUCKET_NAME, MODEL_FILE_NAME, MODEL_MMAP_FILE_NAME, REGION_NAME
+
+    s3_client = boto3.client("s3", endpoint_url=endpoint_url, region_name=REGION_NAME,
+                             aws_access_key_id="testing", aws_secret_access_key="testing")
+    s3_client.create_bucket(Bucket=MODEL_BUCKET_NAME)
+    if artifact_format == "mmap":
+        from src.utils.main_utils import load_object
+        mmap_path = os.path.join(tempfile.mkdtemp(prefix="load-test-"), MODEL_MMAP_FILE_NAME)
+        load_object(model_path).save_mmap(mmap_path)
+        s3_client.upload_file(mmap_path, MODEL_BUCKET_NAME, MODEL_MMAP_FILE_NAME)
+        return MODEL_MMAP_FILE_NAME
+    s3_client.upload_file(model_path, MODEL_BUCKET_NAME, MODEL_FILE_NAME)
+    return MODEL_FILE_NAME
+
+
+def start_app(port: int, endpoint_url: str, artifact_format: str, app_args: str, log_file) -> subprocess.Popen:
+    from src.constants import (AWS_ACCESS_KEY_ID_ENV_KEY, AWS_SECRET_ACCESS_KEY_ENV_KEY,
+                               MODEL_ARTIFACT_FORMAT_ENV_KEY, SERVING_ONLY_ENV_KEY)
+
+    env = dict(os.environ, AWS_ENDPOINT_URL=endpoint_url, **{AWS_ACCESS_KEY_ID_ENV_KEY: "testing",
+               AWS_SECRET_ACCESS_KEY_ENV_KEY: "testing", SERVING_ONLY_ENV_KEY: "true",
+               MODEL_ARTIFACT_FORMAT_ENV_KEY: artifact_format})
+    command = [sys.executable, "app.py", "--port", str(port), *shlex.split(app_args)]
+    return subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+
+
+def wait_until_ready(base_url: str, app_process: subprocess.Popen) -> dict:
+    import httpx
+
+    deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if app_process.poll() is not None:
+            raise RuntimeError(f"app.py exited with status {app_process.returncode} before it was ready")
+        try:
+            response = httpx.get(f"{base_url}/ready", timeout=2.0)
+            if response.status_code == 200:
+                return response.json()
+        except httpx.TransportError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"app.py was not ready after {READY_TIMEOUT_SECONDS}s")
+
+
+def build_request(route: str, records: list, batch_size: int, index: int) -> dict:
+    if route == "form":
+        record = records[index % len(records)]
+        return {"method": "POST", "url": "/", "data": {name: str(value) for name, value in record.items()}}
+    start = (index * batch_size) % len(records)
+    return {"method": "POST", "url": "/predict/batch", "json": {"records": (records + records)[start:start + batch_size]}}
+
+
+def is_success(route: str, response) -> bool:
+    # The form route answers 200 with {"status": false} when the prediction fails
+    if response.status_code >= 400:
+        return False
+    return route != "form" or not response.headers.get("content-type", "").startswith("application/json") \
+        or response.json().get("status", True) is not False
+
+
+async def run_scenario(base_url: str, route: str, concurrency: int, records: list, batch_size: int,
+                       warm_up: float, duration: float) -> dict:
+    """  Keeps `concurrency` clients busy on one route and records the latency of every request.  """
+    import httpx
+
+    latencies, errors, statuses = [], 0, {}
+    counter = iter(range(sys.maxsize))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        async def client_loop(record_from: float, stop_at: float) -> None:
+            nonlocal errors
+            while time.perf_counter() < stop_at:
+                request = build_request(route, records, batch_size, next(counter))
+                started_at = time.perf_counter()
+                try:
+                    response = await client.request(**request)
+                    status, ok = str(response.status_code), is_success(route, response)
+                except httpx.HTTPError as e:
+                    status, ok = type(e).__name__, False
+                if started_at >= record_from:
+                    latencies.append(time.perf_counter() - started_at)
+                    statuses[status] = statuses.get(status, 0) + 1
+                    errors += not ok
+
+        record_from = time.perf_counter() + warm_up
+        stop_at = record_from + duration
+        await asyncio.gather(*(client_loop(record_from, stop_at) for _ in range(concurrency)))
+        # Requests that started before the deadline finish after it; throughput uses the real elapsed time
+        elapsed = time.perf_counter() - record_from
+
+    latencies_ms = np.array(latencies) * 1000
+    rows_per_request = 1 if route == "form" else batch_size
+    return {
+        "name": f"{route}-c{concurrency}" + (f"-b{batch_size}" if route == "batch" else ""),
+        "route": route, "concurrency": concurrency, "rows_per_request": rows_per_request,
+        "requests": len(latencies), "errors": errors, "status_counts": statuses,
+        "duration_seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed,
+        "rows_per_second": len(latencies) * rows_per_request / elapsed,
+        "latency_ms": {"mean": float(latencies_ms.mean()) if len(latencies) else None,
+                       **{name: float(np.percentile(latencies_ms, q)) if len(latencies) else None
+                          for name, q in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))}},
+    }
+
+
+def compare_with_baseline(results: dict, baseline: dict, max_regression: float) -> list:
+    """  Prints throughput/p99 changes per scenario and returns the names of the regressed scenarios.  """
+    baseline_scenarios = {scenario["name"]: scenario for scenario in baseline["scenarios"]}
+    regressions = []
+    print(f"\nbaseline commit {(baseline.get('git') or {}).get('commit')}, max regression {max_regression:.0%}")
+    print(f"{'scenario':>22} {'rps':>10} {'change':>8} {'p99 ms':>10} {'change':>8}")
+    for scenario in results["scenarios"]:
+        previous = baseline_scenarios.get(scenario["name"])
+        if previous is None or not previous["requests"] or not scenario["requests"]:
+            continue
+        rps_change = scenario["throughput_rps"] / previous["throughput_rps"] - 1
+        p99_change = scenario["latency_ms"]["p99"] / previous["latency_ms"]["p99"] - 1
+        regressed = rps_change < -max_regression or p99_change > max_regression
+        if regressed:
+            regressions.append(scenario["name"])
+        print(f"{scenario['name']:>22} {scenario['throughput_rps']:>10.1f} {rps_change:>+8.1%} "
+              f"{scenario['latency_ms']['p99']:>10.2f} {p99_change:>+8.1%}" + ("  REGRESSION" if regressed else ""))
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", required=True, help="Path to the trained MyModel pickle")
+    parser.add_argument("--artifact-format", choices=("dill", "mmap"), default="dill")
+    parser.add_argument("--routes", nargs="+", choices=ROUTES, default=list(ROUTES))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="Recorded seconds per scenario")
+    parser.add_argument("--warm-up", type=float, default=2.0, help="Unrecorded seconds before each scenario")
+    parser.add_argument("--batch-size", type=int, default=100, help="Records per /predict/batch request")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--app-args", default="", help='Extra app.py arguments, e.g. "--workers 4"')
+    parser.add_argument("--output", help="Results JSON path (default: load_test_<commit>.json)")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.1)
+    args = parser.parse_args()
+
+    try:
+        import httpx  # noqa: F401  (the clients and the readiness probe import it lazily)
+        from moto.server import ThreadedMotoServer
+    except ImportError as e:
+        sys.exit(f"The load test needs the development dependencies ({e.name} is not installed): "
+                 f"pip install -r requirements-dev.txt")
+
+    git_revision = get_git_revision()
+    records = generate_records(max(1000, 2 * args.batch_size), np.random.default_rng(args.seed))
+    s3_port, app_port = get_free_port(), get_free_port()
+    endpoint_url, base_url = f"http://127.0.0.1:{s3_port}", f"http://127.0.0.1:{app_port}"
+
+    # The stand-in logs every S3 request otherwise
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    s3_server = ThreadedMotoServer(ip_address="127.0.0.1", port=s3_port, verbose=False)
+    s3_server.start()
+    app_log = tempfile.NamedTemporaryFile(prefix="load-test-app-", suffix=".log", delete=False)
+    app_process = None
+    try:
+        model_key = seed_s3(endpoint_url, args.model, args.artifact_format)
+        app_process = start_app(app_port, endpoint_url, args.artifact_format, args.app_args, app_log)
+        startup = wait_until_ready(base_url, app_process)
+        print(f"app ready on {base_url} (model {model_key}, version {startup.get('model_version')}, "
+              f"cold start {startup.get('cold_start_seconds') or 0:.2f}s), app log: {app_log.name}")
+
+        print(f"{'scenario':>22} {'requests':>9} {'errors':>7} {'rps':>10} {'rows/s':>10} "
+              f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        scenarios = []
+        for route in args.routes:
+            for concurrency in args.concurrency:
+                scenario = asyncio.run(run_scenario(base_url, route, concurrency, records, args.batch_size,
+                                                    args.warm_up, args.duration))
+                scenarios.append(scenario)
+                latency = scenario["latency_ms"]
+                print(f"{scenario['name']:>22} {scenario['requests']:>9} {scenario['errors']:>7} "
+                      f"{scenario['throughput_rps']:>10.1f} {scenario['rows_per_second']:>10.1f} "
+                      f"{latency['p50'] or 0:>9.2f} {latency['p95'] or 0:>9.2f} {latency['p99'] or 0:>9.2f}")
+    finally:
+        if app_process is not None:
+            app_process.terminate()
+            try:
+                app_process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                app_process.kill()
+        s3_server.stop()
+        app_log.close()
+
+    results = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git": git_revision,
+        "host": {"python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count()},
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "startup": startup,
+        "scenarios": scenarios,
+    }
+    output_path = args.output or f"load_test_{(git_revision['commit'] or 'unknown')[:12]}.json"
+    with open(output_path, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+    print(f"results written to {output_path}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare_with_baseline(results, json.load(baseline_file), args.max_regression)
+        if regressions:
+            print(f"regressed scenarios: {regressions}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Load time and per-worker memory benchmark: dill-pickled MyModel vs the memory-mappable artifact.
+
+Usage:
+    python -m benchmarks.model_artifact_memory --model <trained model.pkl> [--workers 4]
+
+`--model` is the MyModel written by ModelTrainer; it is exported next to itself with MyModel.save_mmap.
+For each format, `--workers` spawned processes load the model, run one prediction (so every page of
+the model is touched) and then, while all of them still hold the model, read their memory from
+/proc/self/smaps_rollup (Linux only). Memory is reported relative to the process before loading:
+RSS counts shared pages in every worker, PSS splits them between the workers sharing them and USS
+is memory private to the worker. The sum of PSS is what the workers really cost together.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+SMAPS_FIELDS = {"Rss": "rss", "Pss": "pss", "Private_Clean": "uss", "Private_Dirty": "uss"}
+
+
+def read_memory_mb() -> dict:
+    memory = {"rss": 0.0, "pss": 0.0, "uss": 0.0}
+    with open("/proc/self/smaps_rollup") as smaps:
+        for line in smaps:
+            field, _, value = line.partition(":")
+            if field in SMAPS_FIELDS:
+                memory[SMAPS_FIELDS[field]] += int(value.split()[0]) / 1024
+    return memory
+
+
+def load_and_measure(model_format: str, model_path: str, barrier, results) -> None:
+    from src.entity.estimator import MyModel
+    from src.utils.main_utils import load_object
+
+    features = np.zeros((1, 11))
+    before = read_memory_mb()
+    start = time.perf_counter()
+    model = MyModel.load_mmap(model_path) if model_format == "mmap" else load_object(model_path)
+    load_ms = (time.perf_counter() - start) * 1000
+    model.predict_array(features)
+    # Touch every node array page, as a long-running worker eventually does
+    for array in model.compiled_model_object.get_arrays()[0].values():
+        array.sum()
+
+    barrier.wait()
+    after = read_memory_mb()
+    results.put({"load_ms": load_ms, **{key: after[key] - before[key] for key in after}})
+    barrier.wait()
+
+
+def run_format(model_format: str, model_path: str, workers: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    barrier, results = context.Barrier(workers), context.Queue()
+    processes = [context.Process(target=load_and_measure, args=(model_format, model_path, barrier, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    measurements = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {key: [measurement[key] for measurement in measurements] for key in measurements[0]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", required=True, help="Path to the trained MyModel pickle")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    from src.constants import MODEL_MMAP_FILE_EXTENSION
+    from src.utils.main_utils import load_object
+
+    mmap_path = os.path.splitext(args.model)[0] + MODEL_MMAP_FILE_EXTENSION
+    load_object(args.model).save_mmap(mmap_path)
+    print(f"dill: {os.path.getsize(args.model) / 2**20:.1f} MB, mmap: {os.path.getsize(mmap_path) / 2**20:.1f} MB, "
+          f"workers={args.workers}")
+
+    print(f"{'format':>6} {'load ms':>9} {'RSS MB':>8} {'PSS MB':>8} {'USS MB':>8} {'total PSS MB':>13}")
+    for model_format, model_path in (("dill", args.model), ("mmap", mmap_path)):
+        result = run_format(model_format, model_path, args.workers)
+        print(f"{model_format:>6} {np.median(result['load_ms']):>9.1f} {np.mean(result['rss']):>8.1f} "
+              f"{np.mean(result['pss']):>8.1f} {np.mean(result['uss']):>8.1f} {np.sum(result['pss']):>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Peak memory and throughput of the MongoDB export: `pd.DataFrame(list(collection.find()))` (previous
+implementation) vs the streaming export into typed column buffers (VehicleData.export_collection_as_dataframe).
+
+Usage:
+    python -m benchmarks.mongo_export_memory [--rows 1000000] [--batch-size 10000] [--parallelism 4]
+    python -m benchmarks.mongo_export_memory --mongodb-url <url> [--collection Vehicle-Data]
+
+Without `--mongodb-url`, documents are generated on the fly by an in-process cursor shaped like the
+vehicle collection, so only client-side memory is measured. Peak memory is the tracemalloc peak
+during the export, i.e. Python allocations made by the export itself.
+"""
+import argparse
+import operator
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from bson import ObjectId
+
+from src.constants import DATA_INGESTION_COLLECTION_NAME, DATA_INGESTION_EXPORT_PARALLELISM, DATABASE_NAME
+
+
+# Query operators SyntheticCollection evaluates (enough for the export's _id ranges and filters)
+OPERATORS = {"$gte": operator.ge, "$gt": operator.gt, "$lte": operator.le, "$lt": operator.lt,
+             "$in": lambda value, operand: value in operand}
+
+
+def matches(document: dict, filter: dict) -> bool:
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(matches(document, sub_filter) for sub_filter in condition):
+                return False
+        elif isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op not in OPERATORS:
+                    raise NotImplementedError(f"SyntheticCollection does not support {op}")
+                if document.get(key) is None or not OPERATORS[op](document[key], operand):
+                    return False
+        elif document.get(key) != condition:
+            return False
+    return True
+
+
+class SyntheticCollection:
+    """
+    Yields vehicle documents lazily, as a pymongo cursor would. Document i is a pure function of i
+    (with `_id` ObjectId i), so `_id` ranges, `$sample`, `count_documents` and the export pipeline
+    behave like the real collection and the partitioned export can be measured.
+    """
+
+    def __init__(self, rows: int, seed: int = 0):
+        self.rows = rows
+        self.seed = seed
+
+    def estimated_document_count(self) -> int:
+        return self.rows
+
+    def count_documents(self, filter: dict) -> int:
+        return sum(1 for _ in self.find(filter, projection={"_id": 1}))
+
+    def _get_index_range(self, filter: dict) -> range:
+        """  Rows that can match the `_id` bounds of `filter`, so a range scan skips the others.  """
+        conditions = [filter] + list(filter.get("$and", []))
+        start, stop = 0, self.rows
+        for condition in (c["_id"] for c in conditions if isinstance(c.get("_id"), dict)):
+            if isinstance(condition.get("$gte"), ObjectId):
+                start = max(start, int(str(condition["$gte"]), 16))
+            if isinstance(condition.get("$lt"), ObjectId):
+                stop = min(stop, int(str(condition["$lt"]), 16))
+        return range(start, stop)
+
+    def make_document(self, i: int) -> dict:
+        return {
+            "_id": ObjectId(f"{i:024x}"), "id": i + 1, "Gender": ("Male", "Female")[i % 2],
+            "Age": 20 + (i * 7919 + self.seed) % 65, "Driving_License": 1, "Region_Code": float(i % 52),
+            "Previously_Insured": i % 2, "Vehicle_Age": ("< 1 Year", "1-2 Year", "> 2 Years")[i % 3],
+            "Vehicle_Damage": ("Yes", "No")[i % 2],
+            "Annual_Premium": "na" if i % 1000 == 0 else float(2630 + (i * 104729 + self.seed) % 97370),
+            "Policy_Sales_Channel": float(i % 163), "Vintage": i % 290 + 10, "Response": i % 2,
+        }
+
+    def find(self, filter=None, projection=None, batch_size: int = 0):
+        for i in self._get_index_range(filter or {}):
+            document = self.make_document(i)
+            if filter and not matches(document, filter):
+                continue
+            if projection:
+                document = {key: value for key, value in document.items() if key == "_id" or key in projection}
+            yield document
+
+    def aggregate(self, pipeline: list, batchSize: int = 0):
+        """  Evaluates the stages the export sends: $match, $sample and $project (inclusion or the export's $cond).  """
+        documents = None
+        for stage in pipeline:
+            (name, spec), = stage.items()
+            if name == "$match" and documents is None:
+                # A leading $match uses the _id "index" like the server would
+                documents = self.find(spec)
+                continue
+            documents = self.find() if documents is None else documents
+            if name == "$match":
+                documents = (document for document in documents if matches(document, spec))
+            elif name == "$sample":
+                documents = self._sample(documents, spec["size"])
+            elif name == "$project":
+                documents = self._project(documents, spec)
+            else:
+                raise NotImplementedError(f"SyntheticCollection does not support {name}")
+        return self.find() if documents is None else documents
+
+    def _sample(self, documents, size: int) -> list:
+        # Reservoir sampling, so only `size` documents are held
+        rng = np.random.default_rng(self.seed)
+        sample = []
+        for i, document in enumerate(documents):
+            if i < size:
+                sample.append(document)
+            elif (j := rng.integers(0, i + 1)) < size:
+                sample[j] = document
+        return sample
+
+    @staticmethod
+    def _project(documents, projection: dict):
+        for document in documents:
+            projected = {"_id": document["_id"]}
+            for field, expression in projection.items():
+                if expression == 1:
+                    if field in document:
+                        projected[field] = document[field]
+                elif isinstance(expression, dict) and "$cond" in expression:
+                    # {field: {"$cond": [{"$eq": ["$<column>", "na"]}, None, "$<column>"]}}
+                    value = document.get(expression["$cond"][2][1:])
+                    projected[field] = None if value == expression["$cond"][0]["$eq"][1] else value
+                else:
+                    raise NotImplementedError(f"SyntheticCollection does not support the projection of {field}")
+            yield projected
+
+
+def export_previous(collection) -> pd.DataFrame:
+    df = pd.DataFrame(list(collection.find()))
+    if "id" in df.columns.to_list():
+        df = df.drop(columns=["id"])
+    df.replace({"na": np.nan}, inplace=True)
+    return df
+
+
+def measure(export) -> dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    df = export()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"rows": len(df), "rows_per_second": len(df) / seconds, "peak_mb": peak / 2**20,
+            "dataframe_mb": df.memory_usage(deep=True).sum() / 2**20}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Synthetic documents (without --mongodb-url)")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--parallelism", type=int, default=DATA_INGESTION_EXPORT_PARALLELISM,
+                        help="_id ranges read concurrently by the streaming export")
+    parser.add_argument("--mongodb-url")
+    parser.add_argument("--collection", default=DATA_INGESTION_COLLECTION_NAME)
+    args = parser.parse_args()
+
+    from src.data_access.vehicle_data import VehicleData
+
+    if args.mongodb_url:
+        import pymongo
+        collection = pymongo.MongoClient(args.mongodb_url)[DATABASE_NAME][args.collection]
+    else:
+        collection = SyntheticCollection(args.rows)
+
+    # Bypasses the MONGODB_URL connection of VehicleData.__init__; only the export itself is measured
+    vehicle_data = VehicleData.__new__(VehicleData)
+    vehicle_data.mongoclient = type("Client", (), {"database": {args.collection: collection}})()
+    vehicle_data.export_report = None
+
+    print(f"{'export':>10} {'rows':>10} {'rows/s':>10} {'peak MB':>9} {'frame MB':>9}")
+    for name, export in (("previous", lambda: export_previous(collection)),
+                         ("streaming", lambda: vehicle_data.export_collection_as_dataframe(
+                             args.collection, batch_size=args.batch_size, parallelism=args.parallelism))):
+        result = measure(export)
+        print(f"{name:>10} {result['rows']:>10} {result['rows_per_second']:>10.0f} {result['peak_mb']:>9.1f} "
+              f"{result['dataframe_mb']:>9.1f}")
+    print(f"streaming export read {vehicle_data.export_report['partitions']} _id partitions")
+
+
+if __name__ == "__main__":
+    main()
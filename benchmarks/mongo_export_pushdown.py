@@ -0,0 +1,99 @@
+"""
+Bytes sent by MongoDB and export time without and with the server-side aggregation pushdown
+(VehicleData.build_export_pipeline: schema projection, "id" dropped, "na" -> null on the server).
+
+Usage:
+    python -m benchmarks.mongo_export_pushdown [--rows 100000]
+    python -m benchmarks.mongo_export_pushdown --mongodb-url mongodb://localhost:27017 \
+        [--collection Vehicle-Data-benchmark] [--rows 1000000]
+
+Without `--mongodb-url` an in-process mongomock collection is used: there is no network, and its
+pure-Python aggregation engine makes the cursor and export times of the pipeline meaningless.
+Cursor modes: `find` returns whole documents (original export), `find projection` the schema
+columns (previous streaming export), `aggregate` the pushdown pipeline. Transferred bytes are the
+BSON sizes of the returned documents, counted on a separate pass so they do not slow down the timed
+runs; `decode s` is the client-side BSON decoding of them. The end-to-end rows time the original
+`pd.DataFrame(list(collection.find()))` export against export_collection_as_dataframe.
+"""
+import argparse
+import time
+
+import bson
+
+from benchmarks.mongo_export_memory import SyntheticCollection, export_previous
+from src.constants import DATABASE_NAME
+
+
+def encode_all(cursor) -> bytes:
+    """  The BSON the server sent for a cursor's documents (reply framing excluded).  """
+    return b"".join(bson.encode(document) for document in cursor)
+
+
+def best_seconds(function, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Documents seeded into an empty collection")
+    parser.add_argument("--mongodb-url")
+    parser.add_argument("--collection", default="Vehicle-Data-benchmark")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    from src.data_access.vehicle_data import VehicleData
+
+    if args.mongodb_url:
+        import pymongo
+        database = pymongo.MongoClient(args.mongodb_url)[DATABASE_NAME]
+    else:
+        import mongomock
+        database = mongomock.MongoClient()[DATABASE_NAME]
+    collection = database[args.collection]
+    if collection.estimated_document_count() == 0:
+        print(f"seeding {args.rows} documents into {DATABASE_NAME}.{args.collection}")
+        batch = []
+        for document in SyntheticCollection(args.rows).find():
+            batch.append(document)
+            if len(batch) == 10000:
+                collection.insert_many(batch)
+                batch = []
+        if batch:
+            collection.insert_many(batch)
+
+    export_columns = VehicleData.get_export_columns()
+    cursors = {
+        "find": lambda: collection.find(batch_size=args.batch_size),
+        "find projection": lambda: collection.find(projection={name: 1 for name in export_columns},
+                                                   batch_size=args.batch_size),
+        "aggregate": lambda: collection.aggregate(VehicleData.build_export_pipeline(export_columns),
+                                                  batchSize=args.batch_size),
+    }
+
+    print(f"{'cursor':>16} {'documents':>10} {'MB sent':>8} {'bytes/doc':>10} {'decode s':>9} {'cursor s':>9}")
+    for name, cursor in cursors.items():
+        sent = encode_all(cursor())
+        documents = len(bson.decode_all(sent))
+        decode_seconds = best_seconds(lambda: bson.decode_all(sent), args.repeats)
+        seconds = best_seconds(lambda: sum(1 for _ in cursor()), args.repeats)
+        print(f"{name:>16} {documents:>10} {len(sent) / 2**20:>8.1f} {len(sent) / max(documents, 1):>10.1f} "
+              f"{decode_seconds:>9.3f} {seconds:>9.2f}")
+
+    vehicle_data = VehicleData.__new__(VehicleData)
+    vehicle_data.mongoclient = type("Client", (), {"database": database})()
+    vehicle_data.export_report = None
+    print(f"{'export':>16} {'seconds':>8}")
+    for name, export in (("original", lambda: export_previous(collection)),
+                         ("pushdown", lambda: vehicle_data.export_collection_as_dataframe(
+                             args.collection, batch_size=args.batch_size, parallelism=1))):
+        print(f"{name:>16} {best_seconds(export, args.repeats):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Scaling of the parallel `_id` range export (VehicleData.export_collection_as_dataframe) with the
+number of concurrent partitions, against a real mongod.
+
+Usage:
+    python -m benchmarks.mongo_export_scaling --mongodb-url mongodb://localhost:27017 \
+        [--collection Vehicle-Data-benchmark] [--seed-rows 1000000] [--parallelism 1 2 4 8]
+
+If the collection is empty it is first filled with `--seed-rows` synthetic vehicle documents. Every
+parallelism level is run `--repeats` times and the best run is reported, with the speedup over a
+single cursor.
+"""
+import argparse
+import time
+
+from src.constants import DATABASE_NAME
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongodb-url", required=True)
+    parser.add_argument("--collection", default="Vehicle-Data-benchmark")
+    parser.add_argument("--seed-rows", type=int, default=1_000_000)
+    parser.add_argument("--parallelism", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    import pymongo
+    from benchmarks.mongo_export_memory import SyntheticCollection
+    from src.data_access.vehicle_data import VehicleData
+
+    client = pymongo.MongoClient(args.mongodb_url)
+    collection = client[DATABASE_NAME][args.collection]
+    if collection.estimated_document_count() == 0:
+        print(f"seeding {args.seed_rows} documents into {DATABASE_NAME}.{args.collection}")
+        batch = []
+        for document in SyntheticCollection(args.seed_rows).find():
+            batch.append(document)
+            if len(batch) == 10000:
+                collection.insert_many(batch)
+                batch = []
+        if batch:
+            collection.insert_many(batch)
+
+    # Same pooled client for every partition thread, as MongoDBClient.client is shared in the pipeline
+    vehicle_data = VehicleData.__new__(VehicleData)
+    vehicle_data.mongoclient = type("Client", (), {"database": client[DATABASE_NAME]})()
+    vehicle_data.export_report = None
+
+    print(f"{'parallelism':>11} {'partitions':>10} {'rows':>10} {'seconds':>8} {'rows/s':>10} {'speedup':>8}")
+    baseline = None
+    for parallelism in args.parallelism:
+        runs = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            df = vehicle_data.export_collection_as_dataframe(args.collection, batch_size=args.batch_size,
+                                                             parallelism=parallelism)
+            runs.append(time.perf_counter() - start)
+        seconds = min(runs)
+        baseline = baseline or seconds
+        print(f"{parallelism:>11} {vehicle_data.export_report['partitions']:>10} {len(df):>10} {seconds:>8.2f} "
+              f"{len(df) / seconds:>10.0f} {baseline / seconds:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
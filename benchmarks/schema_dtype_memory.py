@@ -0,0 +1,62 @@
+"""
+Memory per row before and after the compiled schema dtype plan (src/entity/schema.py), per column.
+
+Usage:
+    python -m benchmarks.schema_dtype_memory [--rows 1000000]
+
+`before` is the frame as previously built and re-read: DataFrame(list(collection.find())) with
+"na" replaced, round-tripped through CSV (default int64 / float64 / string columns). `after` is
+the streaming export in the schema's smallest exact dtypes. The serving input of VehicleBatchData
+is compared the same way (previous int64 / float64 columns vs compact int columns).
+"""
+import argparse
+import io
+
+import pandas as pd
+
+from benchmarks.mongo_export_memory import SyntheticCollection, export_previous
+
+
+def column_bytes_per_row(df: pd.DataFrame) -> pd.Series:
+    return df.memory_usage(deep=True, index=False) / max(len(df), 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    from src.data_access.vehicle_data import VehicleData
+    from src.entity.schema import DataSchema
+    from src.pipeline.prediction_pipeline import VehicleBatchData
+
+    collection = SyntheticCollection(args.rows)
+    buffer = io.StringIO()
+    export_previous(collection).to_csv(buffer, index=False)
+    buffer.seek(0)
+    before = pd.read_csv(buffer)
+
+    vehicle_data = VehicleData.__new__(VehicleData)
+    vehicle_data.mongoclient = type("Client", (), {"database": {"vehicles": collection}})()
+    vehicle_data.export_report = None
+    after = vehicle_data.export_collection_as_dataframe("vehicles", parallelism=1)
+
+    before_bytes, after_bytes = column_bytes_per_row(before), column_bytes_per_row(after)
+    print(f"{args.rows} rows, bytes per row")
+    print(f"{'column':>22} {'before':>14} {'after':>14} {'bytes':>7} {'bytes':>7}")
+    for column in after.columns:
+        print(f"{column:>22} {str(before[column].dtype):>14} {str(after[column].dtype):>14} "
+              f"{before_bytes[column]:>7.1f} {after_bytes[column]:>7.1f}")
+    print(f"{'training frame':>22} {'':>14} {'':>14} {DataSchema.memory_per_row(before):>7.1f} "
+          f"{DataSchema.memory_per_row(after):>7.1f}")
+
+    batch = VehicleBatchData(before.drop(columns=["_id", "Response"]).dropna(), ignore_unknown_columns=True)
+    serving_after = batch.get_vehicle_input_data_frame()
+    serving_before = serving_after.astype({column: "int64" for column, dtype in serving_after.dtypes.items()
+                                           if dtype.kind == "i"})
+    print(f"{'serving input':>22} {'':>14} {'':>14} {DataSchema.memory_per_row(serving_before):>7.1f} "
+          f"{DataSchema.memory_per_row(serving_after):>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Latency benchmark: sklearn RandomForestClassifier.predict vs the compiled NumPy forest.
+
+Usage:
+    python -m benchmarks.tree_ensemble_latency --model <trained model.pkl> --data <transformed test.npy>
+
+`--model` is the MyModel written by ModelTrainer and `--data` the transformed test array written by
+DataTransformation (last column is the target). Outputs are checked for bit-for-bit equality first.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.entity.tree_ensemble import CompiledForest
+from src.utils.main_utils import load_numpy_array_data, load_object
+
+BATCH_SIZES = (1, 10, 100, 1000, 10000)
+
+
+def time_call(fn, X: np.ndarray, repeats: int) -> float:
+    """  Returns the median wall time of `fn(X)` in milliseconds.  """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", required=True, help="Path to the trained MyModel pickle")
+    parser.add_argument("--data", required=True, help="Path to the transformed test .npy array")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    my_model = load_object(args.model)
+    forest = my_model.trained_model_object
+    compiled = getattr(my_model, "compiled_model_object", None) or CompiledForest.from_sklearn(forest)
+
+    X = load_numpy_array_data(args.data)[:, :-1]
+    X = np.resize(X, (max(BATCH_SIZES), X.shape[1])) if len(X) < max(BATCH_SIZES) else X
+
+    identical = np.array_equal(compiled.predict_proba(X), forest.predict_proba(X))
+    print(f"trees={compiled.n_trees} nodes={compiled.n_nodes} rows={len(X)} bit-identical={identical}")
+    print(f"{'batch':>8} {'sklearn ms':>12} {'compiled ms':>12} {'speedup':>8}")
+    for batch_size in BATCH_SIZES:
+        batch = X[:batch_size]
+        sklearn_ms = time_call(forest.predict, batch, args.repeats)
+        compiled_ms = time_call(compiled.predict, batch, args.repeats)
+        print(f"{batch_size:>8} {sklearn_ms:>12.3f} {compiled_ms:>12.3f} {sklearn_ms / compiled_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
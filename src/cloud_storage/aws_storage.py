@@ -3,7 +3,7 @@ import os, sys
 import pickle
 
 from io import StringIO
-from typing import Union,List
+from typing import Union,List,Tuple
 from botocore.exceptions import ClientError
 from pandas import DataFrame,read_csv
 
@@ -38,6 +38,26 @@ class SimpleStorageService:
                 return False
             raise MyException(e, sys)
 
+    # ------------------------------------------------------------
+    # OBJECT VERSION (VersionId if bucket versioning is on, else ETag)
+    # ------------------------------------------------------------
+    @staticmethod
+    def _object_version(response: dict) -> str:
+        version_id = response.get("VersionId")
+        if version_id and version_id != "null":
+            return version_id
+        return response["ETag"].strip('"')
+
+    def get_object_version(self, bucket_name: str, key: str) -> str:
+        """
+        Returns the current version of an S3 object without downloading it.
+        """
+        try:
+            response = self.s3_client.head_object(Bucket=bucket_name, Key=key)
+            return self._object_version(response)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
     # ------------------------------------------------------------
     # READ OBJECT
     # ------------------------------------------------------------
@@ -99,6 +119,48 @@ class SimpleStorageService:
         except Exception as e:
             raise MyException(e, sys) from e
 
+    def load_model_with_version(self, model_name: str, bucket_name: str, model_dir: str = None) -> Tuple[object, str]:
+        """
+        Loads a pickled model from S3 together with the version of the object that was read.
+        """
+        try:
+            key = f"{model_dir}/{model_name}" if model_dir else model_name
+
+            response = self.s3_client.get_object(Bucket=bucket_name, Key=key)
+            model = pickle.loads(response["Body"].read())
+            version = self._object_version(response)
+
+            logging.info(f"Model '{model_name}' (version {version}) loaded successfully from S3.")
+            return model, version
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    # ------------------------------------------------------------
+    # DOWNLOAD FILE
+    # ------------------------------------------------------------
+    def download_file_with_version(self, bucket_name: str, key: str, local_path: str) -> str:
+        """
+        Streams an S3 object to a local file (written to a temporary name, then renamed into place)
+        and returns the version of the object that was downloaded.
+        """
+        try:
+            os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+            tmp_path = f"{local_path}.download{os.getpid()}"
+
+            response = self.s3_client.get_object(Bucket=bucket_name, Key=key)
+            with open(tmp_path, "wb") as file_obj:
+                for chunk in response["Body"].iter_chunks(chunk_size=8 * 1024 * 1024):
+                    file_obj.write(chunk)
+            os.replace(tmp_path, local_path)
+
+            version = self._object_version(response)
+            logging.info(f"Downloaded '{key}' (version {version}) from S3 to {local_path}")
+            return version
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
     # ------------------------------------------------------------
     # CREATE FOLDER
     # ------------------------------------------------------------
@@ -137,6 +199,20 @@ class SimpleStorageService:
         except Exception as e:
             raise MyException(e, sys) from e
 
+    # ------------------------------------------------------------
+    # DELETE OBJECT
+    # ------------------------------------------------------------
+    def delete_object(self, bucket_name: str, key: str) -> None:
+        """
+        Deletes an S3 object (no error if it does not exist).
+        """
+        try:
+            self.s3_client.delete_object(Bucket=bucket_name, Key=key)
+            logging.info(f"Deleted s3://{bucket_name}/{key}")
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
     # ------------------------------------------------------------
     # UPLOAD DF AS CSV
     # ------------------------------------------------------------
@@ -1,14 +1,19 @@
 import os
 import sys
-from pandas import DataFrame
+from datetime import datetime
+from typing import List
 
-from sklearn.model_selection import train_test_split
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from src.logger import logging
 from src.exception import MyException
 from src.entity.config_entity import DataIngestionConfig
 from src.entity.artifact_entity import DataIngestionArtifact
 from src.data_access.vehicle_data import VehicleData
+from src.data_access.feature_store import PartitionedFeatureStore
 
 class DataIngestion():
 
@@ -20,38 +25,99 @@ class DataIngestion():
             raise MyException(e, sys) from e
 
 
-    def export_data_into_feature_store(self) -> DataFrame:
+    def export_data_into_feature_store(self) -> List[str]:
+        """ Exports the collection as Parquet partitions into the feature store directory of this run,
+            restricted to the configured regions / insertion dates if set. """
         try:
             data = VehicleData()
-            logging.info(f"Importing data from mongodb")
-            df = data.export_collection_as_dataframe(collection_name = self.data_ingestion_config.collection_name)
-            logging.info(f"Shape of dataframe: {df.shape}")
+            feature_store_dir = self.data_ingestion_config.feature_store_dir
+            export_since = self.data_ingestion_config.export_since
+            query = VehicleData.build_export_filter(region_codes=self.data_ingestion_config.export_region_codes,
+                                                    since=datetime.fromisoformat(export_since) if export_since else None)
+            logging.info(f"Exporting data from mongodb into feature store directory: {feature_store_dir}, filter: {query}")
+            file_paths = data.export_collection_as_partitions(collection_name = self.data_ingestion_config.collection_name,
+                                                              output_dir = feature_store_dir,
+                                                              batch_size = self.data_ingestion_config.export_batch_size,
+                                                              parallelism = self.data_ingestion_config.export_parallelism,
+                                                              query = query or None)
+            logging.info(f"Exported {data.export_report['rows']} rows into {len(file_paths)} partitions")
+
+            return file_paths
 
-            feature_store_file_path = self.data_ingestion_config.feature_store_file_path
-            dir_path = os.path.dirname(feature_store_file_path)
-            os.makedirs(dir_path, exist_ok=True)
+        except Exception as e:
+            raise MyException(e, sys) from e
 
-            logging.info(f"Exporting data as a DataFrame into feature store file path: {feature_store_file_path}")
-            df.to_csv(feature_store_file_path, index=False, header=True)
 
-            return df
+    def export_new_data_into_partitioned_feature_store(self) -> List[str]:
+        """ Appends only the documents past the stored watermark to the persistent feature store and
+            returns the files of all its partitions. """
+        try:
+            feature_store = PartitionedFeatureStore(self.data_ingestion_config.partitioned_feature_store_dir,
+                                                    watermark_field=self.data_ingestion_config.watermark_field,
+                                                    safety_lag_seconds=self.data_ingestion_config.watermark_safety_lag_seconds)
+            logging.info(f"Importing new data from mongodb into {feature_store.store_dir}")
+            summary = feature_store.ingest(VehicleData(), collection_name=self.data_ingestion_config.collection_name,
+                                           batch_size=self.data_ingestion_config.export_batch_size,
+                                           parallelism=self.data_ingestion_config.export_parallelism)
+            logging.info(f"Ingested {summary['new_rows']} new rows, feature store has {summary['total_rows']} rows "
+                         f"in {summary['partitions']} partitions")
+
+            return feature_store.get_partition_files()
 
         except Exception as e:
             raise MyException(e, sys) from e
 
 
-    def train_test_split_data(self, df: DataFrame) -> None:
+    @staticmethod
+    def is_test_record(keys: pd.Series, test_ratio: float) -> np.ndarray:
+        """ A record is in the test set if the 64-bit hash of its key falls in the first `test_ratio` of
+            the hash range, so its side never depends on the run, the chunking or the other records. """
+        # Keys are unique, so categorizing them first (same hashes) would only cost time
+        hashes = pd.util.hash_pandas_object(keys.astype(str), index=False, categorize=False).to_numpy()
+        return hashes / 2.0**64 < test_ratio
+
+
+    @staticmethod
+    def unify_schemas(schemas: List[pa.Schema]) -> pa.Schema:
+        """ Common schema of the partitions, whose int/float widths were picked per partition. """
+        schema = pa.unify_schemas(schemas, promote_options="permissive")
+        for i, field in enumerate(schema):
+            # Permissive promotion turns int32/int64 + float32 into float32, which is not exact for them
+            if field.type == pa.float32() and any(pa.types.is_integer(s.field(field.name).type) and
+                                                  s.field(field.name).type.bit_width > 16 for s in schemas):
+                schema = schema.set(i, field.with_type(pa.float64()))
+        return schema
+
+
+    def train_test_split_data(self, file_paths: List[str]) -> None:
+        """ Streams the feature store partitions in chunks into the train and test files, assigning every
+            record by the hash of its key (`_id`). Only one chunk is in memory at a time, and re-runs and
+            incremental appends keep every record on the same side. The test share is only approximately
+            `train_test_split_ratio` (binomially distributed around it). """
         try:
-            train_set, test_set = train_test_split(df, test_size=self.data_ingestion_config.train_test_split_ratio)
-            logging.info("Performed train test split on the dataframe")
+            if not file_paths:
+                raise ValueError("Feature store has no partitions to split")
+            key_column = self.data_ingestion_config.split_key_column
+            test_ratio = self.data_ingestion_config.train_test_split_ratio
+            schema = self.unify_schemas([pq.read_schema(file_path) for file_path in file_paths])
+
             training_file_path = self.data_ingestion_config.training_file_path
             dir_path = os.path.dirname(training_file_path)
             os.makedirs(dir_path, exist_ok=True)
 
             logging.info(f"Exporting train and test file path.")
-            train_set.to_csv(self.data_ingestion_config.training_file_path, index=False, header=True)
-            test_set.to_csv(self.data_ingestion_config.testing_file_path, index=False, header=True)
-            logging.info(f"Exported train and test file path.")
+            rows = {"train": 0, "test": 0}
+            with pq.ParquetWriter(training_file_path, schema) as train_writer, \
+                 pq.ParquetWriter(self.data_ingestion_config.testing_file_path, schema) as test_writer:
+                for file_path in file_paths:
+                    for batch in pq.ParquetFile(file_path).iter_batches(batch_size=self.data_ingestion_config.split_chunk_size):
+                        chunk = pa.Table.from_batches([batch]).cast(schema)
+                        is_test = self.is_test_record(chunk.column(key_column).to_pandas(), test_ratio)
+                        train_writer.write_table(chunk.filter(pa.array(~is_test)))
+                        test_writer.write_table(chunk.filter(pa.array(is_test)))
+                        rows["test"] += int(is_test.sum())
+                        rows["train"] += len(is_test) - int(is_test.sum())
+            logging.info(f"Performed hash train test split on {len(file_paths)} partitions: {rows}")
 
         except Exception as e:
             raise MyException(e, sys) from e     
@@ -62,8 +128,11 @@ class DataIngestion():
 
         try:
             logging.info("****Starting data ingestion****")
-            df = self.export_data_into_feature_store()
-            self.train_test_split_data(df)
+            if self.data_ingestion_config.incremental:
+                file_paths = self.export_new_data_into_partitioned_feature_store()
+            else:
+                file_paths = self.export_data_into_feature_store()
+            self.train_test_split_data(file_paths)
 
             data_ingestion_artifact = DataIngestionArtifact(trained_file_path=self.data_ingestion_config.training_file_path, test_file_path=self.data_ingestion_config.testing_file_path)
 
@@ -7,12 +7,13 @@ from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 from sklearn.compose import ColumnTransformer
 
-from src.constants import TARGET_COLUMN, SCHEMA_FILE_PATH, CURRENT_YEAR
+from src.constants import TARGET_COLUMN, CURRENT_YEAR
 from src.entity.config_entity import DataTransformationConfig
 from src.entity.artifact_entity import DataTransformationArtifact, DataIngestionArtifact, DataValidationArtifact
 from src.logger import logging
 from src.exception import MyException
-from src.utils.main_utils import save_object, save_numpy_array_data, read_yaml_file
+from src.entity.schema import DataSchema
+from src.utils.main_utils import save_object, save_numpy_array_data, load_dataframe, read_dataframe_columns
 
 class DataTransformation:
     def __init__(self, data_ingestion_artifact: DataIngestionArtifact,
@@ -22,21 +23,36 @@ class DataTransformation:
             self.data_ingestion_artifact = data_ingestion_artifact
             self.data_transformation_config = data_transformation_config
             self.data_validation_artifact = data_validation_artifact
-            self._schema_config = read_yaml_file(file_path=SCHEMA_FILE_PATH)
+            self._schema_config = DataSchema.get_instance()
 
         except Exception as e:
             raise MyException(e, sys)
 
 
     @staticmethod
-    def read_data(file_path) -> pd.DataFrame:
+    def read_data(file_path, columns=None) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return DataSchema.get_instance().compact(load_dataframe(file_path, columns=columns))
 
         except Exception as e:
             raise MyException(e, sys)
 
 
+    def get_model_columns(self, file_path) -> list:
+        """Columns of `file_path` the transformation uses, i.e. all but the schema's drop_columns."""
+        drop_col = self._schema_config['drop_columns']
+        return [column for column in read_dataframe_columns(file_path) if column != drop_col]
+
+
+    def get_input_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Applies the custom transformations in sequence, giving the input of the preprocessing pipeline."""
+        df = self._map_gender_column(df)
+        df = self._drop_id_column(df)
+        df = self._create_dummy_columns(df)
+        df = self._rename_columns(df)
+        return self._schema_config.widen_floats(df)
+
+
     def get_data_transformer_object(self) -> Pipeline:
         try:
             # Initialize transformers
@@ -77,16 +93,8 @@ class DataTransformation:
             target_feature_test_df = test_df[TARGET_COLUMN]
             logging.info("Input and Target cols defined for both train and test df.")
 
-            # Apply custom transformations in specified sequence
-            input_feature_train_df = self._map_gender_column(input_feature_train_df)
-            input_feature_train_df = self._drop_id_column(input_feature_train_df)
-            input_feature_train_df = self._create_dummy_columns(input_feature_train_df)
-            input_feature_train_df = self._rename_columns(input_feature_train_df)
-
-            input_feature_test_df = self._map_gender_column(input_feature_test_df)
-            input_feature_test_df = self._drop_id_column(input_feature_test_df)
-            input_feature_test_df = self._create_dummy_columns(input_feature_test_df)
-            input_feature_test_df = self._rename_columns(input_feature_test_df)
+            input_feature_train_df = self.get_input_features(input_feature_train_df)
+            input_feature_test_df = self.get_input_features(input_feature_test_df)
             logging.info("Custom transformations applied to train and test data")
 
             logging.info("Starting data transformation")
@@ -174,9 +182,10 @@ class DataTransformation:
             if not self.data_validation_artifact.validation_status:
                 raise Exception(self.data_validation_artifact.message)
 
-            # Load train and test data
-            train_df = self.read_data(self.data_ingestion_artifact.trained_file_path)
-            test_df  = self.read_data(self.data_ingestion_artifact.test_file_path)
+            # Load train and test data, without the columns dropped before training
+            columns  = self.get_model_columns(self.data_ingestion_artifact.trained_file_path)
+            train_df = self.read_data(self.data_ingestion_artifact.trained_file_path, columns=columns)
+            test_df  = self.read_data(self.data_ingestion_artifact.test_file_path, columns=columns)
             logging.info("Train-Test data loaded")
 
             self.data_transformation(train_df=train_df, test_df=test_df)
@@ -2,23 +2,21 @@ import json
 import sys
 import os
 
-import pandas as pd
-
 from pandas import DataFrame
 
 from src.exception import MyException
 from src.logger import logging
-from src.utils.main_utils import read_yaml_file
+from src.utils.main_utils import read_dataframe_columns
 from src.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
 from src.entity.config_entity import DataValidationConfig
-from src.constants import SCHEMA_FILE_PATH
+from src.entity.schema import DataSchema
 
 class DataValidation:
     def __init__(self, data_ingestion_artifact: DataIngestionArtifact, data_validation_config = DataValidationConfig):
         try:
             self.data_ingestion_artifact = data_ingestion_artifact
             self.data_validation_config  = data_validation_config
-            self._schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+            self._schema_config = DataSchema.get_instance()
 
         except Exception as e:
             raise MyException(e, sys) from e
@@ -62,9 +60,10 @@ class DataValidation:
 
 
     @staticmethod
-    def read_data(file_path) -> DataFrame:
+    def read_columns(file_path) -> DataFrame:
+        """  Returns an empty DataFrame with the columns of `file_path`; the checks below only need the columns.  """
         try:
-            return pd.read_csv(file_path)
+            return DataFrame(columns=read_dataframe_columns(file_path))
         except Exception as e:
             raise MyException(e, sys) from e
 
@@ -75,7 +74,7 @@ class DataValidation:
             validation_error_msg = ""
             print("------------------------------------------------------------------------------------------------")
             logging.info("****Starting data validation****")
-            train_df, test_df = (DataValidation.read_data(file_path=self.data_ingestion_artifact.trained_file_path), DataValidation.read_data(file_path=self.data_ingestion_artifact.test_file_path))
+            train_df, test_df = (DataValidation.read_columns(file_path=self.data_ingestion_artifact.trained_file_path), DataValidation.read_columns(file_path=self.data_ingestion_artifact.test_file_path))
 
             # Checking column length of dataframe for train/test df
             status = self.validate_number_of_columns(df=train_df)
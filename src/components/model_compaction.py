@@ -0,0 +1,213 @@
+import os
+import sys
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import f1_score, precision_score, recall_score
+
+from src.exception import MyException
+from src.logger import logging
+from src.entity.estimator import MyModel
+from src.entity.tree_ensemble import CompiledForest
+from src.utils.main_utils import load_numpy_array_data, load_object, save_object, write_yaml_file
+from src.entity.config_entity import ModelCompactionConfig
+from src.entity.artifact_entity import (DataTransformationArtifact, ModelTrainerArtifact, ModelCompactionArtifact,
+                                        ClassificationMetricArtifact)
+
+class ModelCompaction:
+    """
+    Shrinks the trained forest for serving: keeps the smallest share of the best trees whose
+    out-of-bag F1 stays within the budget, collapses redundant leaves and stores thresholds (and
+    leaf values, where no prediction changes) as float32. The compacted MyModel holds only the
+    compiled forest, not the sklearn trees.
+    """
+
+    def __init__(self, data_transformation_artifact: DataTransformationArtifact,
+                 model_trainer_artifact: ModelTrainerArtifact, model_compaction_config: ModelCompactionConfig):
+        self.data_transformation_artifact = data_transformation_artifact
+        self.model_trainer_artifact = model_trainer_artifact
+        self.model_compaction_config = model_compaction_config
+
+
+    def get_out_of_bag_mask(self, forest: RandomForestClassifier, n_samples: int) -> Optional[np.ndarray]:
+        """ Returns a (n_samples, n_trees) mask of the train rows each tree did not see, or None for
+            forests trained without bootstrap, which have no out-of-bag rows. """
+        if not forest.bootstrap:
+            return None
+        out_of_bag = np.ones((n_samples, len(forest.estimators_)), dtype=bool)
+        for tree_index, in_bag_samples in enumerate(forest.estimators_samples_):
+            out_of_bag[in_bag_samples, tree_index] = False
+        return out_of_bag
+
+
+    def rank_trees(self, forest: RandomForestClassifier, train: np.array, out_of_bag: np.ndarray) -> np.ndarray:
+        """ Returns tree indices ordered by the F1 of each tree on its out-of-bag rows, best first. """
+        try:
+            X_train, y_train = train[:, :-1], train[:, -1]
+
+            scores = []
+            for tree_index, estimator in enumerate(forest.estimators_):
+                X, y = X_train[out_of_bag[:, tree_index]], y_train[out_of_bag[:, tree_index]]
+                # Trees predict encoded class indices
+                scores.append(f1_score(y, forest.classes_.take(estimator.predict(X).astype(int))))
+
+            return np.argsort(scores, kind="stable")[::-1]
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def predict_out_of_bag(self, compiled_model: CompiledForest, leaves: np.ndarray, out_of_bag: np.ndarray,
+                           tree_indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ Out-of-bag predictions of the forest made of `tree_indices`: every train row is predicted by the
+            selected trees that did not see it. Also returns the mask of the rows that have such trees;
+            predictions of the other rows are meaningless. """
+        proba = np.zeros((leaves.shape[0], compiled_model.value.shape[1]), dtype=np.float64)
+        for tree_index in tree_indices:
+            proba += compiled_model.value.take(leaves[:, tree_index], axis=0) * out_of_bag[:, tree_index, np.newaxis]
+        return compiled_model.classes.take(np.argmax(proba, axis=1)), out_of_bag[:, tree_indices].any(axis=1)
+
+
+    def compact_forest(self, compiled_model: CompiledForest, forest: RandomForestClassifier, train: np.array,
+                       test: np.array) -> CompiledForest:
+        """ Prunes, merges and downcasts `compiled_model`, keeping the out-of-bag F1 within the configured budget.
+            The test set is left for the report; trees are only pruned when out-of-bag rows exist. """
+        try:
+            X_train, y_train = train[:, :-1], train[:, -1]
+            out_of_bag = self.get_out_of_bag_mask(forest, len(train))
+
+            compacted_model = compiled_model
+            if out_of_bag is None:
+                logging.warning("Forest was trained without bootstrap, keeping all trees")
+            else:
+                ranking = self.rank_trees(forest, train=train, out_of_bag=out_of_bag)
+                leaves = compiled_model.apply(X_train)
+                baseline_pred, _ = self.predict_out_of_bag(compiled_model, leaves, out_of_bag, ranking)
+                for fraction in sorted(self.model_compaction_config.tree_fractions):
+                    tree_indices = ranking[:max(1, round(fraction * compiled_model.n_trees))]
+                    pruned_pred, covered = self.predict_out_of_bag(compiled_model, leaves, out_of_bag, tree_indices)
+                    # Compared on the same rows: those with an out-of-bag tree among the kept ones
+                    baseline_f1 = f1_score(y_train[covered], baseline_pred[covered])
+                    pruned_f1 = f1_score(y_train[covered], pruned_pred[covered])
+                    logging.info(f"Keeping {len(tree_indices)} trees: out-of-bag F1 {pruned_f1:.5f} "
+                                 f"(baseline {baseline_f1:.5f})")
+                    if baseline_f1 - pruned_f1 <= self.model_compaction_config.max_f1_drop:
+                        compacted_model = compiled_model.select_trees(tree_indices)
+                        break
+
+            # Exact: merged subtrees had identical leaves and float32 thresholds are rounded down
+            compacted_model = compacted_model.merge_redundant_leaves().downcast()
+
+            # float32 leaf values only if no class prediction changes on the train or test rows
+            float32_model = compacted_model.downcast(values=True)
+            if all(np.array_equal(float32_model.predict(X), compacted_model.predict(X))
+                   for X in (test[:, :-1], X_train)):
+                compacted_model = float32_model
+
+            return compacted_model
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def measure_latency_ms(self, model: MyModel, X: np.array) -> dict:
+        """ Median prediction time of the serving path on transformed features, per configured batch size. """
+        latency_ms = {}
+        for batch_size in self.model_compaction_config.latency_batch_sizes:
+            batch = np.resize(X, (batch_size, X.shape[1]))
+            timings = []
+            for _ in range(20):
+                start = time.perf_counter()
+                model.predict_transformed(batch)
+                timings.append((time.perf_counter() - start) * 1000)
+            latency_ms[f"batch_{batch_size}"] = float(np.median(timings))
+        return latency_ms
+
+
+    def initiate_model_compaction(self) -> ModelCompactionArtifact:
+        """
+        Initiates the Model compaction component for the pipeline. The compacted model is only
+        accepted if its test F1 is within `max_f1_drop` of the trained model's; otherwise the
+        trained model is passed on unchanged.
+        """
+        try:
+            print("------------------------------------------------------------------------------------------------")
+            logging.info("****Starting Model Compaction****")
+            train_arr = load_numpy_array_data(self.data_transformation_artifact.transformed_train_file_path)
+            test_arr  = load_numpy_array_data(self.data_transformation_artifact.transformed_test_file_path)
+            X_test, y_test = test_arr[:, :-1], test_arr[:, -1]
+
+            trained_model_file_path = self.model_trainer_artifact.trained_model_file_path
+            trained_model = load_object(file_path=trained_model_file_path)
+            compiled_model = trained_model.compiled_model_object
+            if compiled_model is None:
+                # The compiled forest failed verification against sklearn and cannot stand in for it
+                logging.warning("Trained model has no compiled forest, skipping compaction")
+                write_yaml_file(self.model_compaction_config.report_file_path,
+                                {"is_compacted": False, "reason": "trained model has no compiled forest"})
+                return ModelCompactionArtifact(is_compacted=False, f1_delta=0.0, size_reduction=0.0,
+                                               report_file_path=self.model_compaction_config.report_file_path,
+                                               model_trainer_artifact=self.model_trainer_artifact)
+
+            compacted_forest = self.compact_forest(compiled_model, trained_model.trained_model_object,
+                                                   train=train_arr, test=test_arr)
+            compacted_model = MyModel(preprocessing_object=trained_model.preprocessing_object,
+                                      trained_model_object=None, compiled_model_object=compacted_forest)
+            # Keep the trainer's verdict on the fused preprocessing
+            compacted_model.fused_preprocessing_object = trained_model.fused_preprocessing_object
+            save_object(self.model_compaction_config.compacted_model_file_path, compacted_model)
+
+            y_pred = compacted_forest.predict(X_test)
+            metric_artifact = ClassificationMetricArtifact(f1_score=f1_score(y_test, y_pred),
+                                                           precision_score=precision_score(y_test, y_pred),
+                                                           recall_score=recall_score(y_test, y_pred))
+            f1_before = self.model_trainer_artifact.metric_artifact.f1_score
+            f1_delta = float(metric_artifact.f1_score - f1_before)
+
+            size_before = os.path.getsize(trained_model_file_path)
+            size_after = os.path.getsize(self.model_compaction_config.compacted_model_file_path)
+            size_reduction = 1 - size_after / size_before
+            latency_before = self.measure_latency_ms(trained_model, X_test)
+            latency_after = self.measure_latency_ms(compacted_model, X_test)
+
+            is_compacted = -f1_delta <= self.model_compaction_config.max_f1_drop and size_after < size_before
+            report = {
+                "is_compacted": bool(is_compacted),
+                "max_f1_drop": self.model_compaction_config.max_f1_drop,
+                "f1": {"before": float(f1_before), "after": float(metric_artifact.f1_score), "delta": f1_delta},
+                "trees": {"before": compiled_model.n_trees, "after": compacted_forest.n_trees},
+                "nodes": {"before": compiled_model.n_nodes, "after": compacted_forest.n_nodes},
+                "max_depth": {"before": compiled_model.max_depth, "after": compacted_forest.max_depth},
+                "threshold_dtype": str(compacted_forest.threshold.dtype),
+                "value_dtype": str(compacted_forest.value.dtype),
+                "model_file_bytes": {"before": size_before, "after": size_after, "reduction": float(size_reduction)},
+                "node_array_bytes": {"before": compiled_model.nbytes, "after": compacted_forest.nbytes},
+                "latency_ms": {batch: {"before": latency_before[batch], "after": latency_after[batch],
+                                       "reduction": 1 - latency_after[batch] / latency_before[batch]}
+                               for batch in latency_before},
+            }
+            write_yaml_file(self.model_compaction_config.report_file_path, report)
+            logging.info(f"Model compaction report: {report}")
+
+            if not is_compacted:
+                logging.warning(f"Compaction refused (F1 delta {f1_delta:.5f}, size reduction {size_reduction:.1%}), "
+                                f"keeping the trained model")
+            model_trainer_artifact = self.model_trainer_artifact if not is_compacted else ModelTrainerArtifact(
+                trained_model_file_path=self.model_compaction_config.compacted_model_file_path,
+                metric_artifact=metric_artifact,
+            )
+            model_compaction_artifact = ModelCompactionArtifact(
+                is_compacted=bool(is_compacted),
+                f1_delta=f1_delta,
+                size_reduction=float(size_reduction),
+                report_file_path=self.model_compaction_config.report_file_path,
+                model_trainer_artifact=model_trainer_artifact,
+            )
+            logging.info(f"Model compaction artifact: {model_compaction_artifact}")
+
+            return model_compaction_artifact
+
+        except Exception as e:
+            raise MyException(e, sys) from e
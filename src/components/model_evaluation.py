@@ -9,8 +9,9 @@ from src.entity.artifact_entity import ModelTrainerArtifact, DataIngestionArtifa
 from src.exception import MyException
 from src.constants import TARGET_COLUMN
 from src.logger import logging
-from src.utils.main_utils import load_object
+from src.utils.main_utils import load_object, load_dataframe, read_dataframe_columns
 from src.entity.s3_estimator import VehicleDataEstimator
+from src.entity.schema import DataSchema
 
 
 @dataclass
@@ -90,7 +91,10 @@ class ModelEvaluation:
     def evaluate_model(self) -> EvaluateModelResponse:
         """ This function is used to evaluate trained model with production model (S3) and choose best model. """
         try:
-            test_df = pd.read_csv(self.data_ingestion_artifact.test_file_path)
+            # `_id` is dropped before prediction anyway and is not read
+            test_file_path = self.data_ingestion_artifact.test_file_path
+            test_df = load_dataframe(test_file_path, columns=[c for c in read_dataframe_columns(test_file_path) if c != "_id"])
+            test_df = DataSchema.get_instance().compact(test_df)
             x, y = test_df.drop(TARGET_COLUMN, axis=1), test_df[TARGET_COLUMN]
 
             logging.info("Test data loaded and now transforming it for prediction...")
@@ -99,6 +103,7 @@ class ModelEvaluation:
             x = self._drop_id_column(x)
             x = self._create_dummy_columns(x)
             x = self._rename_columns(x)
+            x = DataSchema.widen_floats(x)
 
             trained_model = load_object(file_path=self.model_trainer_artifact.trained_model_file_path)
             logging.info("Trained model exists and is loaded.")
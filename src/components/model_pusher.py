@@ -1,11 +1,15 @@
+import os
 import sys
+from typing import Optional
 
 from src.cloud_storage.aws_storage import SimpleStorageService
+from src.constants import MODEL_MMAP_FILE_EXTENSION
 from src.exception import MyException
 from src.logger import logging
 from src.entity.artifact_entity import ModelPusherArtifact, ModelEvaluationArtifact
 from src.entity.config_entity import ModelPusherConfig
 from src.entity.s3_estimator import VehicleDataEstimator
+from src.utils.main_utils import load_object
 
 class ModelPusher:
     def __init__(self, model_evaluation_artifact: ModelEvaluationArtifact, model_pusher_config: ModelPusherConfig):
@@ -21,13 +25,53 @@ class ModelPusher:
             raise MyException(e, sys) from e
 
 
+    def export_mmap_model(self) -> Optional[str]:
+        """
+        Exports the model to push in the memory-mappable format and returns the file path, or None
+        for models that cannot be exported (no compiled forest or fused preprocessing).
+        """
+        try:
+            trained_model = load_object(file_path=self.model_evaluation_artifact.trained_model_path)
+            mmap_model_path = os.path.splitext(self.model_evaluation_artifact.trained_model_path)[0] + MODEL_MMAP_FILE_EXTENSION
+            trained_model.save_mmap(mmap_model_path)
+            return mmap_model_path
+        except Exception as e:
+            logging.warning(f"Model cannot be exported in the mmap format, only the pickle is pushed: {e}")
+            return None
+
+
+    def push_mmap_model(self, mmap_model_path: Optional[str]) -> None:
+        """
+        Uploads the mmap model next to the pickle. Without one, the mmap model of the previous push
+        is deleted instead, so mmap replicas fall back to the pickle rather than serve a stale model.
+        """
+        try:
+            if mmap_model_path is None:
+                self.s3.delete_object(bucket_name=self.model_pusher_config.bucket_name,
+                                      key=self.model_pusher_config.s3_mmap_model_key_path)
+                return
+            VehicleDataEstimator(bucket_name=self.model_pusher_config.bucket_name,
+                                 model_path=self.model_pusher_config.s3_mmap_model_key_path
+                                 ).save_model(local_model_file=mmap_model_path)
+            logging.info(f"Uploaded mmap model to {self.model_pusher_config.s3_mmap_model_key_path}")
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
     def initiate_model_pusher(self) -> ModelPusherArtifact:
         try:
             print("------------------------------------------------------------------------------------------------")
             logging.info("****Uploading artifacts folder to s3 bucket****")
             
             logging.info("Uploading new model to S3 bucket....")
+            mmap_model_path = self.export_mmap_model()
+            if mmap_model_path is None:
+                # Remove the stale mmap model before the new pickle becomes visible
+                self.push_mmap_model(mmap_model_path)
             self.vehicle_estimator.save_model(local_model_file=self.model_evaluation_artifact.trained_model_path)
+            if mmap_model_path is not None:
+                self.push_mmap_model(mmap_model_path)
             model_pusher_artifact = ModelPusherArtifact(bucket_name=self.model_pusher_config.bucket_name,
                                                         s3_model_path=self.model_pusher_config.s3_model_key_path)
 
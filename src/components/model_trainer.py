@@ -1,21 +1,27 @@
 import sys
-from typing import Tuple
+from typing import Optional, Tuple
 
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
 
+from src.constants import TARGET_COLUMN
 from src.exception import MyException
 from src.logger import logging
 from src.entity.estimator import MyModel
+from src.entity.tree_ensemble import CompiledForest
+from src.components.data_transformation import DataTransformation
 from src.utils.main_utils import load_numpy_array_data, load_object, save_object
 from src.entity.config_entity import ModelTrainerConfig
-from src.entity.artifact_entity import DataTransformationArtifact, ModelTrainerArtifact, ClassificationMetricArtifact
+from src.entity.artifact_entity import (DataIngestionArtifact, DataTransformationArtifact, ModelTrainerArtifact,
+                                        ClassificationMetricArtifact)
 
 class ModelTrainer:
-    def __init__(self, data_transformation_artifact: DataTransformationArtifact, model_trainer_config: ModelTrainerConfig):
+    def __init__(self, data_transformation_artifact: DataTransformationArtifact, model_trainer_config: ModelTrainerConfig,
+                 data_ingestion_artifact: Optional[DataIngestionArtifact] = None):
         self.data_transformation_artifact = data_transformation_artifact
         self.model_trainer_config = model_trainer_config
+        self.data_ingestion_artifact = data_ingestion_artifact
 
 
     def get_model_object_and_report(self, train: np.array, test: np.array) -> Tuple[object, object]:
@@ -59,6 +65,51 @@ class ModelTrainer:
             raise MyException(e, sys) from e
 
 
+    def export_compiled_model(self, trained_model: RandomForestClassifier, X_test: np.array) -> Optional[CompiledForest]:
+        """ Flattens the trained forest into NumPy node arrays for low-latency inference. The export is only
+            kept if its class probabilities are bit for bit identical to sklearn's on the test set. """
+        try:
+            compiled_model = CompiledForest.from_sklearn(trained_model)
+            if not np.array_equal(compiled_model.predict_proba(X_test), trained_model.predict_proba(X_test)):
+                logging.warning("Compiled forest does not match sklearn predictions, serving will use sklearn")
+                return None
+
+            logging.info("Compiled forest verified against sklearn on the test set")
+            return compiled_model
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def verify_fused_preprocessing(self, my_model: MyModel) -> None:
+        """ The fused serving path must reproduce the sklearn preprocessing exactly on the raw test set,
+            otherwise it is dropped from the model and serving uses the pipeline. """
+        try:
+            if my_model.fused_preprocessing_object is None:
+                return
+            if self.data_ingestion_artifact is None:
+                logging.warning("No raw test data to verify the fused preprocessing against, serving will use sklearn")
+                my_model.fused_preprocessing_object = None
+                return
+
+            # The raw test rows go through the same custom transformations as in the data transformation stage
+            data_transformation = DataTransformation(data_ingestion_artifact=self.data_ingestion_artifact,
+                                                     data_validation_artifact=None, data_transformation_config=None)
+            test_file_path = self.data_ingestion_artifact.test_file_path
+            test_df = data_transformation.read_data(test_file_path, columns=data_transformation.get_model_columns(test_file_path))
+            x_test = data_transformation.get_input_features(test_df.drop(columns=[TARGET_COLUMN]))
+
+            if not my_model.check_fast_path(x_test):
+                logging.warning("Fused preprocessing differs from the sklearn pipeline on test data, serving will use sklearn")
+                my_model.fused_preprocessing_object = None
+                return
+
+            logging.info("Fused preprocessing verified against the sklearn pipeline on the test set")
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
     def initiate_model_trainer(self) -> ModelTrainerArtifact:
         """
         Initiates the Model trainer component for the pipeline.
@@ -85,7 +136,10 @@ class ModelTrainer:
 
             # Save the final model object that includes both preprocessing and the trained model
             logging.info("Saving new model as performace is better than previous one.")
-            my_model = MyModel(preprocessing_object=preprocessing_obj, trained_model_object=trained_model)
+            compiled_model = self.export_compiled_model(trained_model=trained_model, X_test=test_arr[:, :-1])
+            my_model = MyModel(preprocessing_object=preprocessing_obj, trained_model_object=trained_model,
+                               compiled_model_object=compiled_model)
+            self.verify_fused_preprocessing(my_model)
             save_object(self.model_trainer_config.trained_model_file_path, my_model)
             logging.info("Saved final model object that includes both preprocessing and the trained model")  
 
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import date
 
 # For MongoDB connection
@@ -10,14 +11,15 @@ PIPELINE_NAME: str = ""
 ARTIFACT_DIR: str = "artifact"
 
 MODEL_FILE_NAME = "model.pkl"
+MODEL_MMAP_FILE_NAME = "model.vmm"
 
 TARGET_COLUMN = "Response"
 CURRENT_YEAR = date.today().year
 PREPROCSSING_OBJECT_FILE_NAME = "preprocessing.pkl"
 
-FILE_NAME: str = "data.csv"
-TRAIN_FILE_NAME: str = "train.csv"
-TEST_FILE_NAME: str = "test.csv"
+# Ingestion artifacts are Parquet files (see save_dataframe / load_dataframe in src.utils.main_utils)
+TRAIN_FILE_NAME: str = "train.parquet"
+TEST_FILE_NAME: str = "test.parquet"
 SCHEMA_FILE_PATH = os.path.join("config", "schema.yaml")
 
 
@@ -34,6 +36,33 @@ DATA_INGESTION_DIR_NAME: str = "data_ingestion"
 DATA_INGESTION_FEATURE_STORE_DIR: str = "feature_store"
 DATA_INGESTION_INGESTED_DIR: str = "ingested"
 DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO: float = 0.25
+# Records are split by a hash of this key, streaming the feature store this many rows at a time
+DATA_INGESTION_SPLIT_KEY_COLUMN: str = "_id"
+DATA_INGESTION_SPLIT_CHUNK_SIZE: int = 100000
+DATA_INGESTION_EXPORT_BATCH_SIZE: int = 10000  # documents read from the cursor per column-buffer append
+DATA_INGESTION_EXPORT_PARALLELISM: int = 4  # _id ranges of the collection read concurrently
+DATA_INGESTION_EXPORT_PARALLELISM_ENV_KEY = "MONGO_EXPORT_PARALLELISM"
+# Optional filters of full exports (incremental ingestion takes every new document): comma-separated
+# Region_Code values, ISO date of the oldest _id to export
+DATA_INGESTION_EXPORT_REGION_CODES_ENV_KEY = "MONGO_EXPORT_REGION_CODES"
+DATA_INGESTION_EXPORT_SINCE_ENV_KEY = "MONGO_EXPORT_SINCE"
+# Incremental ingestion appends documents past a watermark to a feature store shared by all runs
+DATA_INGESTION_INCREMENTAL_ENV_KEY = "INCREMENTAL_INGESTION"
+DATA_INGESTION_PARTITIONED_FEATURE_STORE_DIR: str = os.path.join(ARTIFACT_DIR, "feature_store")
+DATA_INGESTION_WATERMARK_FIELD: str = "_id"
+# Documents inserted less than this long before a run are left for the next one (writer clock skew
+# plus insert latency must stay below it)
+DATA_INGESTION_WATERMARK_SAFETY_LAG_SECONDS: float = 300.0
+DATA_INGESTION_WATERMARK_SAFETY_LAG_ENV_KEY = "INGESTION_WATERMARK_SAFETY_LAG_SECONDS"
+
+"""
+Dataset snapshot related constants: data stage outputs reused across runs with unchanged inputs
+"""
+DATASET_SNAPSHOT_DIR: str = os.path.join(ARTIFACT_DIR, "snapshots")
+DATASET_SNAPSHOT_SAMPLE_SIZE: int = 32  # documents hashed at evenly spaced _id positions, 0 to disable
+DATASET_SNAPSHOT_ENABLED_ENV_KEY = "DATASET_SNAPSHOTS_ENABLED"
+DATASET_SNAPSHOT_KEEP: int = 5  # most recently used snapshots kept, older ones are deleted after a save
+DATASET_SNAPSHOT_KEEP_ENV_KEY = "DATASET_SNAPSHOT_KEEP"
 
 """
 Data Validation realted contant start with DATA_VALIDATION VAR NAME
@@ -61,6 +90,17 @@ MODEL_TRAINER_MIN_SAMPLES_LEAF: int = 6
 MIN_SAMPLES_SPLIT_MAX_DEPTH: int = 10
 MIN_SAMPLES_SPLIT_CRITERION: str = 'entropy'
 MIN_SAMPLES_SPLIT_RANDOM_STATE: int = 101
+# Batches up to this size are scored with the compiled forest; larger ones with sklearn
+COMPILED_FOREST_MAX_BATCH_SIZE: int = 512
+
+"""
+MODEL COMPACTION related constant start with MODEL_COMPACTION var name
+"""
+MODEL_COMPACTION_DIR_NAME: str = "model_compaction"
+MODEL_COMPACTION_REPORT_FILE_NAME: str = "report.yaml"
+MODEL_COMPACTION_MAX_F1_DROP: float = 0.005  # compactions losing more test F1 than this are refused
+MODEL_COMPACTION_TREE_FRACTIONS: tuple = (0.25, 0.5, 0.75)  # fractions of the trees tried, smallest first
+MODEL_COMPACTION_LATENCY_BATCH_SIZES: tuple = (1, 1000)
 
 """
 MODEL Evaluation related constants
@@ -69,6 +109,84 @@ MODEL_EVALUATION_CHANGED_THRESHOLD_SCORE: float = 0.02
 MODEL_BUCKET_NAME = "mlops-vehicle-insurance"
 MODEL_PUSHER_S3_KEY = "model-registry"
 
+"""
+Model serving cache related constants
+"""
+MODEL_CACHE_REVALIDATE_INTERVAL_SECONDS: float = 60.0
+
+"""
+Memory-mappable model artifact: MODEL_ARTIFACT_FORMAT=mmap makes serving load MODEL_MMAP_FILE_NAME,
+downloaded once per version into MODEL_MMAP_CACHE_DIR and mapped by every worker on the host
+"""
+MODEL_ARTIFACT_FORMAT_ENV_KEY = "MODEL_ARTIFACT_FORMAT"
+MODEL_MMAP_FILE_EXTENSION = ".vmm"
+MODEL_MMAP_CACHE_DIR: str = os.path.join(tempfile.gettempdir(), "vehicle-model-cache")
+
+"""
+Prediction result cache related constants (disabled unless PREDICTION_CACHE_ENABLED=true)
+"""
+PREDICTION_CACHE_ENABLED_ENV_KEY = "PREDICTION_CACHE_ENABLED"
+PREDICTION_CACHE_MAX_SIZE: int = 100000
+PREDICTION_CACHE_TTL_SECONDS: float = 3600.0
+
+"""
+Micro-batching of concurrent prediction requests
+"""
+MICRO_BATCH_MAX_BATCH_SIZE: int = 64
+MICRO_BATCH_MAX_WAIT_MS: float = 5.0
+MICRO_BATCH_MAX_QUEUE_SIZE: int = 1024
+MICRO_BATCH_MAX_CONCURRENT_BATCHES: int = 4
+
+"""
+Inference executor related constants (mode and pool size can be overridden via env at startup)
+"""
+INFERENCE_EXECUTION_MODE_ENV_KEY = "INFERENCE_EXECUTION_MODE"
+INFERENCE_POOL_SIZE_ENV_KEY = "INFERENCE_POOL_SIZE"
+INFERENCE_EXECUTION_MODE: str = "thread"
+INFERENCE_POOL_SIZE: int = os.cpu_count() or 1
+
+"""
+Serving startup related constants
+"""
+SERVING_ONLY_ENV_KEY = "SERVING_ONLY"
+MODEL_WARM_UP_BATCH_SIZES: tuple = (1, COMPILED_FOREST_MAX_BATCH_SIZE + 1)  # hits both the compiled and sklearn paths
+MODEL_WARM_UP_RETRY_SECONDS: float = 10.0
+
+"""
+Training job related constants (finished jobs beyond the history size are forgotten, oldest first)
+"""
+TRAINING_JOB_HISTORY_SIZE_ENV_KEY = "TRAINING_JOB_HISTORY_SIZE"
+TRAINING_JOB_HISTORY_SIZE: int = 50
+
+"""
+Pre-fork multi-worker server related constants
+"""
+PREFORK_WORKERS_ENV_KEY = "SERVER_WORKERS"
+PREFORK_WORKERS: int = 1
+PREFORK_MAX_REQUESTS: int = 10000  # worker is recycled after this many requests (+ random jitter), 0 disables
+PREFORK_MAX_REQUESTS_JITTER: int = 1000
+PREFORK_GRACEFUL_TIMEOUT_SECONDS: float = 30.0
+
+"""
+Serving metrics related constants
+"""
+METRICS_LATENCY_BUCKETS: tuple = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_QUANTILE_WINDOW: int = 1024  # p50/p95/p99 are computed over this many most recent samples per stage
+METRICS_QUANTILES: tuple = (0.5, 0.95, 0.99)
+
+"""
+Bulk (file) scoring related constants
+"""
+BULK_SCORING_CHUNK_SIZE: int = 50000
+
+"""
+Offline batch scoring of the MongoDB collection
+"""
+BATCH_SCORING_BATCH_SIZE: int = 10000
+BATCH_SCORING_MAX_QUEUED_BATCHES: int = 4
+BATCH_SCORING_PREDICTION_FIELD: str = "prediction"
+BATCH_SCORING_MODEL_VERSION_FIELD: str = "model_version"
+
 
 APP_HOST = "0.0.0.0"
 APP_PORT = 5000
\ No newline at end of file
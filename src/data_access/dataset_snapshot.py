@@ -0,0 +1,199 @@
+import dataclasses
+import hashlib
+import importlib.metadata
+import importlib.util
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+import bson
+import pymongo
+from bson import ObjectId
+
+from src.constants import DATASET_SNAPSHOT_KEEP, SCHEMA_FILE_PATH
+from src.data_access.vehicle_data import VehicleData
+from src.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact, DataTransformationArtifact
+from src.exception import MyException
+from src.logger import logging
+
+# Modules whose code determines the data stage outputs; any change to them invalidates the snapshots
+SNAPSHOT_CODE_MODULES = ("src.components.data_ingestion", "src.components.data_validation",
+                         "src.components.data_transformation", "src.data_access.vehicle_data",
+                         "src.data_access.feature_store", "src.entity.schema", "src.utils.main_utils",
+                         "src.constants", "src.entity.config_entity")
+
+# Distributions whose version can change the data stage outputs (parsing, parquet files, fitted preprocessing)
+SNAPSHOT_LIBRARIES = ("numpy", "pandas", "pyarrow", "scikit-learn")
+
+DataStageArtifacts = Tuple[DataIngestionArtifact, DataValidationArtifact, DataTransformationArtifact]
+
+
+class DatasetSnapshotStore:
+    """
+    Content-addressed store of the data stage outputs (ingestion, validation, transformation).
+
+    Snapshots are keyed by the SHA-256 of a fingerprint of everything those stages read: the
+    collection (estimated document count, max `_id` and a hash of `sample_size` documents at evenly
+    spaced `_id` positions), config/schema.yaml, the code of SNAPSHOT_CODE_MODULES, the versions of
+    SNAPSHOT_LIBRARIES and the ingestion settings. A run whose fingerprint matches a stored snapshot
+    reuses its artifacts:
+
+        <snapshot_dir>/<key>/snapshot.json     fingerprint and artifacts (paths relative to the snapshot)
+        <snapshot_dir>/<key>/...                copies of the artifact files
+
+    The fingerprint is cheap, not exhaustive: in-place updates are only seen if a sampled document
+    changes. Snapshots are written to a temporary directory and renamed, so they are never partial.
+    Only the `keep` most recently used snapshots are kept.
+    """
+
+    SNAPSHOT_FILE_NAME = "snapshot.json"
+
+    def __init__(self, snapshot_dir: str, sample_size: int = 0, keep: int = DATASET_SNAPSHOT_KEEP):
+        self.snapshot_dir = snapshot_dir
+        self.sample_size = sample_size
+        self.keep = keep
+
+
+    @staticmethod
+    def hash_files(file_paths: Iterable[str]) -> str:
+        digest = hashlib.sha256()
+        for file_path in file_paths:
+            with open(file_path, "rb") as file_obj:
+                digest.update(hashlib.sha256(file_obj.read()).digest())
+        return digest.hexdigest()
+
+
+    def fingerprint_collection(self, collection) -> dict:
+        """  Index-only reads plus `sample_size` single-document seeks on `_id`; no collection scan.  """
+        newest = collection.find_one(sort=[("_id", pymongo.DESCENDING)], projection={"_id": 1})
+        fingerprint = {"count": collection.estimated_document_count(),
+                       "max_id": None if newest is None else str(newest["_id"])}
+
+        if self.sample_size and newest is not None:
+            oldest = collection.find_one(sort=[("_id", pymongo.ASCENDING)], projection={"_id": 1})
+            digest = hashlib.sha256()
+            if isinstance(oldest["_id"], ObjectId) and isinstance(newest["_id"], ObjectId):
+                # Probes evenly spaced over the insertion times encoded in the ObjectIds
+                start, end = oldest["_id"].generation_time, newest["_id"].generation_time
+                for i in range(self.sample_size):
+                    probe = ObjectId.from_datetime(start + (end - start) * i / max(self.sample_size - 1, 1))
+                    document = collection.find_one({"_id": {"$gte": probe}}, sort=[("_id", pymongo.ASCENDING)])
+                    digest.update(bson.encode(document))
+            else:
+                for document in collection.find(sort=[("_id", pymongo.ASCENDING)], limit=self.sample_size):
+                    digest.update(bson.encode(document))
+            fingerprint["sample_hash"] = digest.hexdigest()
+
+        return fingerprint
+
+
+    def compute_fingerprint(self, vehicle_data: VehicleData, data_ingestion_config) -> dict:
+        try:
+            code_files = [importlib.util.find_spec(module).origin for module in SNAPSHOT_CODE_MODULES]
+            return {
+                "collection": self.fingerprint_collection(vehicle_data.get_collection(data_ingestion_config.collection_name)),
+                "schema": self.hash_files([SCHEMA_FILE_PATH]),
+                "code": self.hash_files(code_files),
+                "libraries": {name: importlib.metadata.version(name) for name in SNAPSHOT_LIBRARIES},
+                "settings": {"collection_name": data_ingestion_config.collection_name,
+                             "incremental": data_ingestion_config.incremental,
+                             "watermark_field": data_ingestion_config.watermark_field,
+                             "watermark_safety_lag_seconds": data_ingestion_config.watermark_safety_lag_seconds,
+                             "export_region_codes": list(data_ingestion_config.export_region_codes),
+                             "export_since": data_ingestion_config.export_since,
+                             "train_test_split_ratio": data_ingestion_config.train_test_split_ratio,
+                             "split_key_column": data_ingestion_config.split_key_column},
+            }
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    @staticmethod
+    def get_key(fingerprint: dict) -> str:
+        return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()
+
+
+    def load(self, key: str) -> Optional[DataStageArtifacts]:
+        """  Returns the artifacts of snapshot `key`, or None if there is no complete snapshot for it.  """
+        try:
+            snapshot_path = os.path.join(self.snapshot_dir, key)
+            snapshot_file_path = os.path.join(snapshot_path, self.SNAPSHOT_FILE_NAME)
+            if not os.path.exists(snapshot_file_path):
+                return None
+            with open(snapshot_file_path) as snapshot_file:
+                snapshot = json.load(snapshot_file)
+
+            artifacts = []
+            for artifact_class, fields in zip((DataIngestionArtifact, DataValidationArtifact, DataTransformationArtifact),
+                                              snapshot["artifacts"]):
+                fields = {name: os.path.join(snapshot_path, value) if name.endswith("_path") else value
+                          for name, value in fields.items()}
+                if not all(os.path.exists(value) for name, value in fields.items() if name.endswith("_path")):
+                    logging.warning(f"Dataset snapshot {key} is missing files, ignoring it")
+                    return None
+                artifacts.append(artifact_class(**fields))
+
+            # Marks the snapshot as recently used for prune
+            os.utime(snapshot_file_path)
+            logging.info(f"Reusing dataset snapshot {key} created at {snapshot['created_at']}")
+            return tuple(artifacts)
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def save(self, key: str, fingerprint: dict, artifacts: DataStageArtifacts) -> str:
+        """  Copies the artifact files into snapshot `key` and returns its directory.  """
+        try:
+            snapshot_path = os.path.join(self.snapshot_dir, key)
+            if os.path.exists(snapshot_path):
+                self.prune()
+                return snapshot_path
+
+            artifact_fields = [dataclasses.asdict(artifact) for artifact in artifacts]
+            file_paths = [value for fields in artifact_fields for name, value in fields.items() if name.endswith("_path")]
+            # Files keep their layout below the run's common artifact directory
+            base_dir = os.path.commonpath([os.path.abspath(os.path.dirname(path)) for path in file_paths])
+            relative = {path: os.path.relpath(os.path.abspath(path), base_dir) for path in file_paths}
+
+            tmp_path = os.path.join(self.snapshot_dir, f".tmp-{key}-{os.getpid()}")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            for path, relative_path in relative.items():
+                os.makedirs(os.path.dirname(os.path.join(tmp_path, relative_path)), exist_ok=True)
+                shutil.copy2(path, os.path.join(tmp_path, relative_path))
+            snapshot = {"key": key, "fingerprint": fingerprint, "created_at": datetime.now().isoformat(),
+                        "artifacts": [{name: relative[value] if name.endswith("_path") else value
+                                       for name, value in fields.items()} for fields in artifact_fields]}
+            with open(os.path.join(tmp_path, self.SNAPSHOT_FILE_NAME), "w") as snapshot_file:
+                json.dump(snapshot, snapshot_file, indent=4)
+
+            try:
+                os.rename(tmp_path, snapshot_path)
+            except OSError:
+                # Saved concurrently by another run
+                shutil.rmtree(tmp_path, ignore_errors=True)
+            logging.info(f"Saved dataset snapshot {key} to {snapshot_path}")
+            self.prune()
+            return snapshot_path
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def prune(self) -> None:
+        """  Deletes all but the `keep` most recently saved or loaded snapshots.  """
+        try:
+            snapshot_file_paths = [os.path.join(self.snapshot_dir, name, self.SNAPSHOT_FILE_NAME)
+                                   for name in os.listdir(self.snapshot_dir) if not name.startswith(".tmp-")]
+            snapshot_file_paths = sorted((path for path in snapshot_file_paths if os.path.exists(path)),
+                                         key=os.path.getmtime, reverse=True)
+            for snapshot_file_path in snapshot_file_paths[max(self.keep, 1):]:
+                shutil.rmtree(os.path.dirname(snapshot_file_path), ignore_errors=True)
+                logging.info(f"Deleted dataset snapshot {os.path.basename(os.path.dirname(snapshot_file_path))}")
+
+        except Exception as e:
+            raise MyException(e, sys) from e
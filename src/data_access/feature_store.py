@@ -0,0 +1,171 @@
+import fcntl
+import json
+import os
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import pandas as pd
+import pymongo
+from bson import ObjectId, json_util
+
+from src.constants import (DATA_INGESTION_EXPORT_BATCH_SIZE, DATA_INGESTION_EXPORT_PARALLELISM,
+                           DATA_INGESTION_WATERMARK_SAFETY_LAG_SECONDS)
+from src.data_access.vehicle_data import VehicleData
+from src.exception import MyException
+from src.logger import logging
+from src.utils.main_utils import load_dataframe
+
+
+class PartitionedFeatureStore:
+    """
+    Persistent feature store fed incrementally from MongoDB. Every ingestion run exports only the
+    documents whose `watermark_field` is past the stored watermark and up to a cutoff of
+    `safety_lag_seconds` before the run starts, and adds them as a new partition directory:
+
+        <store_dir>/manifest.json              watermark and partitions (replaced atomically)
+        <store_dir>/ingest-NNNNN/part-NNNNN.parquet
+
+    The watermark field holds insertion times: `_id` ObjectIds (stamped by each writer's clock) or a
+    date set by the server. A document whose time is past the cutoff is left for a later run, so
+    writes with a skewed clock or still in flight when a run starts are not skipped as long as the
+    lag exceeds the clock skew plus the insert latency. Files not listed in the manifest (e.g. from
+    a failed run) are ignored. Runs on the same store are serialized with a file lock.
+    """
+
+    MANIFEST_FILE_NAME = "manifest.json"
+
+    def __init__(self, store_dir: str, watermark_field: str = "_id",
+                 safety_lag_seconds: float = DATA_INGESTION_WATERMARK_SAFETY_LAG_SECONDS):
+        self.store_dir = store_dir
+        self.watermark_field = watermark_field
+        self.safety_lag_seconds = safety_lag_seconds
+        self.manifest_file_path = os.path.join(store_dir, self.MANIFEST_FILE_NAME)
+
+
+    @contextmanager
+    def _lock(self):
+        os.makedirs(self.store_dir, exist_ok=True)
+        with open(os.path.join(self.store_dir, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+    def read_manifest(self) -> dict:
+        if not os.path.exists(self.manifest_file_path):
+            return {"watermark_field": self.watermark_field, "watermark": None, "partitions": []}
+        with open(self.manifest_file_path) as manifest_file:
+            return json.load(manifest_file)
+
+
+    def _write_manifest(self, manifest: dict) -> None:
+        tmp_path = f"{self.manifest_file_path}.tmp"
+        with open(tmp_path, "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=4)
+        os.replace(tmp_path, self.manifest_file_path)
+
+
+    def ensure_watermark_index(self, collection) -> None:
+        """  Creates the ascending index the watermark range queries use (`_id` always has one).  """
+        if self.watermark_field != "_id":
+            collection.create_index([(self.watermark_field, pymongo.ASCENDING)])
+
+
+    def get_upper_bound(self, latest, now: Optional[datetime] = None):
+        """
+        The cutoff of this run in the type of the watermark field (`latest` is its highest value).
+        ObjectId.from_datetime has an all-zero suffix, so documents of the cutoff second sort after it
+        and fall into the next run.
+        """
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(seconds=self.safety_lag_seconds)
+        if isinstance(latest, ObjectId):
+            return ObjectId.from_datetime(cutoff)
+        if isinstance(latest, datetime):
+            # pymongo returns naive UTC datetimes unless the client is tz aware
+            return cutoff if latest.tzinfo is not None else cutoff.replace(tzinfo=None)
+        raise ValueError(f"Watermark field {self.watermark_field} must hold ObjectIds or dates, "
+                         f"got {type(latest).__name__}")
+
+
+    def ingest(self, vehicle_data: VehicleData, collection_name: str,
+               batch_size: int = DATA_INGESTION_EXPORT_BATCH_SIZE,
+               parallelism: int = DATA_INGESTION_EXPORT_PARALLELISM) -> dict:
+        """  Appends the documents past the watermark as a new partition and advances the watermark.  """
+        try:
+            with self._lock():
+                started_at = time.perf_counter()
+                manifest = self.read_manifest()
+                if manifest["watermark_field"] != self.watermark_field:
+                    raise ValueError(f"Feature store watermark is on {manifest['watermark_field']}, "
+                                     f"not {self.watermark_field}")
+                watermark = json_util.loads(manifest["watermark"]) if manifest["watermark"] is not None else None
+
+                collection = vehicle_data.get_collection(collection_name)
+                self.ensure_watermark_index(collection)
+                # Documents newer than the cutoff (possibly not all inserted yet) are left for a later run
+                latest = collection.find_one({self.watermark_field: {"$exists": True}},
+                                             projection={self.watermark_field: 1},
+                                             sort=[(self.watermark_field, pymongo.DESCENDING)])
+                upper = None if latest is None else self.get_upper_bound(latest[self.watermark_field])
+
+                partition = None
+                if upper is not None and (watermark is None or upper > watermark):
+                    query = {self.watermark_field: {"$lte": upper, **({"$gt": watermark} if watermark is not None else {})}}
+                    partition_name = f"ingest-{len(manifest['partitions']) + 1:05d}"
+                    partition_dir = os.path.join(self.store_dir, partition_name)
+                    shutil.rmtree(partition_dir, ignore_errors=True)
+                    try:
+                        file_paths = vehicle_data.export_collection_as_partitions(
+                            collection_name, output_dir=partition_dir, batch_size=batch_size,
+                            parallelism=parallelism, query=query)
+                    except Exception:
+                        shutil.rmtree(partition_dir, ignore_errors=True)
+                        raise
+
+                    if vehicle_data.export_report["rows"]:
+                        partition = {"name": partition_name,
+                                     "files": [os.path.relpath(path, self.store_dir) for path in file_paths],
+                                     "rows": vehicle_data.export_report["rows"],
+                                     "watermark_from": manifest["watermark"],
+                                     "watermark_to": json_util.dumps(upper),
+                                     "ingested_at": datetime.now().isoformat()}
+                        manifest["partitions"].append(partition)
+                    else:
+                        shutil.rmtree(partition_dir, ignore_errors=True)
+                    manifest["watermark"] = json_util.dumps(upper)
+                    self._write_manifest(manifest)
+
+                summary = {"new_rows": partition["rows"] if partition else 0,
+                           "partition": partition["name"] if partition else None,
+                           "partitions": len(manifest["partitions"]),
+                           "total_rows": sum(p["rows"] for p in manifest["partitions"]),
+                           "watermark": manifest["watermark"],
+                           "seconds": time.perf_counter() - started_at}
+                logging.info(f"Incremental ingestion into {self.store_dir}: {summary}")
+                return summary
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def get_partition_files(self) -> List[str]:
+        return [os.path.join(self.store_dir, file_name)
+                for partition in self.read_manifest()["partitions"] for file_name in partition["files"]]
+
+
+    def read_all(self, file_paths: Optional[List[str]] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """  Returns the union of all partitions (or of `file_paths`), optionally of `columns` only.  """
+        try:
+            file_paths = self.get_partition_files() if file_paths is None else file_paths
+            if not file_paths:
+                raise ValueError(f"Feature store {self.store_dir} has no partitions")
+            return pd.concat([load_dataframe(file_path, columns=columns) for file_path in file_paths], ignore_index=True)
+
+        except Exception as e:
+            raise MyException(e, sys) from e
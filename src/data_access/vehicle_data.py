@@ -1,12 +1,85 @@
+import os
+import resource
 import sys
+import time
 import pandas as pd
 import numpy as np
-from typing import Optional
+from bson import ObjectId
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pandas.api.types import union_categoricals
+from typing import Callable, Dict, List, Optional, Tuple
 
 from src.exception import MyException
 from src.logger import logging
-from src.constants import DATABASE_NAME
+from src.constants import DATABASE_NAME, DATA_INGESTION_EXPORT_BATCH_SIZE, DATA_INGESTION_EXPORT_PARALLELISM
 from src.configuration.mongo_db_connection import MongoDBClient
+from src.entity.schema import DataSchema
+from src.utils.main_utils import save_dataframe
+
+# Placeholder used for missing values in the source collection
+MISSING_VALUE = "na"
+
+# [lower, upper) bounds of an _id partition; None is unbounded
+IdRange = Tuple[Optional[object], Optional[object]]
+
+
+class ColumnBuffer:
+    """
+    Growable, preallocated column of one schema type. Numeric columns are NumPy arrays (int columns
+    switch to float64 once a missing value appears), categorical columns are int16 codes plus a
+    category list, and "na" / missing fields become NaN.
+    """
+
+    def __init__(self, name: str, kind: str, capacity: int):
+        self.name = name
+        self.kind = kind
+        self.size = 0
+        dtype = {"int": np.int64, "float": np.float64, "category": np.int16}.get(kind, object)
+        self.data = np.empty(max(capacity, 1), dtype=dtype)
+        self.categories: Dict[object, int] = {}
+
+    def _reserve(self, count: int) -> None:
+        if self.size + count > len(self.data):
+            grown = np.empty(max(2 * len(self.data), self.size + count), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+
+    def _to_numeric(self, values: List[object]) -> np.ndarray:
+        array = np.asarray(values)
+        if array.dtype.kind not in "iuf":
+            # "na" placeholders, missing fields (None) or mixed types
+            series = pd.Series(values, dtype=object).replace({MISSING_VALUE: np.nan})
+            array = pd.to_numeric(series).to_numpy(dtype=np.float64, na_value=np.nan)
+        # NaN != its rounding as well, so this catches missing and fractional values
+        if self.data.dtype == np.int64 and array.dtype.kind == "f" and (array != np.round(array)).any():
+            self.data = self.data.astype(np.float64)
+        return array
+
+    def _to_codes(self, values: List[object]) -> np.ndarray:
+        chunk_codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+        # Chunk-local codes -> codes of the categories seen so far, keeping -1 for missing values
+        global_codes = np.array([-1 if value == MISSING_VALUE else self.categories.setdefault(value, len(self.categories))
+                                 for value in uniques] + [-1], dtype=np.int16)
+        return global_codes.take(chunk_codes)
+
+    def append(self, values: List[object]) -> None:
+        if self.kind in ("int", "float"):
+            array = self._to_numeric(values)
+        elif self.kind == "category":
+            array = self._to_codes(values)
+        else:
+            array = np.array([np.nan if value == MISSING_VALUE else value for value in values], dtype=object)
+        self._reserve(len(array))
+        self.data[self.size:self.size + len(array)] = array
+        self.size += len(array)
+
+    def to_series_data(self):
+        data = self.data[:self.size]
+        if self.kind == "category":
+            return pd.Categorical.from_codes(data, categories=list(self.categories))
+        return data
+
 
 class VehicleData:
     """  Class to export the data fetched from MongoDB to a Pandas DataFrame.  """
@@ -15,28 +88,234 @@ class VehicleData:
         try:
             """  Initializes the MongoDB client connection.  """
             self.mongoclient = MongoDBClient(database_name = DATABASE_NAME)
-            
+            self.export_report: Optional[dict] = None
+
         except Exception as e:
             raise MyException(e, sys) from e
 
-    def export_collection_as_dataframe(self, collection_name: str, database_name: Optional[str] = None) -> pd.DataFrame:
-        """  Exports an entire MongoDB collection as a pandas DataFrame.  """
+    @staticmethod
+    def get_export_columns() -> Dict[str, str]:
+        """  Returns {column: type} of the exported columns from config/schema.yaml; "id" is not exported.  """
+        return {name: dtype for name, dtype in DataSchema.get_instance().columns.items() if name != "id"}
+
+    def get_collection(self, collection_name: str, database_name: Optional[str] = None):
+        if database_name is None:
+            return self.mongoclient.database[collection_name]
+        return self.mongoclient[database_name][collection_name]
 
+    @staticmethod
+    def get_id_partitions(collection, parallelism: int, query: Optional[dict] = None,
+                          sample_per_partition: int = 100) -> List[IdRange]:
+        """
+        Splits the documents matching `query` (all by default) into up to `parallelism` contiguous `_id`
+        ranges of similar size, using quantiles of a `$sample` of their ids as boundaries.
+        Ranges are [lower, upper); None means unbounded.
+        """
+        if parallelism <= 1:
+            return [(None, None)]
+        sample = collection.aggregate(([{"$match": query}] if query else []) +
+                                      [{"$sample": {"size": parallelism * sample_per_partition}},
+                                       {"$project": {"_id": 1}}])
         try:
-            if database_name is None:
-                collection = self.mongoclient.database[collection_name]
+            ids = sorted(document["_id"] for document in sample)
+        except TypeError:
+            # Mixed _id types have no total order to split on
+            return [(None, None)]
+        boundaries = []
+        for i in range(1, parallelism):
+            boundary = ids[len(ids) * i // parallelism] if ids else None
+            if boundary is not None and boundary not in boundaries:
+                boundaries.append(boundary)
+        return list(zip([None] + boundaries, boundaries + [None]))
+
+    @staticmethod
+    def _id_range_filter(id_range: IdRange, query: Optional[dict] = None) -> dict:
+        lower, upper = id_range
+        condition = {**({"$gte": lower} if lower is not None else {}), **({"$lt": upper} if upper is not None else {})}
+        filters = [f for f in (query, {"_id": condition} if condition else None) if f]
+        return filters[0] if len(filters) == 1 else {"$and": filters} if filters else {}
+
+    @staticmethod
+    def get_export_field_names(export_columns: Dict[str, str]) -> Dict[str, str]:
+        """
+        Field each export column is sent under: its position ("0", "1", ...) instead of its name,
+        which is most of the size of a vehicle document. Shared by the pipeline and the column buffers.
+        """
+        return {name: str(position) for position, name in enumerate(export_columns)}
+
+    @staticmethod
+    def build_export_pipeline(export_columns: Dict[str, str], match: Optional[dict] = None) -> List[dict]:
+        """
+        Aggregation pipeline of the export: `match` (e.g. an `_id` range) followed by a projection to
+        `export_columns` (under get_export_field_names), so "id" and unknown fields never leave the
+        server, and "na" placeholders arrive as null. `_id` is kept as the partition range and
+        train/test split key.
+        """
+        projection = {field: {"$cond": [{"$eq": [f"${name}", MISSING_VALUE]}, None, f"${name}"]}
+                      for name, field in VehicleData.get_export_field_names(export_columns).items()}
+        return ([{"$match": match}] if match else []) + [{"$project": projection}]
+
+    @staticmethod
+    def build_export_filter(region_codes: Optional[List[float]] = None, since: Optional[datetime] = None) -> dict:
+        """  Export filter on Region_Code and on the insertion time encoded in ObjectId `_id`s (uses the _id index).  """
+        filters = []
+        if region_codes:
+            filters.append({"Region_Code": {"$in": list(region_codes)}})
+        if since is not None:
+            filters.append({"_id": {"$gte": ObjectId.from_datetime(since)}})
+        return filters[0] if len(filters) == 1 else {"$and": filters} if filters else {}
+
+    def _export_range(self, collection, id_range: IdRange, query: Optional[dict], export_columns: Dict[str, str],
+                      capacity: int, batch_size: int) -> pd.DataFrame:
+        """  Reads one `_id` range in batches of `batch_size` documents into typed column buffers, then compacts them.  """
+        buffers = [ColumnBuffer("_id", "object", capacity)] + \
+                  [ColumnBuffer(name, dtype, capacity) for name, dtype in export_columns.items()]
+        field_names = self.get_export_field_names(export_columns)
+        cursor = collection.aggregate(self.build_export_pipeline(export_columns, self._id_range_filter(id_range, query)),
+                                      batchSize=batch_size)
+        batch = []
+        for document in cursor:
+            batch.append(document)
+            if len(batch) == batch_size:
+                self._append_batch(buffers, batch, field_names)
+                batch = []
+        if batch:
+            self._append_batch(buffers, batch, field_names)
+        frame = pd.DataFrame({buffer.name: buffer.to_series_data() for buffer in buffers}, copy=False)
+        return DataSchema.get_instance().compact(frame)
+
+    @staticmethod
+    def _concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """  Stitches partition frames column by column; categories are unioned instead of falling back to object.  """
+        if len(frames) == 1:
+            return frames[0]
+        columns = {}
+        for name in frames[0].columns:
+            if isinstance(frames[0][name].dtype, pd.CategoricalDtype):
+                columns[name] = union_categoricals([frame[name].array for frame in frames], sort_categories=True)
             else:
-                collection = self.mongoclient[database_name][collection_name]
+                columns[name] = np.concatenate([frame[name].to_numpy() for frame in frames])
+        return pd.DataFrame(columns, copy=False)
+
+    def _export_partitions(self, collection_name: str, database_name: Optional[str], batch_size: int,
+                           parallelism: int, query: Optional[dict],
+                           export_partition: Callable[[int, pd.DataFrame], object],
+                           discard_partition: Optional[Callable[[object], None]] = None) -> List[object]:
+        """
+        Reads the `_id` partitions on a thread pool sharing the pooled client; returns export_partition results.
+        Range filters only match `_id`s of the BSON type they were sampled from, so if the partitions miss
+        documents (mixed `_id` types), their results are discarded and the export is redone as one unbounded range.
+        """
+        collection = self.get_collection(collection_name, database_name)
+        export_columns = self.get_export_columns()
+        id_ranges = self.get_id_partitions(collection, parallelism, query=query)
+        expected_rows = collection.count_documents(query or {})
+        exported_rows = []
 
-            # Convert collection data to DataFrame and preprocess
+        def export_range(index: int, id_range: IdRange) -> object:
+            frame = self._export_range(collection, id_range, query, export_columns,
+                                       expected_rows // len(id_ranges), batch_size)
+            exported_rows.append(len(frame))
+            return export_partition(index, frame)
+
+        with ThreadPoolExecutor(max_workers=len(id_ranges), thread_name_prefix="mongo-export") as pool:
+            results = list(pool.map(export_range, range(len(id_ranges)), id_ranges))
+
+        if len(id_ranges) > 1 and sum(exported_rows) < expected_rows:
+            logging.warning(f"Partitioned export read {sum(exported_rows)} of {expected_rows} documents "
+                            f"(mixed _id types), exporting again with a single cursor")
+            for result in results:
+                if discard_partition is not None:
+                    discard_partition(result)
+            id_ranges, exported_rows = [(None, None)], []
+            results = [export_range(0, (None, None))]
+        return results
+
+    def _set_export_report(self, rows: int, elapsed: float, partitions: int, dataframe_mb: float) -> None:
+        self.export_report = {
+            "rows": rows,
+            "partitions": partitions,
+            "seconds": elapsed,
+            "rows_per_second": rows / elapsed if elapsed else 0.0,
+            "dataframe_mb": dataframe_mb,
+            # ru_maxrss is in KiB on Linux
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+        logging.info(f"Data fecthed with len: {rows}, export report: {self.export_report}")
+
+    def export_collection_as_dataframe(self, collection_name: str, database_name: Optional[str] = None,
+                                       batch_size: int = DATA_INGESTION_EXPORT_BATCH_SIZE,
+                                       parallelism: int = DATA_INGESTION_EXPORT_PARALLELISM,
+                                       query: Optional[dict] = None) -> pd.DataFrame:
+        """
+        Exports an entire MongoDB collection as a pandas DataFrame.
+
+        The export runs as an aggregation (see build_export_pipeline), so only the schema columns are
+        sent, with "na" already turned into null by the server. The cursor is read in batches of
+        `batch_size` documents, and every batch is appended to typed column buffers, so no list of all
+        documents or object-dtype frame is ever built; columns end up in the smallest dtypes of the
+        compiled schema. With `parallelism` > 1 the collection is split into `_id` ranges that are
+        read concurrently and stitched together (rows are then in `_id` range order). The column layout
+        matches the previous export: `_id` (as string) followed by the schema columns without "id".
+        Rows/sec and memory are logged and kept in `export_report`. `query` restricts the export.
+        """
+
+        try:
             logging.info("Fetching data from mongoDB")
-            df = pd.DataFrame(list(collection.find()))
-            logging.info(f"Data fecthed with len: {len(df)}")
-            if "id" in df.columns.to_list():
-                df = df.drop(columns=["id"], axis=1)
-            df.replace({"na": np.nan}, inplace=True)
+            started_at = time.perf_counter()
+            frames = self._export_partitions(collection_name, database_name, batch_size, parallelism, query,
+                                             export_partition=lambda index, frame: frame)
+            # Partitions may have picked different int widths; the plan is re-applied to the whole frame
+            df = DataSchema.get_instance().compact(self._concat_frames(frames))
+            self._set_export_report(len(df), time.perf_counter() - started_at, partitions=len(frames),
+                                    dataframe_mb=float(df.memory_usage(deep=True).sum()) / 2**20)
 
             return df
 
         except Exception as e:
-            raise MyException(e, sys) from e      
\ No newline at end of file
+            raise MyException(e, sys) from e
+
+    def export_collection_as_partitions(self, collection_name: str, output_dir: str,
+                                        database_name: Optional[str] = None,
+                                        batch_size: int = DATA_INGESTION_EXPORT_BATCH_SIZE,
+                                        parallelism: int = DATA_INGESTION_EXPORT_PARALLELISM,
+                                        query: Optional[dict] = None) -> List[str]:
+        """
+        Exports the collection as a partitioned feature store: every `_id` range is read concurrently
+        and written to its own `part-NNNNN.parquet` in `output_dir` as soon as it is read, so the whole
+        collection is never held in memory at once. `query` restricts the export. Returns the paths of
+        the (non-empty) partition files.
+        """
+
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            started_at = time.perf_counter()
+
+            def write_partition(index: int, frame: pd.DataFrame) -> Tuple[Optional[str], int]:
+                if frame.empty:
+                    return None, 0
+                file_path = os.path.join(output_dir, f"part-{index:05d}.parquet")
+                save_dataframe(file_path, frame)
+                return file_path, len(frame)
+
+            def discard_partition(partition: Tuple[Optional[str], int]) -> None:
+                if partition[0] is not None:
+                    os.remove(partition[0])
+
+            partitions = self._export_partitions(collection_name, database_name, batch_size, parallelism, query,
+                                                 export_partition=write_partition, discard_partition=discard_partition)
+            self._set_export_report(sum(rows for _, rows in partitions), time.perf_counter() - started_at,
+                                    partitions=len(partitions), dataframe_mb=0.0)
+
+            return [file_path for file_path, _ in partitions if file_path is not None]
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @staticmethod
+    def _append_batch(buffers: List[ColumnBuffer], batch: List[dict], field_names: Dict[str, str]) -> None:
+        # buffers[0] is _id; the others are the export columns, read from the field they were projected under
+        buffers[0].append([str(document["_id"]) for document in batch])
+        for buffer in buffers[1:]:
+            field = field_names[buffer.name]
+            buffer.append([document.get(field) for document in batch])
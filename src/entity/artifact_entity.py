@@ -29,6 +29,14 @@ class ModelTrainerArtifact:
     trained_model_file_path:str 
     metric_artifact:ClassificationMetricArtifact
 
+@dataclass
+class ModelCompactionArtifact:
+    is_compacted:bool
+    f1_delta:float
+    size_reduction:float
+    report_file_path:str
+    model_trainer_artifact:ModelTrainerArtifact  # model to evaluate: the compacted one if accepted
+
 @dataclass
 class ModelEvaluationArtifact:
     is_model_accepted:bool
@@ -17,11 +17,30 @@ training_pipeline_config: TrainingPipelineConfig = TrainingPipelineConfig()
 @dataclass
 class DataIngestionConfig:
     data_ingestion_dir: str = os.path.join(training_pipeline_config.artifact_dir, DATA_INGESTION_DIR_NAME)
-    feature_store_file_path: str = os.path.join(data_ingestion_dir, DATA_INGESTION_FEATURE_STORE_DIR, FILE_NAME)
+    feature_store_dir: str = os.path.join(data_ingestion_dir, DATA_INGESTION_FEATURE_STORE_DIR)
     training_file_path: str = os.path.join(data_ingestion_dir, DATA_INGESTION_INGESTED_DIR, TRAIN_FILE_NAME)
     testing_file_path: str = os.path.join(data_ingestion_dir, DATA_INGESTION_INGESTED_DIR, TEST_FILE_NAME)
     train_test_split_ratio: float = DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO
+    split_key_column: str = DATA_INGESTION_SPLIT_KEY_COLUMN
+    split_chunk_size: int = DATA_INGESTION_SPLIT_CHUNK_SIZE
     collection_name:str = DATA_INGESTION_COLLECTION_NAME
+    export_batch_size: int = DATA_INGESTION_EXPORT_BATCH_SIZE
+    export_parallelism: int = int(os.getenv(DATA_INGESTION_EXPORT_PARALLELISM_ENV_KEY, DATA_INGESTION_EXPORT_PARALLELISM))
+    export_region_codes: tuple = tuple(float(code) for code in os.getenv(DATA_INGESTION_EXPORT_REGION_CODES_ENV_KEY, "").split(",")
+                                       if code.strip())
+    export_since: str = os.getenv(DATA_INGESTION_EXPORT_SINCE_ENV_KEY)
+    incremental: bool = os.getenv(DATA_INGESTION_INCREMENTAL_ENV_KEY, "false").lower() == "true"
+    partitioned_feature_store_dir: str = DATA_INGESTION_PARTITIONED_FEATURE_STORE_DIR
+    watermark_field: str = DATA_INGESTION_WATERMARK_FIELD
+    watermark_safety_lag_seconds: float = float(os.getenv(DATA_INGESTION_WATERMARK_SAFETY_LAG_ENV_KEY,
+                                                          DATA_INGESTION_WATERMARK_SAFETY_LAG_SECONDS))
+
+@dataclass
+class DatasetSnapshotConfig:
+    snapshot_dir: str = DATASET_SNAPSHOT_DIR
+    sample_size: int = DATASET_SNAPSHOT_SAMPLE_SIZE
+    enabled: bool = os.getenv(DATASET_SNAPSHOT_ENABLED_ENV_KEY, "true").lower() == "true"
+    keep: int = int(os.getenv(DATASET_SNAPSHOT_KEEP_ENV_KEY, DATASET_SNAPSHOT_KEEP))
 
 @dataclass
 class DataValidationConfig:
@@ -32,9 +51,9 @@ class DataValidationConfig:
 class DataTransformationConfig:
     data_transformation_dir: str = os.path.join(training_pipeline_config.artifact_dir, DATA_TRANSFORMATION_DIR_NAME)
     transformed_train_file_path: str = os.path.join(data_transformation_dir, DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
-                                                    TRAIN_FILE_NAME.replace("csv", "npy"))
+                                                    TRAIN_FILE_NAME.replace("parquet", "npy"))
     transformed_test_file_path: str = os.path.join(data_transformation_dir, DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
-                                                   TEST_FILE_NAME.replace("csv", "npy"))
+                                                   TEST_FILE_NAME.replace("parquet", "npy"))
     transformed_object_file_path: str = os.path.join(data_transformation_dir,
                                                      DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
                                                      PREPROCSSING_OBJECT_FILE_NAME)
@@ -51,6 +70,15 @@ class ModelTrainerConfig:
     _criterion = MIN_SAMPLES_SPLIT_CRITERION
     _random_state = MIN_SAMPLES_SPLIT_RANDOM_STATE
 
+@dataclass
+class ModelCompactionConfig:
+    model_compaction_dir: str = os.path.join(training_pipeline_config.artifact_dir, MODEL_COMPACTION_DIR_NAME)
+    compacted_model_file_path: str = os.path.join(model_compaction_dir, MODEL_FILE_NAME)
+    report_file_path: str = os.path.join(model_compaction_dir, MODEL_COMPACTION_REPORT_FILE_NAME)
+    max_f1_drop: float = MODEL_COMPACTION_MAX_F1_DROP
+    tree_fractions: tuple = MODEL_COMPACTION_TREE_FRACTIONS
+    latency_batch_sizes: tuple = MODEL_COMPACTION_LATENCY_BATCH_SIZES
+
 @dataclass
 class ModelEvaluationConfig:
     changed_threshold_score: float = MODEL_EVALUATION_CHANGED_THRESHOLD_SCORE
@@ -61,8 +89,48 @@ class ModelEvaluationConfig:
 class ModelPusherConfig:
     bucket_name: str = MODEL_BUCKET_NAME
     s3_model_key_path: str = MODEL_FILE_NAME
+    s3_mmap_model_key_path: str = MODEL_MMAP_FILE_NAME
 
 @dataclass
 class VehiclePredictorConfig:
-    model_file_path: str = MODEL_FILE_NAME
-    model_bucket_name: str = MODEL_BUCKET_NAME                                                          
\ No newline at end of file
+    model_file_path: str = MODEL_MMAP_FILE_NAME if os.getenv(MODEL_ARTIFACT_FORMAT_ENV_KEY) == "mmap" else MODEL_FILE_NAME
+    model_bucket_name: str = MODEL_BUCKET_NAME
+    model_revalidate_interval: float = MODEL_CACHE_REVALIDATE_INTERVAL_SECONDS
+    result_cache_enabled: bool = os.getenv(PREDICTION_CACHE_ENABLED_ENV_KEY, "false").lower() == "true"
+    result_cache_max_size: int = PREDICTION_CACHE_MAX_SIZE
+    result_cache_ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS
+
+@dataclass
+class MicroBatcherConfig:
+    max_batch_size: int = MICRO_BATCH_MAX_BATCH_SIZE
+    max_wait_ms: float = MICRO_BATCH_MAX_WAIT_MS
+    max_queue_size: int = MICRO_BATCH_MAX_QUEUE_SIZE
+    max_concurrent_batches: int = MICRO_BATCH_MAX_CONCURRENT_BATCHES
+
+@dataclass
+class InferenceExecutorConfig:
+    execution_mode: str = os.getenv(INFERENCE_EXECUTION_MODE_ENV_KEY, INFERENCE_EXECUTION_MODE)
+    pool_size: int = int(os.getenv(INFERENCE_POOL_SIZE_ENV_KEY, INFERENCE_POOL_SIZE))
+
+@dataclass
+class TrainingJobConfig:
+    history_size: int = int(os.getenv(TRAINING_JOB_HISTORY_SIZE_ENV_KEY, TRAINING_JOB_HISTORY_SIZE))
+
+@dataclass
+class BatchScoringConfig:
+    database_name: str = DATABASE_NAME
+    collection_name: str = COLLECTION_NAME
+    batch_size: int = BATCH_SCORING_BATCH_SIZE
+    max_queued_batches: int = BATCH_SCORING_MAX_QUEUED_BATCHES
+    prediction_field: str = BATCH_SCORING_PREDICTION_FIELD
+    model_version_field: str = BATCH_SCORING_MODEL_VERSION_FIELD
+
+@dataclass
+class PreforkServerConfig:
+    host: str = APP_HOST
+    port: int = APP_PORT
+    workers: int = int(os.getenv(PREFORK_WORKERS_ENV_KEY, PREFORK_WORKERS))
+    max_requests: int = PREFORK_MAX_REQUESTS
+    max_requests_jitter: int = PREFORK_MAX_REQUESTS_JITTER
+    graceful_timeout: float = PREFORK_GRACEFUL_TIMEOUT_SECONDS
+    model_check_interval: float = MODEL_CACHE_REVALIDATE_INTERVAL_SECONDS
@@ -1,20 +1,136 @@
 import sys
+from typing import Optional
 
+import dill
+import numpy as np
 import pandas as pd
 from pandas import DataFrame
 from sklearn.pipeline import Pipeline
 
+from src.constants import COMPILED_FOREST_MAX_BATCH_SIZE
+from src.entity.fused_preprocessor import FusedPreprocessor
+from src.entity.tree_ensemble import CompiledForest
 from src.exception import MyException
 from src.logger import logging
+from src.metrics import metrics
+from src.utils.main_utils import load_mmap_arrays, save_mmap_arrays
 
 
 class MyModel:
-    def __init__(self, preprocessing_object: Pipeline, trained_model_object: object):
+    # Version of the layout written by save_mmap
+    MMAP_FORMAT_VERSION = 1
+
+    def __init__(self, preprocessing_object: Pipeline, trained_model_object: object,
+                 compiled_model_object: Optional[CompiledForest] = None):
         
         self.preprocessing_object = preprocessing_object
         self.trained_model_object = trained_model_object
+        self.compiled_model_object = compiled_model_object
+
+        # Precompute the fused NumPy preprocessing once, so it is saved together with the model
+        try:
+            self.fused_preprocessing_object = FusedPreprocessor.from_pipeline(preprocessing_object)
+        except MyException as e:
+            logging.warning(f"Preprocessing cannot be fused, serving will use the sklearn pipeline: {e}")
+            self.fused_preprocessing_object = None
+
+    def predict_transformed(self, transformed_feature: np.ndarray) -> np.ndarray:
+        """  Predicts from features already transformed by the preprocessing (e.g. the stored test array).  """
+        # Small batches go through the compiled forest (identical results, far lower fixed
+        # overhead than sklearn's predict).
+        with metrics.time_stage("model_predict"):
+            compiled_model = getattr(self, "compiled_model_object", None)
+            # Models loaded with load_mmap have no sklearn forest and use the compiled one for every batch
+            if compiled_model is not None and (self.trained_model_object is None
+                                               or len(transformed_feature) <= COMPILED_FOREST_MAX_BATCH_SIZE):
+                return compiled_model.predict(transformed_feature)
+            return self.trained_model_object.predict(transformed_feature)
+
+    def transform(self, dataframe: pd.DataFrame, use_fast_path: bool = True) -> np.ndarray:
+        """
+        Applies the fitted scaling. The fused NumPy path is used when available; the sklearn
+        pipeline (pandas path) is the fallback and the reference for check_fast_path.
+        """
+        with metrics.time_stage("preprocess"):
+            fused_preprocessing = getattr(self, "fused_preprocessing_object", None)
+            if use_fast_path and fused_preprocessing is not None:
+                return fused_preprocessing.transform(dataframe)
+            return self.preprocessing_object.transform(dataframe)
+
+    def check_fast_path(self, dataframe: pd.DataFrame) -> bool:
+        """  Returns True if the fused path transforms `dataframe` exactly like the sklearn pipeline.  """
+        try:
+            if getattr(self, "fused_preprocessing_object", None) is None:
+                return False
+            return np.array_equal(self.transform(dataframe, use_fast_path=True),
+                                  self.transform(dataframe, use_fast_path=False))
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def predict_array(self, features: np.ndarray) -> np.ndarray:
+        """
+        Predicts from raw feature vectors whose columns follow `fused_preprocessing_object.input_columns`,
+        skipping DataFrame construction entirely.
+        """
+        try:
+            if getattr(self, "fused_preprocessing_object", None) is None:
+                raise ValueError("This model has no fused preprocessing, use predict with a DataFrame")
+            return self.predict_transformed(self.fused_preprocessing_object.transform_array(features))
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def save_mmap(self, file_path: str) -> None:
+        """
+        Saves the model in the memory-mappable format: compiled forest node arrays and fused scaler
+        vectors as raw NumPy blocks, plus the (small) sklearn preprocessing pipeline as a dill blob.
+        The sklearn forest itself is not stored; the compiled forest predicts identically.
+        """
+        try:
+            compiled_model = getattr(self, "compiled_model_object", None)
+            fused_preprocessing = getattr(self, "fused_preprocessing_object", None)
+            if compiled_model is None or fused_preprocessing is None:
+                raise ValueError("Only models with a compiled forest and fused preprocessing can be saved as mmap")
+
+            forest_arrays, forest_metadata = compiled_model.get_arrays()
+            preprocessor_arrays, preprocessor_metadata = fused_preprocessing.get_arrays()
+            arrays = {**{f"forest.{name}": array for name, array in forest_arrays.items()},
+                      **{f"preprocessor.{name}": array for name, array in preprocessor_arrays.items()},
+                      "preprocessing_object": np.frombuffer(dill.dumps(self.preprocessing_object), dtype=np.uint8)}
+            metadata = {"format_version": self.MMAP_FORMAT_VERSION,
+                        "forest": forest_metadata, "preprocessor": preprocessor_metadata}
+            save_mmap_arrays(file_path, arrays=arrays, metadata=metadata)
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @classmethod
+    def load_mmap(cls, file_path: str) -> "MyModel":
+        """
+        Loads a model saved with save_mmap. The node arrays stay in the read-only mapping, so worker
+        processes on the same host share one copy of them through the page cache.
+        """
+        try:
+            arrays, metadata = load_mmap_arrays(file_path)
+            if metadata.get("format_version") != cls.MMAP_FORMAT_VERSION:
+                raise ValueError(f"Unsupported mmap model format version {metadata.get('format_version')}")
+
+            def section(prefix: str) -> dict:
+                return {name[len(prefix):]: array for name, array in arrays.items() if name.startswith(prefix)}
+
+            model = cls.__new__(cls)
+            model.preprocessing_object = dill.loads(arrays["preprocessing_object"].tobytes())
+            model.trained_model_object = None
+            model.compiled_model_object = CompiledForest.from_arrays(section("forest."), metadata["forest"])
+            model.fused_preprocessing_object = FusedPreprocessor.from_arrays(section("preprocessor."),
+                                                                             metadata["preprocessor"])
+            return model
+
+        except Exception as e:
+            raise MyException(e, sys) from e
 
-    def predict(self, dataframe: pd.DataFrame) -> DataFrame:
+    def predict(self, dataframe: pd.DataFrame, use_fast_path: bool = True) -> DataFrame:
         """
         Function accepts preprocessed inputs (with all custom transformations already applied),
         applies scaling using preprocessing_object, and performs prediction on transformed features.
@@ -23,14 +139,14 @@ class MyModel:
             logging.info("Starting prediction process.")
 
             # Step 1: Apply scaling transformations using the pre-trained preprocessing object
-            transformed_feature = self.preprocessing_object.transform(dataframe)
+            transformed_feature = self.transform(dataframe, use_fast_path=use_fast_path)
 
             # Step 2: Perform prediction using the trained model
             logging.info("Using the trained model to get predictions")
-            predictions = self.trained_model_object.predict(transformed_feature)
+            predictions = self.predict_transformed(transformed_feature)
 
             return predictions
 
         except Exception as e:
             logging.error("Error occurred in predict method", exc_info=True)
-            raise MyException(e, sys) from e
\ No newline at end of file
+            raise MyException(e, sys) from e
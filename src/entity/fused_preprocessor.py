@@ -0,0 +1,111 @@
+import sys
+from typing import Dict, List, Tuple
+
+import numpy as np
+from pandas import DataFrame
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, MinMaxScaler, StandardScaler
+
+from src.exception import MyException
+
+
+class FusedPreprocessor:
+    """
+    NumPy replacement for the fitted preprocessing Pipeline (ColumnTransformer with
+    StandardScaler, MinMaxScaler and passthrough columns) used at serve time.
+
+    The fitted parameters are precomputed into per-output-column vectors, so the transform is
+    one column gather (the only allocation) followed by in-place `(x - sub) / div * mul + add`.
+    Identity entries (0, 1, 1, 0) leave passthrough values untouched, and the non-identity
+    entries apply exactly the operations of the sklearn scalers, so results match the
+    ColumnTransformer output.
+    """
+
+    def __init__(self, input_columns: List[str], column_order: np.ndarray, sub: np.ndarray,
+                 div: np.ndarray, mul: np.ndarray, add: np.ndarray):
+        self.input_columns = input_columns
+        self.column_order = column_order
+        self.sub = sub
+        self.div = div
+        self.mul = mul
+        self.add = add
+
+
+    @classmethod
+    def from_pipeline(cls, preprocessing_object: Pipeline) -> "FusedPreprocessor":
+        """  Precomputes column order and scaling vectors from a fitted preprocessing pipeline.  """
+        try:
+            column_transformer = preprocessing_object
+            if isinstance(column_transformer, Pipeline):
+                if len(column_transformer.steps) != 1:
+                    raise ValueError("Only single-step preprocessing pipelines can be fused")
+                column_transformer = column_transformer.steps[0][1]
+            if not isinstance(column_transformer, ColumnTransformer):
+                raise ValueError(f"Cannot fuse preprocessing step {type(column_transformer).__name__}")
+
+            input_columns = [str(col) for col in column_transformer.feature_names_in_]
+            positions = {col: i for i, col in enumerate(input_columns)}
+
+            column_order, subs, divs, muls, adds = [], [], [], [], []
+            for name, transformer, columns in column_transformer.transformers_:
+                if transformer == "drop" or len(columns) == 0:
+                    continue
+                indices = [positions[col] if isinstance(col, str) else int(col) for col in columns]
+                n = len(indices)
+                sub, div, mul, add = np.zeros(n), np.ones(n), np.ones(n), np.zeros(n)
+
+                if isinstance(transformer, StandardScaler):
+                    if transformer.with_mean:
+                        sub = transformer.mean_
+                    if transformer.with_std:
+                        div = transformer.scale_
+                elif isinstance(transformer, MinMaxScaler):
+                    if transformer.clip:
+                        raise ValueError("MinMaxScaler with clip=True cannot be fused")
+                    mul, add = transformer.scale_, transformer.min_
+                elif not (transformer == "passthrough"
+                          or (isinstance(transformer, FunctionTransformer) and transformer.func is None)):
+                    raise ValueError(f"Cannot fuse transformer '{name}' of type {type(transformer).__name__}")
+
+                column_order.extend(indices)
+                subs.append(sub)
+                divs.append(div)
+                muls.append(mul)
+                adds.append(add)
+
+            return cls(input_columns=input_columns,
+                       column_order=np.asarray(column_order, dtype=np.intp),
+                       sub=np.concatenate(subs).astype(np.float64),
+                       div=np.concatenate(divs).astype(np.float64),
+                       mul=np.concatenate(muls).astype(np.float64),
+                       add=np.concatenate(adds).astype(np.float64))
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def get_arrays(self) -> Tuple[Dict[str, np.ndarray], dict]:
+        """  Returns the fitted vectors and the remaining metadata, for the memory-mappable model artifact.  """
+        arrays = {"column_order": self.column_order, "sub": self.sub, "div": self.div, "mul": self.mul, "add": self.add}
+        return arrays, {"input_columns": list(self.input_columns)}
+
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], metadata: dict) -> "FusedPreprocessor":
+        return cls(input_columns=metadata["input_columns"], column_order=arrays["column_order"], sub=arrays["sub"],
+                   div=arrays["div"], mul=arrays["mul"], add=arrays["add"])
+
+
+    def transform_array(self, X: np.ndarray) -> np.ndarray:
+        """  Transforms raw feature vectors given in `input_columns` order.  """
+        transformed = np.asarray(X, dtype=np.float64).take(self.column_order, axis=1)
+        transformed -= self.sub
+        transformed /= self.div
+        transformed *= self.mul
+        transformed += self.add
+        return transformed
+
+
+    def transform(self, dataframe: DataFrame) -> np.ndarray:
+        return self.transform_array(dataframe[self.input_columns].to_numpy(dtype=np.float64))
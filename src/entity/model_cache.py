@@ -0,0 +1,151 @@
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.entity.estimator import MyModel
+from src.entity.s3_estimator import VehicleDataEstimator
+from src.exception import MyException
+from src.logger import logging
+from src.metrics import metrics
+
+
+class ModelCache:
+    """
+    Process-wide cache of the production MyModel.
+
+    The model is downloaded from S3 once and then revalidated against the S3 object version
+    (VersionId/ETag) every `revalidate_interval` seconds. Revalidation and reloads run on a
+    background thread, and the (model, version) pair is swapped as a single reference, so
+    requests that are already running keep the model they started with and are never blocked.
+    """
+
+    _instances: Dict[Tuple[str, str], "ModelCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, bucket_name: str, model_path: str, revalidate_interval: float):
+        self.bucket_name = bucket_name
+        self.model_path = model_path
+        self.revalidate_interval = revalidate_interval
+        self._estimator: Optional[VehicleDataEstimator] = None
+        self._entry: Optional[Tuple[MyModel, str]] = None
+        self._last_checked: float = 0.0
+        self._refresh_lock = threading.Lock()
+        self._swap_listeners: List[Callable[[str], None]] = []
+        self._swap_listeners_lock = threading.Lock()
+
+
+    @classmethod
+    def get_instance(cls, bucket_name: str, model_path: str, revalidate_interval: float) -> "ModelCache":
+        """ Returns the shared cache for a bucket/model path, creating it on first use. """
+        key = (bucket_name, model_path)
+        cache = cls._instances.get(key)
+        if cache is None:
+            with cls._instances_lock:
+                cache = cls._instances.get(key)
+                if cache is None:
+                    cache = cls(bucket_name=bucket_name, model_path=model_path,
+                                revalidate_interval=revalidate_interval)
+                    cls._instances[key] = cache
+        return cache
+
+
+    @property
+    def version(self) -> Optional[str]:
+        """ Version of the model currently being served, or None if nothing is loaded yet. """
+        entry = self._entry
+        return None if entry is None else entry[1]
+
+
+    def add_swap_listener(self, listener: Callable[[str], None]) -> None:
+        """ Registers a callback invoked with the new version every time a model is swapped in (idempotent). """
+        with self._swap_listeners_lock:
+            if listener not in self._swap_listeners:
+                # Copy on write, so _load iterates without the lock
+                self._swap_listeners = self._swap_listeners + [listener]
+
+
+    def _get_estimator(self) -> VehicleDataEstimator:
+        if self._estimator is None:
+            self._estimator = VehicleDataEstimator(bucket_name=self.bucket_name, model_path=self.model_path)
+        return self._estimator
+
+
+    def _load(self) -> None:
+        """ Downloads the model and swaps it in as one (model, version) reference. """
+        with metrics.time_stage("model_load"):
+            model, version = self._get_estimator().load_model_with_version()
+        metrics.inc("model_loads_total")
+        metrics.set_model_version(version)
+        previous_version = self.version
+        self._entry = (model, version)
+        self._last_checked = time.monotonic()
+        logging.info(f"Model cache swapped model version {previous_version} -> {version}")
+        for listener in self._swap_listeners:
+            listener(version)
+
+
+    def _revalidate(self) -> None:
+        """ Reloads the model only if the S3 object version differs from the cached one. """
+        try:
+            current_version = self._get_estimator().get_model_version()
+            if current_version != self.version:
+                self._load()
+            else:
+                self._last_checked = time.monotonic()
+        except Exception as e:
+            # Keep serving the cached model; the next request past the interval retries.
+            self._last_checked = time.monotonic()
+            logging.error(f"Model cache revalidation failed, serving cached version {self.version}: {e}")
+        finally:
+            self._refresh_lock.release()
+
+
+    def get_remote_version(self) -> str:
+        """ Returns the version of the model object currently in S3, without downloading it. """
+        try:
+            return self._get_estimator().get_model_version()
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def reload(self) -> Optional[str]:
+        """ Downloads and swaps in the current model right away (blocking) and returns its version. """
+        try:
+            with self._refresh_lock:
+                self._load()
+            return self.version
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def get_model_and_version(self) -> Tuple[MyModel, str]:
+        """ Returns the cached (model, version) pair, loading it on first use and scheduling revalidation when due. """
+        try:
+            entry = self._entry
+            if entry is None:
+                with self._refresh_lock:
+                    if self._entry is None:
+                        self._load()
+                return self._entry
+
+            if (time.monotonic() - self._last_checked >= self.revalidate_interval
+                    and self._refresh_lock.acquire(blocking=False)):
+                try:
+                    threading.Thread(target=self._revalidate, name="model-cache-revalidate", daemon=True).start()
+                except Exception as e:
+                    # _revalidate never ran, so release its lock here or revalidation would stop for good
+                    self._refresh_lock.release()
+                    logging.error(f"Model cache revalidation could not be started, serving cached version {entry[1]}: {e}")
+
+            return entry
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def get_model(self) -> MyModel:
+        """ Returns the cached model (see get_model_and_version). """
+        return self.get_model_and_version()[0]
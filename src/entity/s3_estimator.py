@@ -1,7 +1,12 @@
 from src.cloud_storage.aws_storage import SimpleStorageService
+from src.constants import MODEL_FILE_NAME, MODEL_MMAP_CACHE_DIR, MODEL_MMAP_FILE_EXTENSION
 from src.exception import MyException
+from src.logger import logging
 from src.entity.estimator import MyModel
+import os
+import re
 import sys
+from typing import Tuple
 from pandas import DataFrame
 
 
@@ -38,6 +43,81 @@ class VehicleDataEstimator:
             raise MyException(e, sys) from e
 
 
+    def _mmap_cache_path(self, version: str) -> str:
+        safe_version = re.sub(r"[^\w.-]", "_", version)
+        return os.path.join(MODEL_MMAP_CACHE_DIR, f"{safe_version}-{os.path.basename(self.model_path)}")
+
+
+    def _get_serving_path(self) -> str:
+        """
+        The mmap model path, or the pickle next to it if the pusher could not export (and removed)
+        the mmap model of the current pickle, so replicas never serve a stale mmap model.
+        """
+        if not self.model_path.endswith(MODEL_MMAP_FILE_EXTENSION) or self.is_model_present(self.model_path):
+            return self.model_path
+        return os.path.join(os.path.dirname(self.model_path), MODEL_FILE_NAME)
+
+
+    def _load_mmap_model_with_version(self) -> Tuple[MyModel, str]:
+        """
+        Maps a memory-mappable model from the local cache, downloading it only if this version is not
+        cached yet. Every worker on the host maps the same file, so they share its pages.
+        """
+        version = self.get_model_version()
+        if not os.path.exists(self._mmap_cache_path(version)):
+            download_path = os.path.join(MODEL_MMAP_CACHE_DIR, f"{os.path.basename(self.model_path)}.{os.getpid()}")
+            # The object may have changed since the version check; name the file after what was downloaded
+            version = self.s3.download_file_with_version(bucket_name=self.bucket_name, key=self.model_path,
+                                                         local_path=download_path)
+            os.replace(download_path, self._mmap_cache_path(version))
+
+        model = MyModel.load_mmap(self._mmap_cache_path(version))
+        self._remove_stale_mmap_versions(self._mmap_cache_path(version))
+        return model, version
+
+
+    def _remove_stale_mmap_versions(self, current_path: str) -> None:
+        """
+        Deletes the cached files of older versions of this model once the current one is mapped, so
+        frequent pushes don't fill the disk. Processes still mapping an old file keep its pages.
+        """
+        suffix = f"-{os.path.basename(self.model_path)}"
+        for file_name in os.listdir(MODEL_MMAP_CACHE_DIR):
+            file_path = os.path.join(MODEL_MMAP_CACHE_DIR, file_name)
+            if file_name.endswith(suffix) and file_path != current_path:
+                try:
+                    os.remove(file_path)
+                    logging.info(f"Removed cached model version {file_path}")
+                except OSError as e:
+                    # Already removed by another worker, or still mapped on a platform that forbids deleting it
+                    logging.warning(f"Could not remove cached model version {file_path}: {e}")
+
+
+    def load_model_with_version(self) -> Tuple[MyModel, str]:
+        """ Load model from S3 along with the version (VersionId/ETag) of the object that was read. """
+        try:
+            model_path = self._get_serving_path()
+            if model_path.endswith(MODEL_MMAP_FILE_EXTENSION):
+                return self._load_mmap_model_with_version()
+            return self.s3.load_model_with_version(
+                model_name=model_path,
+                bucket_name=self.bucket_name
+            )
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def get_model_version(self) -> str:
+        """ Return the current version (VersionId/ETag) of the model object in S3. """
+        try:
+            return self.s3.get_object_version(
+                bucket_name=self.bucket_name,
+                key=self._get_serving_path()
+            )
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
     def save_model(self, local_model_file: str, remove: bool = False) -> None:
         """ Upload a trained model from local filesystem to S3. """
         try:
@@ -0,0 +1,107 @@
+import sys
+import threading
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.constants import SCHEMA_FILE_PATH
+from src.exception import MyException
+from src.logger import logging
+from src.utils.main_utils import read_yaml_file
+
+
+class DataSchema:
+    """
+    config/schema.yaml compiled into a dtype plan, read once per process (see get_instance).
+
+    Every schema column is stored in the smallest dtype that holds its values exactly: int columns
+    as int8/16/32/64 by value range (float32/float64 once values are missing), float columns as
+    float32 where every value survives the round trip, and category columns as categoricals with
+    sorted categories, so get_dummies(drop_first=True) drops the same level as for strings.
+    Raw schema keys stay available as `schema["num_features"]`.
+    """
+
+    _instances: Dict[str, "DataSchema"] = {}
+    _instances_lock = threading.Lock()
+
+    INT_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+    def __init__(self, schema_config: dict):
+        self.config = schema_config
+        self.columns: Dict[str, str] = {name: dtype for column in schema_config["columns"]
+                                        for name, dtype in column.items()}
+        self.prediction_columns: Dict[str, str] = {name: dtype for column in schema_config["prediction_columns"]
+                                                   for name, dtype in column.items()}
+
+
+    @classmethod
+    def get_instance(cls, file_path: str = SCHEMA_FILE_PATH) -> "DataSchema":
+        """  Returns the compiled schema of `file_path`, reading the file on first use only.  """
+        schema = cls._instances.get(file_path)
+        if schema is None:
+            with cls._instances_lock:
+                schema = cls._instances.get(file_path)
+                if schema is None:
+                    schema = cls._instances[file_path] = cls(read_yaml_file(file_path))
+                    logging.info(f"Compiled schema {file_path}: {schema.columns}")
+        return schema
+
+
+    def __getitem__(self, key: str):
+        return self.config[key]
+
+
+    @classmethod
+    def smallest_dtype(cls, values: np.ndarray, kind: str) -> np.dtype:
+        """  Returns the smallest dtype that holds the numeric `values` of an int or float column exactly.  """
+        # NaN differs from its rounding as well, so missing values rule out the int dtypes
+        if kind == "int" and (values.dtype.kind in "iu" or not (values != np.round(values)).any()):
+            if not len(values):
+                return np.dtype(np.int8)
+            low, high = values.min(), values.max()
+            for dtype in cls.INT_DTYPES:
+                if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+                    return np.dtype(dtype)
+        with np.errstate(over="ignore", invalid="ignore"):
+            is_float32_exact = np.array_equal(values.astype(np.float32), values, equal_nan=values.dtype.kind == "f")
+        return np.dtype(np.float32 if is_float32_exact else np.float64)
+
+
+    def compact(self, df: DataFrame) -> DataFrame:
+        """  Casts the schema columns present in `df` to their smallest exact dtypes, in place, and returns `df`.  """
+        try:
+            for name, kind in self.columns.items():
+                if name not in df.columns:
+                    continue
+                if kind == "category":
+                    categories = sorted(df[name].dropna().unique())
+                    if not (isinstance(df[name].dtype, pd.CategoricalDtype) and
+                            df[name].cat.categories.to_list() == categories):
+                        df[name] = pd.Categorical(df[name], categories=categories)
+                else:
+                    values = pd.to_numeric(df[name]).to_numpy()
+                    dtype = self.smallest_dtype(values, kind)
+                    if df[name].dtype != dtype:
+                        df[name] = values.astype(dtype)
+            return df
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    @staticmethod
+    def widen_floats(df: DataFrame) -> DataFrame:
+        """
+        Casts float32 columns back to float64 (exactly) before they reach the sklearn preprocessing,
+        which would otherwise fit and scale them in float32 precision, unlike at serving time.
+        """
+        float32_columns = [name for name, dtype in df.dtypes.items() if dtype == np.float32]
+        return df.astype({name: np.float64 for name in float32_columns}) if float32_columns else df
+
+
+    @staticmethod
+    def memory_per_row(df: DataFrame) -> float:
+        """  Bytes per row of `df`, including the contents of object and string columns.  """
+        return float(df.memory_usage(deep=True, index=False).sum()) / max(len(df), 1)
@@ -0,0 +1,230 @@
+import sys
+from typing import Dict, Tuple
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.exception import MyException
+from src.logger import logging
+
+
+class CompiledForest:
+    """
+    A trained RandomForestClassifier flattened into contiguous NumPy node arrays.
+
+    All trees share one set of node arrays (feature, threshold, children, leaf values) and are
+    walked level by level for the whole batch at once, which avoids the per-call input
+    validation, joblib dispatch and per-tree Python calls of sklearn's predict.
+    Children are interleaved as (left, right) pairs so one step is `children[2 * node + go_right]`,
+    and leaves point to themselves with an infinite threshold so that every sample can take
+    `max_depth` steps without masking. The comparison and the accumulation of leaf
+    probabilities follow sklearn's order of operations, so predictions are bit for bit identical.
+    """
+
+    # Rows evaluated together; keeps the (rows x trees) working set cache-resident
+    CHUNK_SIZE = 1024
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 missing_go_to_left: np.ndarray, value: np.ndarray, roots: np.ndarray,
+                 classes: np.ndarray, n_features: int, max_depth: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.missing_go_to_left = missing_go_to_left
+        self.value = value
+        self.roots = roots
+        self.classes = classes
+        self.n_features = n_features
+        self.max_depth = max_depth
+
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+
+    @classmethod
+    def from_sklearn(cls, forest: RandomForestClassifier) -> "CompiledForest":
+        """  Flattens the fitted trees of `forest` into one set of node arrays.  """
+        try:
+            if forest.n_outputs_ != 1:
+                raise ValueError("Only single-output forests can be compiled")
+
+            features, thresholds, children, missing_lefts, values, roots = [], [], [], [], [], []
+            offset, max_depth = 0, 0
+            for estimator in forest.estimators_:
+                tree = estimator.tree_
+                is_leaf = tree.children_left == -1
+                node_ids = np.arange(tree.node_count)
+
+                features.append(np.where(is_leaf, 0, tree.feature))
+                thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+                children.append(np.column_stack([np.where(is_leaf, node_ids, tree.children_left),
+                                                 np.where(is_leaf, node_ids, tree.children_right)]) + offset)
+                missing_left = getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=np.uint8))
+                missing_lefts.append(np.where(is_leaf, 0, missing_left).astype(bool))
+
+                # Older sklearn versions store weighted counts and normalize in predict_proba
+                value = tree.value[:, 0, :forest.n_classes_]
+                normalizer = value.sum(axis=1)[:, np.newaxis]
+                if not np.allclose(normalizer, 1.0):
+                    normalizer[normalizer == 0.0] = 1.0
+                    value = value / normalizer
+                values.append(value)
+
+                roots.append(offset)
+                offset += tree.node_count
+                max_depth = max(max_depth, tree.max_depth)
+
+            compiled = cls(
+                feature=np.ascontiguousarray(np.concatenate(features), dtype=np.int32),
+                threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+                children=np.ascontiguousarray(np.concatenate(children), dtype=np.int32),
+                missing_go_to_left=np.ascontiguousarray(np.concatenate(missing_lefts)),
+                value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+                roots=np.asarray(roots, dtype=np.int32),
+                classes=np.asarray(forest.classes_),
+                n_features=forest.n_features_in_,
+                max_depth=max_depth,
+            )
+            logging.info(f"Compiled forest with {compiled.n_trees} trees and {compiled.n_nodes} nodes")
+            return compiled
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def get_arrays(self) -> Tuple[Dict[str, np.ndarray], dict]:
+        """  Returns the node arrays and the remaining metadata, for the memory-mappable model artifact.  """
+        arrays = {"feature": self.feature, "threshold": self.threshold, "children": self.children,
+                  "missing_go_to_left": self.missing_go_to_left, "value": self.value, "roots": self.roots}
+        return arrays, {"classes": self.classes.tolist(), "n_features": self.n_features, "max_depth": self.max_depth}
+
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], metadata: dict) -> "CompiledForest":
+        return cls(feature=arrays["feature"], threshold=arrays["threshold"], children=arrays["children"],
+                   missing_go_to_left=arrays["missing_go_to_left"], value=arrays["value"], roots=arrays["roots"],
+                   classes=np.asarray(metadata["classes"]), n_features=metadata["n_features"],
+                   max_depth=metadata["max_depth"])
+
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.get_arrays()[0].values())
+
+
+    def _extract(self, roots: np.ndarray, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 missing_go_to_left: np.ndarray, value: np.ndarray) -> "CompiledForest":
+        """  Keeps only the nodes reachable from `roots` (sorted by node id) and renumbers them.  """
+        reachable = np.zeros(len(feature), dtype=bool)
+        frontier, max_depth = roots, 0
+        while True:
+            reachable[frontier] = True
+            internal = frontier[children[frontier, 0] != frontier]
+            if not len(internal):
+                break
+            frontier = children[internal].ravel()
+            max_depth += 1
+
+        # Trees are contiguous node ranges in root order, so keeping node order keeps every tree contiguous
+        new_ids = (np.cumsum(reachable) - 1).astype(np.int32)
+        return CompiledForest(feature=np.ascontiguousarray(feature[reachable]),
+                              threshold=np.ascontiguousarray(threshold[reachable]),
+                              children=np.ascontiguousarray(new_ids[children[reachable]]),
+                              missing_go_to_left=np.ascontiguousarray(missing_go_to_left[reachable]),
+                              value=np.ascontiguousarray(value[reachable]),
+                              roots=new_ids[roots], classes=self.classes, n_features=self.n_features,
+                              max_depth=max_depth)
+
+
+    def select_trees(self, tree_indices: np.ndarray) -> "CompiledForest":
+        """  Returns a forest of the given trees only, kept in their original order.  """
+        roots = self.roots[np.unique(tree_indices)]
+        return self._extract(roots, self.feature, self.threshold, self.children, self.missing_go_to_left, self.value)
+
+
+    def merge_redundant_leaves(self) -> "CompiledForest":
+        """
+        Collapses every split whose two children are leaves with identical class probabilities into a
+        single leaf, repeatedly, so whole redundant subtrees disappear. Predictions do not change.
+        """
+        feature, threshold, children = self.feature.copy(), self.threshold.copy(), self.children.copy()
+        missing_go_to_left, value = self.missing_go_to_left.copy(), self.value.copy()
+        node_ids = np.arange(len(feature), dtype=children.dtype)
+
+        while True:
+            is_leaf = children[:, 0] == node_ids
+            left, right = children[:, 0], children[:, 1]
+            mergeable = np.flatnonzero(~is_leaf & is_leaf[left] & is_leaf[right]
+                                       & np.all(value[left] == value[right], axis=1))
+            if not len(mergeable):
+                break
+            value[mergeable] = value[left[mergeable]]
+            feature[mergeable], threshold[mergeable], missing_go_to_left[mergeable] = 0, np.inf, False
+            children[mergeable] = mergeable[:, np.newaxis]
+
+        return self._extract(self.roots, feature, threshold, children, missing_go_to_left, value)
+
+
+    def downcast(self, values: bool = False) -> "CompiledForest":
+        """
+        Returns a copy with float32 thresholds (and float32 leaf values if `values`). Thresholds are
+        rounded down to the nearest float32, so every float32 input takes the same branch as before;
+        float32 leaf values can change probabilities in the last digits and must be checked by the caller.
+        """
+        threshold = self.threshold.astype(np.float32)
+        rounded_up = threshold > self.threshold
+        threshold[rounded_up] = np.nextafter(threshold[rounded_up], np.float32(-np.inf))
+        return CompiledForest(feature=self.feature, threshold=threshold, children=self.children,
+                              missing_go_to_left=self.missing_go_to_left,
+                              value=self.value.astype(np.float32) if values else self.value, roots=self.roots,
+                              classes=self.classes, n_features=self.n_features, max_depth=self.max_depth)
+
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """  Returns the global leaf index reached by every sample in every tree, shape (n_samples, n_trees).  """
+        # sklearn evaluates trees on float32 inputs compared against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected input of shape (n_samples, {self.n_features}), got {X.shape}")
+
+        children = self.children.ravel()
+        check_missing = bool(self.missing_go_to_left.any())
+        leaves = np.empty((X.shape[0], self.n_trees), dtype=np.int32)
+
+        for start in range(0, X.shape[0], self.CHUNK_SIZE):
+            chunk = X[start:start + self.CHUNK_SIZE]
+            flat_chunk = chunk.ravel()
+            row_offsets = (np.arange(chunk.shape[0], dtype=np.int32) * self.n_features)[:, np.newaxis]
+
+            nodes = np.broadcast_to(self.roots, (chunk.shape[0], self.n_trees))
+            for _ in range(self.max_depth):
+                x = flat_chunk.take(row_offsets + self.feature.take(nodes))
+                # NaN fails `<=` and goes right, unless the split learned to send missing values left
+                go_right = np.logical_not(x <= self.threshold.take(nodes))
+                if check_missing:
+                    go_right &= ~(np.isnan(x) & self.missing_go_to_left.take(nodes))
+                nodes = children.take(2 * nodes + go_right)
+            leaves[start:start + chunk.shape[0]] = nodes
+
+        return leaves
+
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """  Averages leaf class probabilities over trees, accumulating in tree order like sklearn.  """
+        leaves = self.apply(X)
+        proba = np.zeros((leaves.shape[0], self.value.shape[1]), dtype=np.float64)
+        for tree_leaves in leaves.T:
+            proba += self.value.take(tree_leaves, axis=0)
+        proba /= self.n_trees
+        return proba
+
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
@@ -36,4 +36,15 @@ class MyException(Exception):
 
     def __str__(self) -> str:
         """ Returns the string representation of the error message. """
-        return self.error_message
\ No newline at end of file
+        return self.error_message
+
+    def __reduce__(self):
+        """ Pickles the formatted message only, so errors raised in process pool workers reach the caller. """
+        return _restore_exception, (self.error_message,)
+
+
+def _restore_exception(error_message: str) -> MyException:
+    exception = MyException.__new__(MyException)
+    Exception.__init__(exception, error_message)
+    exception.error_message = error_message
+    return exception
\ No newline at end of file
@@ -1,8 +1,13 @@
+import atexit
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from from_root import from_root
 from datetime import datetime
+from typing import Dict, List
 
 # Constants for log configuration
 LOG_DIR = 'logs'
@@ -10,36 +15,131 @@ LOG_FILE = f"{datetime.now().strftime('%m-%d-%Y_%H-%M-%S')}.log"
 MAX_LOG_SIZE = 5 * 1024 * 1024  # 5 MB
 BACKUP_COUNT = 3  # Number of backup log files to keep
 
+# Environment switches for the logging backend
+LOG_ASYNC_ENV_KEY = "LOG_ASYNC"  # "false" writes synchronously on the calling thread
+LOG_FORMAT_ENV_KEY = "LOG_FORMAT"  # "text" (default) or "json"
+LOG_SAMPLING_ENV_KEY = "LOG_SAMPLING"  # e.g. "estimator=0.01,prediction_pipeline=0.1"
+
 # Construct log file path
 log_dir_path = os.path.join(from_root(), LOG_DIR)
 os.makedirs(log_dir_path, exist_ok=True)
 log_file_path = os.path.join(log_dir_path, LOG_FILE)
 
+# Listener of the async backend in this process (a forked child starts its own)
+_log_listeners: List[QueueListener] = []
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of the records below WARNING for the configured loggers. Rules are keyed
+    by logger name or by module name, since most of the code logs through the root logger.
+    Warnings and errors are never dropped.
+    """
+
+    def __init__(self, sample_rates: Dict[str, float]):
+        super().__init__()
+        self.sample_rates = sample_rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.sample_rates.get(record.name, self.sample_rates.get(record.module))
+        return rate is None or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """  Formats each record as one JSON object per line.  """
+
+    def format(self, record: logging.LogRecord) -> str:
+        log_entry = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            log_entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(log_entry, default=str)
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """  Parses "name=rate,name=rate" into {name: rate}.  """
+    sample_rates = {}
+    for rule in filter(None, (rule.strip() for rule in value.split(","))):
+        name, rate = rule.split("=", 1)
+        sample_rates[name.strip()] = float(rate)
+    return sample_rates
+
+
 def configure_logger():
     """
     Configures logging with a rotating file handler and a console handler.
+
+    By default both handlers run on a background QueueListener thread: callers only put the record
+    on an in-memory queue, so request latency does not depend on disk or console I/O.
     """
     logger = logging.getLogger()
     logger.setLevel(logging.DEBUG)
-    
+
     # Define formatter
-    formatter = logging.Formatter(
-        "%(asctime)s | %(name)s | %(levelname)s | %(message)s"
-    )
+    if os.getenv(LOG_FORMAT_ENV_KEY, "text").lower() == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            "%(asctime)s | %(name)s | %(levelname)s | %(message)s"
+        )
 
     # File handler with rotation
     file_handler = RotatingFileHandler(log_file_path, maxBytes=MAX_LOG_SIZE, backupCount=BACKUP_COUNT)
     file_handler.setFormatter(formatter)
     file_handler.setLevel(logging.DEBUG)
-    
+
     # Console handler
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
     console_handler.setLevel(logging.INFO)
-    
-    # Add handlers to the logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+
+    sampling_filter = SamplingFilter(parse_sample_rates(os.getenv(LOG_SAMPLING_ENV_KEY, "")))
+
+    if os.getenv(LOG_ASYNC_ENV_KEY, "true").lower() == "false":
+        # Add handlers to the logger
+        for handler in (console_handler, file_handler):
+            handler.addFilter(sampling_filter)
+            logger.addHandler(handler)
+        return
+
+    # Sampled-out records are dropped before they are queued; the listener writes the rest
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(sampling_filter)
+    logger.addHandler(queue_handler)
+
+    def start_listener() -> QueueListener:
+        listener = QueueListener(queue_handler.queue, console_handler, file_handler, respect_handler_level=True)
+        listener.start()
+        return listener
+
+    _log_listeners.append(start_listener())
+    # Flush everything still queued when the process exits
+    atexit.register(stop_log_listener)
+
+    def restart_listener_in_child():
+        # A forked child (pre-fork server workers) inherits the queue but not the listener thread:
+        # it logs through a queue and listener of its own. Records still in the inherited queue
+        # belong to the parent, which writes them itself.
+        queue_handler.queue = queue.SimpleQueue()
+        _log_listeners[:] = [start_listener()]
+
+    os.register_at_fork(after_in_child=restart_listener_in_child)
+
+
+def stop_log_listener() -> None:
+    """  Writes out the queued records and stops the listener; call it before `os._exit`, which skips atexit.  """
+    while _log_listeners:
+        _log_listeners.pop().stop()
 
 
-configure_logger()
\ No newline at end of file
+configure_logger()
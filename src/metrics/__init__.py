@@ -0,0 +1,152 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.constants import METRICS_LATENCY_BUCKETS, METRICS_QUANTILE_WINDOW, METRICS_QUANTILES
+
+
+class LatencyHistogram:
+    """
+    Latency histogram with fixed Prometheus buckets plus a ring buffer of the most recent samples,
+    from which p50/p95/p99 are computed at scrape time. observe() is O(log buckets) under a lock.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = METRICS_LATENCY_BUCKETS, window: int = METRICS_QUANTILE_WINDOW):
+        self.buckets = buckets
+        self._bucket_counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._window = np.zeros(window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._bucket_counts[bisect_left(self.buckets, seconds)] += 1
+            self._window[self._count % len(self._window)] = seconds
+            self._sum += seconds
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        """  Returns cumulative bucket counts, sum, count and quantiles of the recent window.  """
+        with self._lock:
+            bucket_counts = list(self._bucket_counts)
+            total, count = self._sum, self._count
+            window = self._window[:min(count, len(self._window))].copy()
+        cumulative = np.cumsum(bucket_counts).tolist()
+        quantiles = {q: float(np.quantile(window, q)) if len(window) else 0.0 for q in METRICS_QUANTILES}
+        return {"buckets": cumulative, "sum": total, "count": count, "quantiles": quantiles}
+
+
+class _StageTimer:
+    """  Context manager recording the elapsed time of a block into a stage histogram.  """
+
+    __slots__ = ("_registry", "_stage", "_started_at")
+
+    def __init__(self, registry: "MetricsRegistry", stage: str):
+        self._registry = registry
+        self._stage = stage
+
+    def __enter__(self):
+        self._started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._registry.observe_stage(self._stage, time.perf_counter() - self._started_at)
+        return False
+
+
+class MetricsRegistry:
+    """
+    In-process serving metrics: per-stage latency histograms, labelled counters and the model
+    version being served, rendered in the Prometheus text exposition format.
+
+    Metrics are per process; in the "process" inference mode the stages that run inside the
+    inference workers (preprocess, model_predict, model_load) are recorded in those workers.
+    """
+
+    def __init__(self, namespace: str = "vehicle"):
+        self.namespace = namespace
+        self._stages: Dict[str, LatencyHistogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = defaultdict(float)
+        self._model_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def time_stage(self, stage: str) -> _StageTimer:
+        """  Usage: `with metrics.time_stage("preprocess"): ...`  """
+        return _StageTimer(self, stage)
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        histogram = self._stages.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._stages.setdefault(stage, LatencyHistogram())
+        histogram.observe(seconds)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += value
+
+    def set_model_version(self, version: str) -> None:
+        self._model_version = version
+
+    @staticmethod
+    def _format_labels(labels: Dict[str, object]) -> str:
+        if not labels:
+            return ""
+        escaped = {key: str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+                   for key, value in labels.items()}
+        return "{" + ",".join(f'{key}="{value}"' for key, value in escaped.items()) + "}"
+
+    def render_prometheus(self, extra_gauges: Optional[Dict[str, float]] = None) -> str:
+        """  Renders all metrics (plus optional extra gauges) in the Prometheus text format.  """
+        ns = self.namespace
+        lines: List[str] = []
+
+        with self._lock:
+            stages = dict(self._stages)
+            counters = dict(self._counters)
+
+        if stages:
+            histogram_name = f"{ns}_stage_duration_seconds"
+            summary_name = f"{ns}_stage_latency_seconds"
+            snapshots = {stage: histogram.snapshot() for stage, histogram in sorted(stages.items())}
+
+            lines += [f"# HELP {histogram_name} Duration of each serving stage.", f"# TYPE {histogram_name} histogram"]
+            for stage, snapshot in snapshots.items():
+                bounds = [*stages[stage].buckets, "+Inf"]
+                for bound, cumulative in zip(bounds, snapshot["buckets"]):
+                    lines.append(f"{histogram_name}_bucket{self._format_labels({'stage': stage, 'le': bound})} {cumulative}")
+                lines.append(f"{histogram_name}_sum{self._format_labels({'stage': stage})} {snapshot['sum']}")
+                lines.append(f"{histogram_name}_count{self._format_labels({'stage': stage})} {snapshot['count']}")
+
+            lines += [f"# HELP {summary_name} Latency quantiles of each serving stage over the most recent samples.",
+                      f"# TYPE {summary_name} summary"]
+            for stage, snapshot in snapshots.items():
+                for quantile, value in snapshot["quantiles"].items():
+                    lines.append(f"{summary_name}{self._format_labels({'stage': stage, 'quantile': quantile})} {value}")
+                lines.append(f"{summary_name}_sum{self._format_labels({'stage': stage})} {snapshot['sum']}")
+                lines.append(f"{summary_name}_count{self._format_labels({'stage': stage})} {snapshot['count']}")
+
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {ns}_{name} counter")
+            for (counter_name, labels), value in sorted(counters.items()):
+                if counter_name == name:
+                    lines.append(f"{ns}_{name}{self._format_labels(dict(labels))} {value}")
+
+        if self._model_version is not None:
+            lines += [f"# HELP {ns}_model_info Version of the model being served.", f"# TYPE {ns}_model_info gauge",
+                      f"{ns}_model_info{self._format_labels({'version': self._model_version})} 1"]
+
+        for name, value in sorted((extra_gauges or {}).items()):
+            lines += [f"# TYPE {ns}_{name} gauge", f"{ns}_{name} {value}"]
+
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry used by the serving path
+metrics = MetricsRegistry()
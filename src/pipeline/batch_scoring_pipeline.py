@@ -0,0 +1,244 @@
+import argparse
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from pandas import DataFrame
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+
+from src.configuration.mongo_db_connection import MongoDBClient
+from src.entity.config_entity import BatchScoringConfig, VehiclePredictorConfig
+from src.entity.estimator import MyModel
+from src.entity.model_cache import ModelCache
+from src.exception import MyException
+from src.logger import logging
+from src.pipeline.prediction_pipeline import VehicleBatchData
+
+
+@dataclass
+class BatchScoringSummary:
+    model_version: str = None
+    documents: int = 0
+    scored_documents: int = 0
+    invalid_documents: int = 0
+    invalid_batches: int = 0
+    batches: int = 0
+    matched_count: int = 0
+    modified_count: int = 0
+    seconds: float = 0.0
+    documents_per_sec: float = 0.0
+
+
+# Marks the end of the stream on the inter-stage queues
+_END_OF_STREAM = object()
+
+
+class BatchScoringPipeline:
+    """
+    Offline scoring of the whole vehicle collection with the production model.
+
+    Three threads connected by bounded queues overlap the work: a reader pulls documents with a
+    batched cursor, a scorer validates/feature-engineers each batch and runs one MyModel.predict,
+    and a writer sets `prediction` and `model_version` on every document with one unordered
+    bulk_write of UpdateOne ops per batch. The model is pinned at the start of the run, so every
+    document of a run is scored by the same version. Documents that fail validation get a null
+    prediction, so a stale prediction from an older model never survives a run; a batch that fails
+    validation as a whole is written (and counted) the same way instead of aborting the run.
+    """
+
+    def __init__(self, batch_scoring_config: BatchScoringConfig = BatchScoringConfig(),
+                 prediction_pipeline_config: VehiclePredictorConfig = VehiclePredictorConfig(),
+                 collection: Optional[Collection] = None,
+                 model_loader: Optional[Callable[[], Tuple[MyModel, str]]] = None):
+        """
+        :param collection: Collection to score; defaults to the configured collection of MongoDBClient.
+                           Any pymongo-compatible collection works (e.g. a local mongod or mongomock).
+        :param model_loader: Returns (model, version); defaults to the process-wide ModelCache.
+        """
+        try:
+            self.batch_scoring_config = batch_scoring_config
+            self.prediction_pipeline_config = prediction_pipeline_config
+            self.collection = collection
+            self.model_loader = model_loader
+            self.summary = BatchScoringSummary()
+            self._failed = threading.Event()
+            self._errors: List[BaseException] = []
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def _get_collection(self) -> Collection:
+        if self.collection is None:
+            mongo_client = MongoDBClient(database_name=self.batch_scoring_config.database_name)
+            self.collection = mongo_client.database[self.batch_scoring_config.collection_name]
+        return self.collection
+
+
+    def _load_model(self) -> Tuple[MyModel, str]:
+        if self.model_loader is not None:
+            return self.model_loader()
+        return ModelCache.get_instance(
+            bucket_name=self.prediction_pipeline_config.model_bucket_name,
+            model_path=self.prediction_pipeline_config.model_file_path,
+            revalidate_interval=self.prediction_pipeline_config.model_revalidate_interval,
+        ).get_model_and_version()
+
+
+    def _put(self, out_queue: queue.Queue, item: object) -> bool:
+        """  Blocking put that gives up once another stage has failed, so no thread hangs on a full queue.  """
+        while not self._failed.is_set():
+            try:
+                out_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+
+    def _get(self, in_queue: queue.Queue) -> object:
+        while not self._failed.is_set():
+            try:
+                return in_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END_OF_STREAM
+
+
+    def _read_batches(self) -> Iterator[DataFrame]:
+        """  Reads the raw model features (plus _id) with a batched cursor, one DataFrame per batch.  """
+        batch_size = self.batch_scoring_config.batch_size
+        raw_feature_columns = VehicleBatchData.get_raw_feature_columns()
+        projection = {col: 1 for col in raw_feature_columns}
+        cursor = self._get_collection().find({}, projection=projection, batch_size=batch_size)
+
+        # Fixed columns: a field missing from every document of a batch only invalidates its rows
+        columns = ["_id", *raw_feature_columns]
+        documents = []
+        for document in cursor:
+            documents.append(document)
+            if len(documents) == batch_size:
+                yield DataFrame.from_records(documents, columns=columns)
+                documents = []
+        if documents:
+            yield DataFrame.from_records(documents, columns=columns)
+
+
+    def _start_stage(self, name: str, target: Callable[[], None]) -> threading.Thread:
+        def run():
+            try:
+                target()
+            except BaseException as e:
+                logging.error(f"Batch scoring {name} failed: {e}")
+                self._errors.append(e)
+                self._failed.set()
+
+        thread = threading.Thread(target=run, name=f"batch-scoring-{name}", daemon=True)
+        thread.start()
+        return thread
+
+
+    def _reader(self, batches: queue.Queue) -> None:
+        for batch in self._read_batches():
+            if not self._put(batches, batch):
+                return
+        self._put(batches, _END_OF_STREAM)
+
+
+    def _scorer(self, batches: queue.Queue, scored_batches: queue.Queue, model: MyModel) -> None:
+        while True:
+            batch = self._get(batches)
+            if batch is _END_OF_STREAM:
+                self._put(scored_batches, _END_OF_STREAM)
+                return
+
+            batch_data = VehicleBatchData(batch.drop(columns=["_id"]),
+                                          ignore_unknown_columns=True, drop_invalid_rows=True)
+            predictions = np.full(len(batch), None, dtype=object)
+            if not batch_data.validate():
+                logging.warning(f"Batch scoring skipped a batch of {len(batch)} documents: {'; '.join(batch_data.errors)}")
+                self.summary.invalid_batches += 1
+            elif len(batch_data.input_df):
+                predictions[batch_data.valid_mask] = np.asarray(model.predict(batch_data.input_df)).astype(int).tolist()
+            if not self._put(scored_batches, (batch["_id"].tolist(), predictions.tolist())):
+                return
+
+
+    def _writer(self, scored_batches: queue.Queue, model_version: str) -> None:
+        collection = self._get_collection()
+        prediction_field = self.batch_scoring_config.prediction_field
+        model_version_field = self.batch_scoring_config.model_version_field
+
+        while True:
+            scored_batch = self._get(scored_batches)
+            if scored_batch is _END_OF_STREAM:
+                return
+
+            ids, predictions = scored_batch
+            result = collection.bulk_write(
+                [UpdateOne({"_id": _id}, {"$set": {prediction_field: prediction, model_version_field: model_version}})
+                 for _id, prediction in zip(ids, predictions)],
+                ordered=False,
+            )
+
+            scored_documents = sum(prediction is not None for prediction in predictions)
+            self.summary.documents += len(ids)
+            self.summary.scored_documents += scored_documents
+            self.summary.invalid_documents += len(ids) - scored_documents
+            self.summary.batches += 1
+            self.summary.matched_count += result.matched_count
+            self.summary.modified_count += result.modified_count
+            logging.info(f"Batch scoring wrote batch {self.summary.batches} ({len(ids)} documents)")
+
+
+    def run_pipeline(self) -> BatchScoringSummary:
+        """  Scores every document of the collection and writes the predictions back.  """
+        try:
+            logging.info("Entered run_pipeline method of BatchScoringPipeline class")
+            started_at = time.perf_counter()
+            model, model_version = self._load_model()
+            self.summary = BatchScoringSummary(model_version=model_version)
+            self._failed.clear()
+            self._errors = []
+
+            max_queued_batches = self.batch_scoring_config.max_queued_batches
+            batches = queue.Queue(maxsize=max_queued_batches)
+            scored_batches = queue.Queue(maxsize=max_queued_batches)
+            threads = [
+                self._start_stage("reader", lambda: self._reader(batches)),
+                self._start_stage("scorer", lambda: self._scorer(batches, scored_batches, model)),
+                self._start_stage("writer", lambda: self._writer(scored_batches, model_version)),
+            ]
+            for thread in threads:
+                thread.join()
+            if self._errors:
+                raise self._errors[0]
+
+            self.summary.seconds = time.perf_counter() - started_at
+            self.summary.documents_per_sec = self.summary.documents / self.summary.seconds if self.summary.seconds else 0.0
+            logging.info(f"Batch scoring finished: {self.summary}")
+            logging.info("Exited run_pipeline method of BatchScoringPipeline class")
+            return self.summary
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Score the MongoDB vehicle collection and write predictions back")
+    parser.add_argument("--batch-size", type=int, default=BatchScoringConfig.batch_size)
+    parser.add_argument("--max-queued-batches", type=int, default=BatchScoringConfig.max_queued_batches)
+    args = parser.parse_args()
+
+    summary = BatchScoringPipeline(BatchScoringConfig(batch_size=args.batch_size,
+                                                      max_queued_batches=args.max_queued_batches)).run_pipeline()
+    print(summary, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import BinaryIO, Iterator, List, Union
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.constants import BULK_SCORING_CHUNK_SIZE
+from src.entity.config_entity import VehiclePredictorConfig
+from src.exception import MyException
+from src.logger import logging
+from src.pipeline.prediction_pipeline import VehicleBatchData, VehicleDataClassifier
+
+
+@dataclass
+class BulkScoringSummary:
+    rows: int = 0
+    scored_rows: int = 0
+    invalid_rows: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+    rows_per_sec: float = 0.0
+
+
+class BulkScorer:
+    """
+    Scores a CSV file in fixed-size chunks so memory stays flat regardless of file size.
+
+    Each chunk goes through the same validation/feature engineering as the batch endpoint
+    (VehicleBatchData) and one VehicleDataClassifier.predict call. Input may be in the raw dataset
+    layout or the model input layout; extra columns are ignored. Every input row yields one output
+    row with its `row` number, `id` (if the input has one) and `prediction`, which is empty for rows
+    that failed validation.
+    """
+
+    OUTPUT_FORMATS = ("csv", "ndjson")
+    MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+    def __init__(self, chunk_size: int = BULK_SCORING_CHUNK_SIZE,
+                 prediction_pipeline_config: VehiclePredictorConfig = VehiclePredictorConfig()):
+        self.chunk_size = chunk_size
+        self.classifier = VehicleDataClassifier(prediction_pipeline_config=prediction_pipeline_config)
+        self.summary = BulkScoringSummary()
+
+
+    @staticmethod
+    def check_columns(source: Union[str, BinaryIO]) -> List[str]:
+        """  Reads only the header and returns the missing model input columns. File objects are rewound.  """
+        try:
+            header = pd.read_csv(source, nrows=0)
+            if hasattr(source, "seek"):
+                source.seek(0)
+            columns = set(header.columns)
+            if "Vehicle_Age" in columns:
+                columns.update(VehicleBatchData.VEHICLE_AGE_DUMMIES)
+            if "Vehicle_Damage" in columns:
+                columns.update(VehicleBatchData.VEHICLE_DAMAGE_DUMMIES)
+            return [col for col in VehicleBatchData.get_prediction_columns() if col not in columns]
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def score_chunks(self, source: Union[str, BinaryIO]) -> Iterator[DataFrame]:
+        """  Yields one scored DataFrame per input chunk and keeps `self.summary` up to date.  """
+        try:
+            self.summary = BulkScoringSummary()
+            started_at = time.perf_counter()
+
+            for chunk in pd.read_csv(source, chunksize=self.chunk_size):
+                batch_data = VehicleBatchData(chunk, ignore_unknown_columns=True, drop_invalid_rows=True)
+                if not batch_data.validate():
+                    raise ValueError("; ".join(batch_data.errors))
+
+                predictions = np.full(len(chunk), np.nan)
+                if len(batch_data.input_df):
+                    predictions[batch_data.valid_mask] = self.classifier.predict(dataframe=batch_data.input_df)
+
+                scored = DataFrame({"row": np.arange(self.summary.rows, self.summary.rows + len(chunk))})
+                if "id" in chunk.columns:
+                    scored["id"] = chunk["id"].to_numpy()
+                scored["prediction"] = pd.array(predictions, dtype="Float64").astype("Int64")
+
+                scored_rows = int(batch_data.valid_mask.sum())
+                self.summary.rows += len(chunk)
+                self.summary.scored_rows += scored_rows
+                self.summary.invalid_rows += len(chunk) - scored_rows
+                self.summary.chunks += 1
+                self.summary.seconds = time.perf_counter() - started_at
+                self.summary.rows_per_sec = self.summary.rows / self.summary.seconds if self.summary.seconds else 0.0
+                yield scored
+
+            logging.info(f"Bulk scoring finished: {self.summary}")
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def stream(self, source: Union[str, BinaryIO], output_format: str = "csv") -> Iterator[bytes]:
+        """  Yields the encoded predictions chunk by chunk; NDJSON output ends with a summary line.  """
+        if output_format not in self.OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format '{output_format}', expected one of {self.OUTPUT_FORMATS}")
+
+        for i, scored in enumerate(self.score_chunks(source)):
+            if output_format == "csv":
+                yield scored.to_csv(index=False, header=(i == 0)).encode()
+            else:
+                yield scored.to_json(orient="records", lines=True).encode()
+
+        if output_format == "ndjson":
+            yield (json.dumps({"summary": asdict(self.summary)}) + "\n").encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Score a CSV file with the production model in chunks")
+    parser.add_argument("input", help="CSV file to score")
+    parser.add_argument("--output", help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=BulkScorer.OUTPUT_FORMATS, default="csv")
+    parser.add_argument("--chunk-size", type=int, default=BULK_SCORING_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    scorer = BulkScorer(chunk_size=args.chunk_size)
+    missing_columns = scorer.check_columns(args.input)
+    if missing_columns:
+        parser.error(f"Input is missing columns: {missing_columns}")
+
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for data in scorer.stream(args.input, output_format=args.format):
+            output.write(data)
+    finally:
+        if args.output:
+            output.close()
+
+    summary = scorer.summary
+    print(f"Scored {summary.scored_rows}/{summary.rows} rows ({summary.invalid_rows} invalid) in "
+          f"{summary.seconds:.2f}s: {summary.rows_per_sec:,.0f} rows/sec", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import asyncio
+import multiprocessing
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+from pandas import DataFrame
+
+from src.entity.config_entity import InferenceExecutorConfig, VehiclePredictorConfig
+from src.exception import MyException
+from src.logger import logging
+from src.pipeline.prediction_pipeline import VehicleDataClassifier
+
+
+def _warm_up(prediction_pipeline_config: VehiclePredictorConfig) -> Dict[str, object]:
+    return {**VehicleDataClassifier(prediction_pipeline_config=prediction_pipeline_config).warm_up(),
+            "pid": os.getpid()}
+
+
+def _predict(prediction_pipeline_config: VehiclePredictorConfig, dataframe: DataFrame) -> np.ndarray:
+    return VehicleDataClassifier(prediction_pipeline_config=prediction_pipeline_config).predict(dataframe=dataframe)
+
+
+class InferenceExecutor:
+    """
+    Runs VehicleDataClassifier.predict off the event loop.
+
+    - "thread" mode uses a ThreadPoolExecutor; sklearn/numpy release the GIL for most of the work
+      and all threads share the single process-wide model cache.
+    - "process" mode uses a ProcessPoolExecutor whose workers each load their own MyModel.
+
+    start() only creates the pool; the model is loaded by warm_up, which the app retries until
+    it succeeds, so an unavailable S3 delays readiness instead of aborting startup.
+    """
+
+    # Rounds of warm_up submissions before giving up on reaching every worker process
+    WARM_UP_ATTEMPTS_PER_WORKER = 3
+
+    EXECUTION_MODES = ("thread", "process")
+
+    def __init__(self, inference_executor_config: InferenceExecutorConfig = InferenceExecutorConfig(),
+                 prediction_pipeline_config: VehiclePredictorConfig = VehiclePredictorConfig()):
+        self.inference_executor_config = inference_executor_config
+        self.prediction_pipeline_config = prediction_pipeline_config
+        self._executor: Optional[Executor] = None
+
+
+    def start(self) -> None:
+        """  Creates the worker pool selected by the configured execution mode.  """
+        try:
+            mode = self.inference_executor_config.execution_mode
+            pool_size = self.inference_executor_config.pool_size
+            if mode not in self.EXECUTION_MODES:
+                raise ValueError(f"Unknown inference execution mode '{mode}', expected one of {self.EXECUTION_MODES}")
+
+            if mode == "process":
+                # spawn, so workers don't inherit the event loop and threads of the serving process
+                self._executor = ProcessPoolExecutor(max_workers=pool_size,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="inference")
+
+            logging.info(f"Inference executor started in '{mode}' mode with {pool_size} workers")
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            logging.info("Inference executor stopped")
+
+
+    async def warm_up(self) -> Dict[str, object]:
+        """
+        Loads and warms the model where predictions will run: once for the shared thread pool model,
+        in every worker process in process mode (tasks are resubmitted until each process has run one).
+        Returns the timings of the slowest warm-up.
+        """
+        try:
+            if self._executor is None:
+                raise RuntimeError("Inference executor is not running")
+
+            loop = asyncio.get_running_loop()
+            workers = 1 if self.inference_executor_config.execution_mode == "thread" else self.inference_executor_config.pool_size
+            results: Dict[int, Dict[str, object]] = {}
+            for _ in range(self.WARM_UP_ATTEMPTS_PER_WORKER):
+                runs = await asyncio.gather(*[loop.run_in_executor(self._executor, _warm_up, self.prediction_pipeline_config)
+                                              for _ in range(workers - len(results))])
+                for result in runs:
+                    results.setdefault(result.pop("pid"), result)
+                if len(results) >= workers:
+                    break
+            else:
+                logging.warning(f"Model warmed up in {len(results)} of {workers} inference workers")
+            return max(results.values(), key=lambda result: result["model_load_seconds"] + result["warm_up_seconds"])
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    async def predict(self, dataframe: DataFrame) -> np.ndarray:
+        """  Runs the prediction on the worker pool and awaits the result without blocking the event loop.  """
+        try:
+            if self._executor is None:
+                raise RuntimeError("Inference executor is not running")
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, _predict, self.prediction_pipeline_config, dataframe)
+
+        except Exception as e:
+            raise MyException(e, sys) from e
@@ -0,0 +1,210 @@
+import asyncio
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.entity.config_entity import MicroBatcherConfig
+from src.exception import MyException
+from src.logger import logging
+
+
+@dataclass
+class _PendingPrediction:
+    dataframe: DataFrame
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class PredictionMicroBatcher:
+    """
+    Coalesces concurrent prediction requests into one vectorized predict call.
+
+    Requests are queued; a single consumer task collects everything that arrives within
+    `max_wait_ms` of the first queued request (up to `max_batch_size` rows), awaits `predict_fn`
+    once on the concatenated frame and hands every caller back the slice for its own rows.
+    If the combined call fails, every request of the batch is retried on its own, so a malformed
+    request only fails its own caller. At most `max_concurrent_batches` batches are in flight at a time.
+    """
+
+    def __init__(self, predict_fn: Callable[[DataFrame], Awaitable[np.ndarray]],
+                 micro_batcher_config: MicroBatcherConfig = MicroBatcherConfig()):
+        self.predict_fn = predict_fn
+        self.micro_batcher_config = micro_batcher_config
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._metrics = {
+            "batches_total": 0,
+            "requests_total": 0,
+            "rows_total": 0,
+            "batch_size_last": 0,
+            "batch_size_max": 0,
+            "queue_depth_max": 0,
+            "wait_ms_sum": 0.0,
+            "wait_ms_max": 0.0,
+            "predict_ms_sum": 0.0,
+            "batch_fallbacks_total": 0,
+        }
+
+
+    async def start(self) -> None:
+        """  Creates the request queue and starts the consumer task on the running event loop.  """
+        self._queue = asyncio.Queue(maxsize=self.micro_batcher_config.max_queue_size)
+        self._consumer = asyncio.create_task(self._consume())
+        logging.info(f"Prediction micro-batcher started with {self.micro_batcher_config}")
+
+
+    async def stop(self) -> None:
+        """  Stops the consumer task. Requests it had not started predicting yet are failed.  """
+        if self._consumer is not None:
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+            self._consumer = None
+
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+        while self._queue is not None and not self._queue.empty():
+            self._fail_stopped([self._queue.get_nowait()])
+        logging.info("Prediction micro-batcher stopped")
+
+
+    async def predict(self, dataframe: DataFrame) -> np.ndarray:
+        """  Queues the rows of `dataframe` and waits for their predictions.  """
+        try:
+            if self._consumer is None:
+                raise RuntimeError("Prediction micro-batcher is not running")
+
+            future = asyncio.get_running_loop().create_future()
+            await self._queue.put(_PendingPrediction(dataframe=dataframe, future=future))
+            self._metrics["queue_depth_max"] = max(self._metrics["queue_depth_max"], self._queue.qsize())
+            return await future
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    @staticmethod
+    def _fail_stopped(batch: List[_PendingPrediction]) -> None:
+        for pending in batch:
+            if not pending.future.done():
+                pending.future.set_exception(RuntimeError("Prediction micro-batcher stopped"))
+
+
+    async def _collect_batch(self) -> List[_PendingPrediction]:
+        """  Waits for one request, then gathers more until the batch is full or the wait window closes.  """
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        try:
+            rows = len(batch[0].dataframe)
+            deadline = loop.time() + self.micro_batcher_config.max_wait_ms / 1000
+
+            while rows < self.micro_batcher_config.max_batch_size:
+                if not self._queue.empty():
+                    pending = self._queue.get_nowait()
+                else:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        pending = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                batch.append(pending)
+                rows += len(pending.dataframe)
+
+        except asyncio.CancelledError:
+            # Stopped while collecting: these requests already left the queue, so stop() can't fail them
+            self._fail_stopped(batch)
+            raise
+
+        return batch
+
+
+    async def _consume(self) -> None:
+        slots = asyncio.Semaphore(self.micro_batcher_config.max_concurrent_batches)
+        while True:
+            await slots.acquire()
+            batch = await self._collect_batch()
+            batch = [pending for pending in batch if not pending.future.done()]
+            if not batch:
+                slots.release()
+                continue
+
+            task = asyncio.create_task(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+
+    async def _run_batch(self, batch: List[_PendingPrediction]) -> None:
+        """  Runs one predict call for the whole batch and resolves each caller's future with its rows.  """
+        started_at = time.perf_counter()
+        try:
+            dataframe = pd.concat([pending.dataframe for pending in batch], ignore_index=True)
+            predictions = np.asarray(await self.predict_fn(dataframe))
+
+            offset = 0
+            for pending in batch:
+                rows = len(pending.dataframe)
+                if not pending.future.done():
+                    pending.future.set_result(predictions[offset:offset + rows])
+                offset += rows
+
+        except Exception as e:
+            if len(batch) == 1:
+                logging.error(f"Micro-batch prediction failed: {e}")
+                if not batch[0].future.done():
+                    batch[0].future.set_exception(e)
+            else:
+                logging.warning(f"Micro-batch prediction failed for {len(batch)} requests, predicting them one by one: {e}")
+                self._metrics["batch_fallbacks_total"] += 1
+                await asyncio.gather(*(self._run_single(pending) for pending in batch))
+
+        finished_at = time.perf_counter()
+        self._record(batch, started_at, finished_at)
+
+
+    async def _run_single(self, pending: _PendingPrediction) -> None:
+        """  Predicts one request on its own; its failure is only raised to its own caller.  """
+        try:
+            predictions = np.asarray(await self.predict_fn(pending.dataframe))
+            if not pending.future.done():
+                pending.future.set_result(predictions)
+        except Exception as e:
+            logging.error(f"Prediction failed for a request of the failed micro-batch: {e}")
+            if not pending.future.done():
+                pending.future.set_exception(e)
+
+
+    def _record(self, batch: List[_PendingPrediction], started_at: float, finished_at: float) -> None:
+        rows = sum(len(pending.dataframe) for pending in batch)
+        waits_ms = [(started_at - pending.enqueued_at) * 1000 for pending in batch]
+        metrics = self._metrics
+        metrics["batches_total"] += 1
+        metrics["requests_total"] += len(batch)
+        metrics["rows_total"] += rows
+        metrics["batch_size_last"] = rows
+        metrics["batch_size_max"] = max(metrics["batch_size_max"], rows)
+        metrics["wait_ms_sum"] += sum(waits_ms)
+        metrics["wait_ms_max"] = max(metrics["wait_ms_max"], max(waits_ms))
+        metrics["predict_ms_sum"] += (finished_at - started_at) * 1000
+
+
+    def get_metrics(self) -> dict:
+        """  Returns batch size, queue depth and wait time statistics since startup.  """
+        metrics = dict(self._metrics)
+        batches, requests = metrics["batches_total"], metrics["requests_total"]
+        metrics["queue_depth"] = 0 if self._queue is None else self._queue.qsize()
+        metrics["batch_size_avg"] = metrics["rows_total"] / batches if batches else 0.0
+        metrics["wait_ms_avg"] = metrics["wait_ms_sum"] / requests if requests else 0.0
+        metrics["predict_ms_avg"] = metrics["predict_ms_sum"] / batches if batches else 0.0
+        return metrics
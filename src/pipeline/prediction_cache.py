@@ -0,0 +1,128 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+from pandas import DataFrame
+
+from src.entity.estimator import MyModel
+from src.entity.model_cache import ModelCache
+from src.exception import MyException
+from src.logger import logging
+
+
+class PredictionResultCache:
+    """
+    Bounded LRU cache of prediction results with an optional TTL.
+
+    Entries are keyed on (model version, normalized feature tuple), where the feature tuple holds
+    the row's values as floats in a fixed column order, so "35", 35 and 35.0 share an entry, and
+    missing values as None. The cache is cleared whenever the model cache it is bound to swaps
+    in a new model version.
+    """
+
+    _instances: Dict[Tuple[int, float], "PredictionResultCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[object, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._metrics = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+        self._bound_model_caches: List[ModelCache] = []
+        self._bind_lock = threading.Lock()
+
+
+    @classmethod
+    def get_instance(cls, max_size: int, ttl_seconds: float) -> "PredictionResultCache":
+        """  Returns the process-wide cache for the given size/TTL, creating it on first use.  """
+        key = (max_size, ttl_seconds)
+        cache = cls._instances.get(key)
+        if cache is None:
+            with cls._instances_lock:
+                cache = cls._instances.setdefault(key, cls(max_size=max_size, ttl_seconds=ttl_seconds))
+        return cache
+
+
+    def bind(self, model_cache: ModelCache) -> None:
+        """  Registers `clear` as a swap listener of `model_cache`, once per model cache.  """
+        if any(bound is model_cache for bound in self._bound_model_caches):
+            return
+        with self._bind_lock:
+            if not any(bound is model_cache for bound in self._bound_model_caches):
+                model_cache.add_swap_listener(self.clear)
+                self._bound_model_caches.append(model_cache)
+
+
+    def clear(self, version: Optional[str] = None) -> None:
+        """  Drops all entries. Registered as a model swap listener, hence the version argument.  """
+        with self._lock:
+            self._entries.clear()
+            self._metrics["invalidations"] += 1
+        logging.info(f"Prediction result cache invalidated for model version {version}")
+
+
+    def _get(self, key: Hashable, now: float) -> Optional[object]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < now:
+            del self._entries[key]
+            self._metrics["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+
+    def _put(self, key: Hashable, value: object, now: float) -> None:
+        self._entries[key] = (value, now + self.ttl_seconds if self.ttl_seconds > 0 else float("inf"))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._metrics["evictions"] += 1
+
+
+    def predict(self, model: MyModel, version: str, dataframe: DataFrame, columns: List[str]) -> np.ndarray:
+        """  Serves cached rows and runs one model.predict for all misses.  """
+        try:
+            features = dataframe[columns].to_numpy(dtype=np.float64)
+            rows = features.tolist()
+            # NaN never equals itself (nor hashes alike), so missing values are keyed as None
+            for i in np.flatnonzero(np.isnan(features).any(axis=1)):
+                rows[i] = [None if value != value else value for value in rows[i]]
+            keys = [(version, *row) for row in rows]
+
+            now = time.monotonic()
+            with self._lock:
+                cached = [self._get(key, now) for key in keys]
+            misses = [i for i, value in enumerate(cached) if value is None]
+
+            with self._lock:
+                self._metrics["hits"] += len(keys) - len(misses)
+                self._metrics["misses"] += len(misses)
+
+            if misses:
+                predictions = np.asarray(model.predict(dataframe.iloc[misses]))
+                now = time.monotonic()
+                with self._lock:
+                    for i, prediction in zip(misses, predictions.tolist()):
+                        self._put(keys[i], prediction, now)
+                        cached[i] = prediction
+
+            return np.asarray(cached)
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["size"] = len(self._entries)
+        lookups = metrics["hits"] + metrics["misses"]
+        metrics["hit_ratio"] = metrics["hits"] / lookups if lookups else 0.0
+        return metrics
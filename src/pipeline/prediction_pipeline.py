@@ -1,8 +1,17 @@
 import sys
+import time
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from src.constants import MODEL_WARM_UP_BATCH_SIZES
 from src.entity.config_entity import VehiclePredictorConfig
-from src.entity.s3_estimator import VehicleDataEstimator
+from src.entity.model_cache import ModelCache
+from src.entity.schema import DataSchema
+from src.pipeline.prediction_cache import PredictionResultCache
 from src.exception import MyException
 from src.logger import logging
+from src.metrics import metrics
 from pandas import DataFrame
 
 class VehicleData:
@@ -68,13 +77,164 @@ class VehicleData:
         """  This function returns a DataFrame from VehicleData class input. """
         try:
             
-            vehicle_input_dict = self.get_vehicle_data_as_dict()
-            return DataFrame(vehicle_input_dict)
+            with metrics.time_stage("dataframe_build"):
+                vehicle_input_dict = self.get_vehicle_data_as_dict()
+                return DataFrame(vehicle_input_dict)
         
         except Exception as e:
             raise MyException(e, sys) from e
 
 
+class VehicleBatchData:
+    """
+    Batch counterpart of VehicleData. Accepts a list of records, a dict of column arrays or a DataFrame,
+    validates every row against `prediction_columns` in config/schema.yaml in one vectorized pass
+    and builds a single model input DataFrame for the whole batch.
+
+    Rows in the raw dataset layout (Gender as Male/Female, Vehicle_Age and Vehicle_Damage as text)
+    are feature-engineered into the model input layout first.
+    """
+
+    # Raw dataset categories -> model input columns, matching the dummies created in DataTransformation
+    GENDER_MAPPING = {"Female": 0, "Male": 1}
+    VEHICLE_AGE_DUMMIES = {"Vehicle_Age_lt_1_Year": "< 1 Year", "Vehicle_Age_gt_2_Years": "> 2 Years"}
+    VEHICLE_DAMAGE_DUMMIES = {"Vehicle_Damage_Yes": "Yes"}
+
+    def __init__(self, payload: Union[List[dict], Dict[str, list], DataFrame],
+                 ignore_unknown_columns: bool = False, drop_invalid_rows: bool = False):
+        """
+        :param ignore_unknown_columns: Silently ignore columns that are not model inputs (e.g. id, Response).
+        :param drop_invalid_rows: Leave rows with invalid values out of the input DataFrame instead of failing
+                                  the batch; `valid_mask` tells which input rows were kept.
+        """
+        try:
+            self.payload = payload
+            self.ignore_unknown_columns = ignore_unknown_columns
+            self.drop_invalid_rows = drop_invalid_rows
+            self.errors: List[str] = []
+            self.input_df: DataFrame = None
+            self.valid_mask: np.ndarray = None
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    @classmethod
+    def get_prediction_columns(cls) -> Dict[str, str]:
+        """  Returns {column: type} of the model input features from the compiled schema.  """
+        return DataSchema.get_instance().prediction_columns
+
+
+    @classmethod
+    def get_raw_feature_columns(cls) -> List[str]:
+        """  Returns the raw dataset columns that engineer_raw_features turns into the model input features.  """
+        dummies = {**cls.VEHICLE_AGE_DUMMIES, **cls.VEHICLE_DAMAGE_DUMMIES}
+        return [col for col in cls.get_prediction_columns() if col not in dummies] + ["Vehicle_Age", "Vehicle_Damage"]
+
+
+    @classmethod
+    def engineer_raw_features(cls, raw_df: DataFrame) -> DataFrame:
+        """
+        Converts raw dataset columns into model input columns. Unlike pd.get_dummies, the encoding
+        does not depend on which categories happen to appear in the batch, so it is chunk-safe.
+        Unknown categories become NaN and are reported by validation.
+        """
+        df = raw_df.copy()
+        if not pd.api.types.is_numeric_dtype(df["Gender"]):
+            df["Gender"] = df["Gender"].map(cls.GENDER_MAPPING)
+        if "Vehicle_Age" in df.columns:
+            vehicle_age = df.pop("Vehicle_Age")
+            known = vehicle_age.isin(["1-2 Year", *cls.VEHICLE_AGE_DUMMIES.values()])
+            for col, category in cls.VEHICLE_AGE_DUMMIES.items():
+                df[col] = (vehicle_age == category).astype("float64").where(known)
+        if "Vehicle_Damage" in df.columns:
+            vehicle_damage = df.pop("Vehicle_Damage")
+            known = vehicle_damage.isin(["Yes", "No"])
+            for col, category in cls.VEHICLE_DAMAGE_DUMMIES.items():
+                df[col] = (vehicle_damage == category).astype("float64").where(known)
+        return df
+
+
+    def _build_raw_dataframe(self) -> DataFrame:
+        if isinstance(self.payload, DataFrame):
+            return self.payload
+        if isinstance(self.payload, list):
+            return DataFrame.from_records(self.payload)
+        if isinstance(self.payload, dict):
+            return DataFrame(self.payload)
+        raise ValueError("Payload must be a list of records or a dict of column arrays")
+
+
+    def validate(self) -> bool:
+        """  Validates and coerces the batch. Errors are collected in `self.errors` instead of being raised.  """
+        try:
+            prediction_columns = self.get_prediction_columns()
+            self.errors = []
+
+            try:
+                raw_df = self._build_raw_dataframe()
+            except (TypeError, ValueError) as e:
+                self.errors.append(f"{e}")
+                return False
+
+            if raw_df.empty:
+                self.errors.append("Batch contains no rows")
+                return False
+
+            if "Vehicle_Age" in raw_df.columns or "Vehicle_Damage" in raw_df.columns:
+                raw_df = self.engineer_raw_features(raw_df)
+
+            missing_columns = [col for col in prediction_columns if col not in raw_df.columns]
+            unknown_columns = [col for col in raw_df.columns if col not in prediction_columns]
+            if missing_columns:
+                self.errors.append(f"Missing columns: {missing_columns}")
+            if unknown_columns and not self.ignore_unknown_columns:
+                self.errors.append(f"Unknown columns: {unknown_columns}")
+            if self.errors:
+                return False
+
+            columns = {}
+            invalid_rows = np.zeros(len(raw_df), dtype=bool)
+            for col, dtype in prediction_columns.items():
+                values = pd.to_numeric(raw_df[col], errors="coerce").astype("float64")
+                array = values.to_numpy()
+                invalid = np.isnan(array)
+                if dtype == "int":
+                    invalid |= array != np.floor(array)
+                if invalid.any():
+                    bad_rows = np.flatnonzero(invalid)
+                    self.errors.append(f"Column '{col}' has invalid {dtype} values at rows {bad_rows[:10].tolist()}"
+                                       + (f" (+{len(bad_rows) - 10} more)" if len(bad_rows) > 10 else ""))
+                    invalid_rows |= invalid
+                columns[col] = values
+
+            if self.errors and not self.drop_invalid_rows:
+                return False
+
+            self.valid_mask = ~invalid_rows
+            input_columns = {}
+            for (col, dtype), values in zip(prediction_columns.items(), columns.values()):
+                array = values.to_numpy()[self.valid_mask]
+                # int features take the smallest exact int dtype; floats stay float64, the precision the model was fit in
+                input_columns[col] = array.astype(DataSchema.smallest_dtype(array, "int") if dtype == "int" else np.float64)
+            self.input_df = DataFrame(input_columns, columns=list(prediction_columns))
+            return True
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def get_vehicle_input_data_frame(self) -> DataFrame:
+        """  Returns the validated model input DataFrame for the whole batch.  """
+        try:
+            if self.input_df is None and not self.validate():
+                raise ValueError("; ".join(self.errors))
+            return self.input_df
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
 class VehicleDataClassifier:
     def __init__(self, prediction_pipeline_config: VehiclePredictorConfig = VehiclePredictorConfig()) -> None:
         
@@ -84,15 +244,71 @@ class VehicleDataClassifier:
         except Exception as e:
             raise MyException(e, sys)
 
+    def get_model_cache(self) -> ModelCache:
+        """  Returns the process-wide cache of the configured production model.  """
+        return ModelCache.get_instance(
+            bucket_name=self.prediction_pipeline_config.model_bucket_name,
+            model_path=self.prediction_pipeline_config.model_file_path,
+            revalidate_interval=self.prediction_pipeline_config.model_revalidate_interval,
+        )
+
+
+    def get_result_cache(self) -> Optional[PredictionResultCache]:
+        """  Returns the process-wide result cache if enabled, wiring its invalidation to model swaps once.  """
+        if not self.prediction_pipeline_config.result_cache_enabled:
+            return None
+
+        result_cache = PredictionResultCache.get_instance(
+            max_size=self.prediction_pipeline_config.result_cache_max_size,
+            ttl_seconds=self.prediction_pipeline_config.result_cache_ttl_seconds,
+        )
+        result_cache.bind(self.get_model_cache())
+        return result_cache
+
+
+    def preload_model(self) -> None:
+        """  Loads the production model into the process-wide model cache ahead of the first request. """
+        try:
+            self.get_model_cache().get_model()
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+
+    def warm_up(self, batch_sizes: tuple = MODEL_WARM_UP_BATCH_SIZES) -> Dict[str, object]:
+        """
+        Loads the production model and runs throwaway predictions on synthetic batches, so the
+        first real request hits a hot model. Bypasses the result cache. Returns version and timings.
+        """
+        try:
+            started_at = time.perf_counter()
+            model, version = self.get_model_cache().get_model_and_version()
+            loaded_at = time.perf_counter()
+
+            prediction_columns = VehicleBatchData.get_prediction_columns()
+            for batch_size in batch_sizes:
+                model.predict(DataFrame({col: np.zeros(batch_size, dtype="int64" if dtype == "int" else "float64")
+                                         for col, dtype in prediction_columns.items()}))
+
+            return {"model_version": version,
+                    "model_load_seconds": loaded_at - started_at,
+                    "warm_up_seconds": time.perf_counter() - loaded_at}
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+
     def predict(self, dataframe) -> str:
         """  This method returns Prediction in string format. """
         try:
             logging.info("Entered predict method of VehicleDataClassifier class")
-            model = VehicleDataEstimator(
-                bucket_name=self.prediction_pipeline_config.model_bucket_name,
-                model_path=self.prediction_pipeline_config.model_file_path,
-            )
-            result =  model.predict(dataframe)
+            model, version = self.get_model_cache().get_model_and_version()
+            result_cache = self.get_result_cache()
+            if result_cache is None:
+                result = model.predict(dataframe)
+            else:
+                result = result_cache.predict(model=model, version=version, dataframe=dataframe,
+                                              columns=list(VehicleBatchData.get_prediction_columns()))
             logging.info("Exiting predict method of VehicleDataClassifier class")
             
             return result
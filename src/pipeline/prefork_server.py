@@ -0,0 +1,217 @@
+import gc
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from typing import Collection, Dict, List, Optional
+
+import uvicorn
+
+from src.entity.config_entity import PreforkServerConfig, VehiclePredictorConfig
+from src.entity.model_cache import ModelCache
+from src.exception import MyException
+from src.logger import logging, stop_log_listener
+from src.pipeline.prediction_pipeline import VehicleDataClassifier
+
+
+class PreforkServer:
+    """
+    Pre-fork multi-worker server for the FastAPI app (POSIX only).
+
+    The master binds the listening socket, loads and warms the production MyModel once, freezes
+    the heap (gc.freeze, so the collector never writes to the shared objects) and forks the
+    workers, which run uvicorn on the inherited socket and share the model pages copy-on-write.
+
+    - Workers exit after `max_requests` (+ random jitter) requests and are replaced.
+    - SIGHUP rolls the workers: new ones are forked, then the old ones are stopped gracefully.
+    - SIGUSR1 reloads the model in the master and then rolls the workers, so they all switch
+      to the new version together. The master also checks the S3 model version every
+      `model_check_interval` seconds and reloads on change; workers never revalidate on their own.
+    - SIGTERM/SIGINT stop the workers gracefully (SIGKILL after `graceful_timeout`).
+    """
+
+    def __init__(self, app: object, prefork_server_config: PreforkServerConfig = PreforkServerConfig(),
+                 prediction_pipeline_config: VehiclePredictorConfig = VehiclePredictorConfig()):
+        self.app = app
+        self.prefork_server_config = prefork_server_config
+        self.classifier = VehicleDataClassifier(prediction_pipeline_config=prediction_pipeline_config)
+        self._socket: Optional[socket.socket] = None
+        self._workers: Dict[int, float] = {}  # pid -> start time
+        self._pending_signals: List[int] = []
+        self._stopping = False
+
+
+    def _bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.prefork_server_config.host, self.prefork_server_config.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+
+    def _get_model_cache(self) -> ModelCache:
+        model_cache = self.classifier.get_model_cache()
+        # Only the master checks for new versions; a worker reloading on its own would unshare the model
+        model_cache.revalidate_interval = float("inf")
+        return model_cache
+
+
+    def _load_model(self, reload: bool = False) -> None:
+        """  Loads (or reloads) and warms the model in the master, then freezes the heap for sharing.  """
+        model_cache = self._get_model_cache()
+        gc.unfreeze()
+        if reload:
+            model_cache.reload()
+            gc.collect()
+        timings = self.classifier.warm_up()
+        gc.freeze()
+        logging.info(f"Pre-fork master loaded model: {timings}")
+
+
+    def _run_worker(self) -> None:
+        """  Worker body: serve the app on the inherited socket until stopped or recycled.  """
+        exit_code = 0
+        try:
+            for signum in (signal.SIGHUP, signal.SIGUSR1):
+                signal.signal(signum, signal.SIG_IGN)
+            random.seed()
+
+            config = self.prefork_server_config
+            max_requests = (config.max_requests + random.randint(0, config.max_requests_jitter)
+                            if config.max_requests > 0 else None)
+            uvicorn_config = uvicorn.Config(self.app, lifespan="on", limit_max_requests=max_requests,
+                                            timeout_graceful_shutdown=int(config.graceful_timeout))
+            uvicorn.Server(uvicorn_config).run(sockets=[self._socket])
+        except BaseException as e:
+            logging.error(f"Pre-fork worker {os.getpid()} failed: {e}")
+            exit_code = 1
+        finally:
+            stop_log_listener()
+            os._exit(exit_code)
+
+
+    def _spawn_worker(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker()
+        self._workers[pid] = time.monotonic()
+        logging.info(f"Pre-fork master started worker {pid}")
+        return pid
+
+
+    def _stop_workers(self, pids: List[int]) -> None:
+        """  Sends SIGTERM (graceful shutdown) and waits; workers still running after the timeout are killed.  """
+        for pid in pids:
+            self._signal_worker(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.prefork_server_config.graceful_timeout
+        while any(pid in self._workers for pid in pids) and time.monotonic() < deadline:
+            self._reap_workers(stopping_pids=pids)
+            time.sleep(0.1)
+        for pid in pids:
+            if pid in self._workers:
+                self._signal_worker(pid, signal.SIGKILL)
+        while any(pid in self._workers for pid in pids):
+            self._reap_workers(stopping_pids=pids)
+            time.sleep(0.05)
+
+
+    def _signal_worker(self, pid: int, signum: int) -> None:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+
+    def _reap_workers(self, stopping_pids: Collection[int] = ()) -> None:
+        """
+        Collects exited workers. Any worker other than `stopping_pids` (e.g. a new worker recycled
+        by max_requests during a roll) is replaced, unless the server is shutting down.
+        """
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if self._workers.pop(pid, None) is None:
+                continue
+            logging.info(f"Pre-fork worker {pid} exited with status {os.waitstatus_to_exitcode(status)}")
+            stop_requested = self._stopping or signal.SIGTERM in self._pending_signals \
+                or signal.SIGINT in self._pending_signals
+            if pid not in stopping_pids and not stop_requested:
+                self._spawn_worker()
+
+
+    def _roll_workers(self) -> None:
+        """  Replaces every worker: the new ones are forked before the old ones are stopped.  """
+        old_pids = list(self._workers)
+        for _ in old_pids:
+            self._spawn_worker()
+        self._stop_workers(old_pids)
+        logging.info(f"Pre-fork master rolled {len(old_pids)} workers")
+
+
+    def _reload_model(self) -> None:
+        try:
+            self._load_model(reload=True)
+            self._roll_workers()
+        except Exception as e:
+            # Keep the current workers and model; the next check or SIGUSR1 retries
+            logging.error(f"Pre-fork model reload failed, keeping version {self._get_model_cache().version}: {e}")
+
+
+    def _handle_signal(self, signum, frame) -> None:
+        self._pending_signals.append(signum)
+
+
+    def run(self) -> None:
+        """  Runs the master loop until SIGTERM/SIGINT.  """
+        try:
+            self._socket = self._bind()
+            self._load_model()
+
+            for signum in (signal.SIGHUP, signal.SIGUSR1, signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, self._handle_signal)
+
+            for _ in range(self.prefork_server_config.workers):
+                self._spawn_worker()
+            logging.info(f"Pre-fork master {os.getpid()} serving on {self.prefork_server_config.host}:"
+                         f"{self.prefork_server_config.port} with {self.prefork_server_config.workers} workers")
+
+            next_model_check = time.monotonic() + self.prefork_server_config.model_check_interval
+            while not self._stopping:
+                # Signals first: on Ctrl-C the workers get SIGINT too and must not be respawned
+                while self._pending_signals:
+                    signum = self._pending_signals.pop(0)
+                    if signum in (signal.SIGTERM, signal.SIGINT):
+                        self._stopping = True
+                    elif signum == signal.SIGHUP:
+                        self._roll_workers()
+                    elif signum == signal.SIGUSR1:
+                        self._reload_model()
+
+                self._reap_workers()
+
+                if not self._stopping and time.monotonic() >= next_model_check:
+                    next_model_check = time.monotonic() + self.prefork_server_config.model_check_interval
+                    model_cache = self._get_model_cache()
+                    try:
+                        changed = model_cache.get_remote_version() != model_cache.version
+                    except Exception as e:
+                        logging.error(f"Pre-fork model version check failed: {e}")
+                        changed = False
+                    if changed:
+                        self._reload_model()
+
+                time.sleep(0.2)
+
+            logging.info("Pre-fork master stopping workers")
+            self._stop_workers(list(self._workers))
+            self._socket.close()
+
+        except Exception as e:
+            raise MyException(e, sys) from e
@@ -0,0 +1,153 @@
+import multiprocessing
+import queue
+import sys
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from src.entity.config_entity import TrainingJobConfig
+from src.exception import MyException
+from src.logger import logging
+
+# Stage methods of TrainPipeline in execution order, as reported by its progress callback
+TRAINING_PIPELINE_STAGES = ("start_data_ingestion", "start_data_validation", "start_data_transformation",
+                            "start_model_training", "start_model_compaction", "start_model_evaluation",
+                            "start_model_pusher")
+
+JOB_STAGE = "job"
+
+
+@dataclass
+class TrainingJob:
+    job_id: str
+    status: str = "queued"
+    current_stage: Optional[str] = None
+    stages: Dict[str, str] = field(default_factory=lambda: {stage: "pending" for stage in TRAINING_PIPELINE_STAGES})
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ("queued", "running")
+
+
+def _run_training_job(job_id: str, progress_queue: multiprocessing.Queue) -> None:
+    """  Entry point of the training process. The training stack is imported here, not in the server.  """
+    def report(stage: str, status: str, error: Optional[str] = None) -> None:
+        progress_queue.put((job_id, stage, status, datetime.now().isoformat(), error))
+
+    try:
+        from src.pipeline.training_pipeline import TrainPipeline
+
+        report(JOB_STAGE, "running")
+        TrainPipeline(progress_callback=report).run_pipeline()
+        report(JOB_STAGE, "succeeded")
+
+    except Exception as e:
+        report(JOB_STAGE, "failed", f"{e}")
+
+
+class TrainingJobManager:
+    """
+    Runs TrainPipeline in a separate process per job and tracks per-stage progress.
+
+    Only one training job runs at a time: triggering training while a job is queued or running
+    returns that job instead of starting another one. Only the last `history_size` finished jobs
+    are kept.
+    """
+
+    def __init__(self, training_job_config: TrainingJobConfig = TrainingJobConfig()):
+        self.training_job_config = training_job_config
+        self._context = multiprocessing.get_context("spawn")
+        self._jobs: Dict[str, TrainingJob] = {}
+        self._active_job_id: Optional[str] = None
+        self._process: Optional[multiprocessing.Process] = None
+        self._lock = threading.Lock()
+
+
+    def submit(self) -> Tuple[TrainingJob, bool]:
+        """  Starts a training job, or returns the active one. The flag tells whether a new job was created.  """
+        try:
+            with self._lock:
+                if self._active_job_id is not None and self._jobs[self._active_job_id].is_active:
+                    logging.info(f"Training job {self._active_job_id} already active, deduplicating trigger")
+                    return self._jobs[self._active_job_id], False
+
+                job = TrainingJob(job_id=uuid.uuid4().hex)
+                progress_queue = self._context.Queue()
+                process = self._context.Process(target=_run_training_job, args=(job.job_id, progress_queue),
+                                                name=f"training-job-{job.job_id}", daemon=False)
+                process.start()
+
+                self._jobs[job.job_id] = job
+                self._active_job_id = job.job_id
+                self._process = process
+                self._evict_finished_jobs()
+
+            threading.Thread(target=self._monitor, args=(job, process, progress_queue),
+                             name=f"training-monitor-{job.job_id}", daemon=True).start()
+            logging.info(f"Started training job {job.job_id} in process {process.pid}")
+            return job, True
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        return self._jobs.get(job_id)
+
+
+    def _evict_finished_jobs(self) -> None:
+        """  Forgets the oldest finished jobs beyond the history size (called with the lock held).  """
+        finished_job_ids = [job_id for job_id, job in self._jobs.items() if not job.is_active]
+        for job_id in finished_job_ids[:max(len(finished_job_ids) - self.training_job_config.history_size, 0)]:
+            del self._jobs[job_id]
+
+
+    def _apply_progress(self, job: TrainingJob, stage: str, status: str, timestamp: str, error: Optional[str]) -> None:
+        with self._lock:
+            if stage == JOB_STAGE:
+                job.status = status
+                if status == "running":
+                    job.started_at = timestamp
+                else:
+                    job.finished_at = timestamp
+                    job.error = error
+            else:
+                job.stages[stage] = status
+                job.current_stage = stage
+        logging.info(f"Training job {job.job_id}: {stage} -> {status}")
+
+
+    def _monitor(self, job: TrainingJob, process: multiprocessing.Process, progress_queue: multiprocessing.Queue) -> None:
+        """  Applies progress events until the process exits and the queue is drained, then marks jobs that died silently as failed.  """
+        while True:
+            try:
+                self._apply_progress(job, *progress_queue.get(timeout=1.0)[1:])
+            except queue.Empty:
+                if not process.is_alive():
+                    break
+
+        process.join()
+        # Events the process sent just before exiting may still be queued
+        while True:
+            try:
+                self._apply_progress(job, *progress_queue.get_nowait()[1:])
+            except queue.Empty:
+                break
+
+        if job.is_active:
+            self._apply_progress(job, JOB_STAGE, "failed", datetime.now().isoformat(),
+                                 f"Training process exited with code {process.exitcode}")
+
+
+    def shutdown(self) -> None:
+        """  Terminates a still-running training process when the server stops.  """
+        if self._process is not None and self._process.is_alive():
+            logging.info(f"Terminating training job {self._active_job_id}")
+            self._process.terminate()
+            self._process.join()
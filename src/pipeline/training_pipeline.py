@@ -1,4 +1,5 @@
 import sys
+from typing import Callable, Optional, Tuple
 
 from src.exception import MyException
 from src.logger import logging
@@ -7,13 +8,18 @@ from src.components.data_ingestion import DataIngestion
 from src.components.data_validation import DataValidation
 from src.components.data_transformation import DataTransformation
 from src.components.model_trainer import ModelTrainer
+from src.components.model_compaction import ModelCompaction
 from src.components.model_evaluation import ModelEvaluation
 from src.components.model_pusher import ModelPusher
+from src.data_access.dataset_snapshot import DatasetSnapshotStore
+from src.data_access.vehicle_data import VehicleData
 
 from src.entity.config_entity import (DataIngestionConfig,
+                                      DatasetSnapshotConfig,
                                       DataValidationConfig,
                                       DataTransformationConfig,
                                       ModelTrainerConfig,
+                                      ModelCompactionConfig,
                                       ModelEvaluationConfig,
                                       ModelPusherConfig)
 
@@ -21,15 +27,20 @@ from src.entity.artifact_entity import (DataIngestionArtifact,
                                         DataValidationArtifact,
                                         DataTransformationArtifact,
                                         ModelTrainerArtifact,
+                                        ModelCompactionArtifact,
                                         ModelEvaluationArtifact,
                                         ModelPusherArtifact)
 
 class TrainPipeline():
-    def __init__(self):
+    def __init__(self, progress_callback: Optional[Callable[[str, str], None]] = None):
+        """  progress_callback(stage, status) is called as each stage starts, completes or fails.  """
+        self.progress_callback          = progress_callback
         self.data_ingestion_config      = DataIngestionConfig
+        self.dataset_snapshot_config    = DatasetSnapshotConfig
         self.data_validation_config     = DataValidationConfig
         self.data_transformation_config = DataTransformationConfig
         self.model_trainer_config       = ModelTrainerConfig
+        self.model_compaction_config    = ModelCompactionConfig
         self.model_evaluation_config    = ModelEvaluationConfig
         self.model_pusher_config        = ModelPusherConfig
 
@@ -79,12 +90,49 @@ class TrainPipeline():
             raise Exception(e, sys)
 
 
-    def start_model_training(self, data_transformation_artifact: DataTransformationArtifact) -> ModelTrainerArtifact:
+    def load_dataset_snapshot(self) -> Tuple[Optional[tuple], Optional[str], Optional[dict]]:
+        """
+        Fingerprints the inputs of the data stages and returns (artifacts, key, fingerprint), where
+        artifacts are those of a stored snapshot with this fingerprint, or None if the stages must run.
+        """
+        try:
+            if not self.dataset_snapshot_config.enabled:
+                return None, None, None
+            snapshot_store = DatasetSnapshotStore(self.dataset_snapshot_config.snapshot_dir,
+                                                  sample_size=self.dataset_snapshot_config.sample_size,
+                                                  keep=self.dataset_snapshot_config.keep)
+            fingerprint = snapshot_store.compute_fingerprint(VehicleData(), self.data_ingestion_config)
+            key = snapshot_store.get_key(fingerprint)
+            logging.info(f"Dataset fingerprint {key}: {fingerprint}")
+            return snapshot_store.load(key), key, fingerprint
+
+        except Exception as e:
+            raise Exception(e, sys)
+
+
+    def save_dataset_snapshot(self, key: str, fingerprint: dict, data_ingestion_artifact: DataIngestionArtifact,
+                              data_validation_artifact: DataValidationArtifact,
+                              data_transformation_artifact: DataTransformationArtifact) -> None:
+        """  Stores the data stage artifacts under the fingerprint taken before the stages ran.  """
+        try:
+            snapshot_store = DatasetSnapshotStore(self.dataset_snapshot_config.snapshot_dir,
+                                                  sample_size=self.dataset_snapshot_config.sample_size,
+                                                  keep=self.dataset_snapshot_config.keep)
+            snapshot_store.save(key, fingerprint, (data_ingestion_artifact, data_validation_artifact,
+                                                   data_transformation_artifact))
+
+        except Exception as e:
+            raise Exception(e, sys)
+
+
+    def start_model_training(self, data_ingestion_artifact: DataIngestionArtifact,
+                             data_transformation_artifact: DataTransformationArtifact) -> ModelTrainerArtifact:
         """  Starts model training component.  """
         try:
             logging.info("Entered the start_model_training method of TrainPipeline class")
             model_trainer = ModelTrainer(data_transformation_artifact = data_transformation_artifact,
-                                         model_trainer_config = self.model_trainer_config)
+                                         model_trainer_config = self.model_trainer_config,
+                                         data_ingestion_artifact = data_ingestion_artifact)
             model_trainer_artifact = model_trainer.initiate_model_trainer()
             logging.info("Performed the model training operation")
             logging.info("Exited the start_model_training method of TrainPipeline class")
@@ -94,6 +142,23 @@ class TrainPipeline():
             raise Exception(e, sys)
 
 
+    def start_model_compaction(self, data_transformation_artifact: DataTransformationArtifact,
+                               model_trainer_artifact: ModelTrainerArtifact) -> ModelCompactionArtifact:
+        """  Starts model compaction component.  """
+        try:
+            logging.info("Entered the start_model_compaction method of TrainPipeline class")
+            model_compaction = ModelCompaction(data_transformation_artifact = data_transformation_artifact,
+                                               model_trainer_artifact = model_trainer_artifact,
+                                               model_compaction_config = self.model_compaction_config)
+            model_compaction_artifact = model_compaction.initiate_model_compaction()
+            logging.info("Performed the model compaction operation")
+            logging.info("Exited the start_model_compaction method of TrainPipeline class")
+            return model_compaction_artifact
+
+        except Exception as e:
+            raise Exception(e, sys)
+
+
     def start_model_evaluation(self, data_ingestion_artifact: DataIngestionArtifact,
                                model_trainer_artifact: ModelTrainerArtifact) -> ModelEvaluationArtifact:
         """  Starts model evaluation component.  """
@@ -125,17 +190,48 @@ class TrainPipeline():
             raise Exception(e, sys)                         
 
 
+    def _report_progress(self, stage: str, status: str) -> None:
+        if self.progress_callback is not None:
+            self.progress_callback(stage, status)
+
+
+    def _run_stage(self, stage: Callable, **kwargs):
+        """  Runs one pipeline stage and reports its progress under the stage method name.  """
+        self._report_progress(stage.__name__, "running")
+        try:
+            artifact = stage(**kwargs)
+        except Exception:
+            self._report_progress(stage.__name__, "failed")
+            raise
+        self._report_progress(stage.__name__, "completed")
+        return artifact
+
+
     def run_pipeline(self) -> None:
         """  Runs complete TrainPipeline.  """
         try:
-            data_ingestion_artifact      = self.start_data_ingestion()
-            data_validation_artifact     = self.start_data_validation(data_ingestion_artifact=data_ingestion_artifact)
-            data_transformation_artifact = self.start_data_transformation(data_ingestion_artifact=data_ingestion_artifact,
-                                                                          data_validation_artifact=data_validation_artifact)
-            model_trainer_artifact       = self.start_model_training(data_transformation_artifact=data_transformation_artifact)
-            model_evaluation_artifact    = self.start_model_evaluation(data_ingestion_artifact=data_ingestion_artifact,
-                                                                       model_trainer_artifact=model_trainer_artifact)
-            model_pusher_artifact        = self.start_model_pusher(model_evaluation_artifact=model_evaluation_artifact)                                                                                                                       
+            snapshot_artifacts, snapshot_key, fingerprint = self.load_dataset_snapshot()
+            if snapshot_artifacts is not None:
+                # Unchanged collection, schema and data stage code: reuse the previous outputs
+                data_ingestion_artifact, data_validation_artifact, data_transformation_artifact = snapshot_artifacts
+                for stage in (self.start_data_ingestion, self.start_data_validation, self.start_data_transformation):
+                    self._report_progress(stage.__name__, "reused")
+            else:
+                data_ingestion_artifact      = self._run_stage(self.start_data_ingestion)
+                data_validation_artifact     = self._run_stage(self.start_data_validation, data_ingestion_artifact=data_ingestion_artifact)
+                data_transformation_artifact = self._run_stage(self.start_data_transformation, data_ingestion_artifact=data_ingestion_artifact,
+                                                               data_validation_artifact=data_validation_artifact)
+                if snapshot_key is not None:
+                    self.save_dataset_snapshot(snapshot_key, fingerprint, data_ingestion_artifact,
+                                               data_validation_artifact, data_transformation_artifact)
+            model_trainer_artifact       = self._run_stage(self.start_model_training, data_ingestion_artifact=data_ingestion_artifact,
+                                                           data_transformation_artifact=data_transformation_artifact)
+            model_compaction_artifact    = self._run_stage(self.start_model_compaction, data_transformation_artifact=data_transformation_artifact,
+                                                           model_trainer_artifact=model_trainer_artifact)
+            # Evaluation and push use the compacted model if the compaction was accepted
+            model_evaluation_artifact    = self._run_stage(self.start_model_evaluation, data_ingestion_artifact=data_ingestion_artifact,
+                                                           model_trainer_artifact=model_compaction_artifact.model_trainer_artifact)
+            model_pusher_artifact        = self._run_stage(self.start_model_pusher, model_evaluation_artifact=model_evaluation_artifact)
 
         except Exception as e:
             raise Exception(e, sys) 
\ No newline at end of file
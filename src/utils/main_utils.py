@@ -1,9 +1,13 @@
+import json
+import mmap
 import os
 import sys
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import dill
 import yaml
+import pandas as pd
 from pandas import DataFrame
 
 from src.exception import MyException
@@ -85,4 +89,115 @@ def save_numpy_array_data(file_path: str, array: np.array):
         with open(file_path, 'wb') as file_obj:
             np.save(file_obj, array)
     except Exception as e:
-        raise MyException(e, sys) from e
\ No newline at end of file
+        raise MyException(e, sys) from e
+
+def save_dataframe(file_path: str, df: DataFrame) -> None:
+    """
+    Save a DataFrame as Parquet, keeping dtypes (categoricals are stored dictionary-encoded)
+    file_path: str location of file to save; a .csv path is written as CSV instead
+    df: DataFrame to save
+    """
+    try:
+        dir_path = os.path.dirname(file_path)
+        os.makedirs(dir_path, exist_ok=True)
+        if file_path.endswith(".csv"):
+            df.to_csv(file_path, index=False, header=True)
+        else:
+            df.to_parquet(file_path, index=False)
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+def load_dataframe(file_path: str, columns: Optional[List[str]] = None) -> DataFrame:
+    """
+    Load a DataFrame saved by save_dataframe
+    file_path: str location of file to load (Parquet, or CSV for a .csv path)
+    columns: only these columns are read (Parquet does not decode the others at all)
+    return: DataFrame
+    """
+    try:
+        if file_path.endswith(".csv"):
+            return pd.read_csv(file_path, usecols=columns)
+        return pd.read_parquet(file_path, columns=columns)
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+def read_dataframe_columns(file_path: str) -> List[str]:
+    """  Returns the column names of a file saved by save_dataframe without reading its data.  """
+    try:
+        if file_path.endswith(".csv"):
+            return pd.read_csv(file_path, nrows=0).columns.to_list()
+        import pyarrow.parquet as pq
+        return pq.read_schema(file_path).names
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+# Single-file array container: magic, uint64 header length, JSON header, then raw array blocks
+MMAP_ARRAYS_MAGIC = b"VHMMAP01"
+MMAP_ARRAYS_ALIGNMENT = 64
+
+
+def save_mmap_arrays(file_path: str, arrays: Dict[str, np.ndarray], metadata: dict) -> None:
+    """
+    Saves named arrays as raw, 64-byte aligned blocks in a single file, described by a JSON header
+    that also carries `metadata`. The file is written to a temporary name and renamed into place.
+    """
+    try:
+        blocks, header_arrays, offset = [], {}, 0
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            if array.dtype.hasobject:
+                raise ValueError(f"Array '{name}' has an object dtype and cannot be memory-mapped")
+            offset = -(-offset // MMAP_ARRAYS_ALIGNMENT) * MMAP_ARRAYS_ALIGNMENT
+            header_arrays[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            blocks.append((offset, array))
+            offset += array.nbytes
+
+        header = json.dumps({"metadata": metadata, "arrays": header_arrays}).encode()
+        prefix_size = len(MMAP_ARRAYS_MAGIC) + 8 + len(header)
+        data_start = -(-prefix_size // MMAP_ARRAYS_ALIGNMENT) * MMAP_ARRAYS_ALIGNMENT
+
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        tmp_path = f"{file_path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as file_obj:
+            file_obj.write(MMAP_ARRAYS_MAGIC)
+            file_obj.write(len(header).to_bytes(8, "little"))
+            file_obj.write(header)
+            for block_offset, array in blocks:
+                file_obj.seek(data_start + block_offset)
+                file_obj.write(array.tobytes())
+            file_obj.truncate(data_start + offset)
+        os.replace(tmp_path, file_path)
+
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+def load_mmap_arrays(file_path: str) -> Tuple[Dict[str, np.ndarray], dict]:
+    """
+    Opens a file written by save_mmap_arrays with a read-only mmap and returns ({name: array}, metadata).
+    The arrays are zero-copy views on the mapping, so processes mapping the same file share its pages.
+    """
+    try:
+        with open(file_path, "rb") as file_obj:
+            mapping = mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if mapping[:len(MMAP_ARRAYS_MAGIC)] != MMAP_ARRAYS_MAGIC:
+            raise ValueError(f"{file_path} is not a memory-mappable array file")
+        header_start = len(MMAP_ARRAYS_MAGIC) + 8
+        header_size = int.from_bytes(mapping[len(MMAP_ARRAYS_MAGIC):header_start], "little")
+        header = json.loads(mapping[header_start:header_start + header_size])
+        data_start = -(-(header_start + header_size) // MMAP_ARRAYS_ALIGNMENT) * MMAP_ARRAYS_ALIGNMENT
+
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"], dtype=np.int64))
+            arrays[name] = np.frombuffer(mapping, dtype=dtype, count=count,
+                                         offset=data_start + spec["offset"]).reshape(spec["shape"])
+        return arrays, header["metadata"]
+
+    except Exception as e:
+        raise MyException(e, sys) from e
@@ -0,0 +1,133 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def repo_root_cwd(monkeypatch):
+    """  config/schema.yaml and the artifact paths are relative to the repository root.  """
+    monkeypatch.chdir(REPO_ROOT)
+
+
+def make_vehicle_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """  Random vehicle documents in the raw dataset layout, as stored in MongoDB.  """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "id": np.arange(1, rows + 1),
+        "Gender": rng.choice(["Male", "Female"], rows),
+        "Age": rng.integers(20, 86, rows),
+        "Driving_License": rng.integers(0, 2, rows),
+        "Region_Code": rng.integers(0, 53, rows).astype(float),
+        "Previously_Insured": rng.integers(0, 2, rows),
+        "Vehicle_Age": rng.choice(["< 1 Year", "1-2 Year", "> 2 Years"], rows),
+        "Vehicle_Damage": rng.choice(["Yes", "No"], rows),
+        "Annual_Premium": rng.integers(2630, 100000, rows).astype(float),
+        "Policy_Sales_Channel": rng.integers(1, 164, rows).astype(float),
+        "Vintage": rng.integers(10, 300, rows),
+    })
+    logit = -2 + 1.5 * (df["Vehicle_Damage"] == "Yes") - 2 * df["Previously_Insured"] + 0.02 * (df["Age"] - 40)
+    df["Response"] = (rng.random(rows) < 1 / (1 + np.exp(-logit))).astype(int)
+    return df
+
+
+def make_vehicle_documents(rows: int, seed: int = 0) -> list:
+    return make_vehicle_frame(rows, seed).astype(object).to_dict("records")
+
+
+@pytest.fixture(scope="session")
+def vehicle_model():
+    """  A small MyModel trained like ModelTrainer does (compiled forest and fused preprocessing).  """
+    os.chdir(REPO_ROOT)
+    from src.components.data_transformation import DataTransformation
+    from src.entity.estimator import MyModel
+    from src.entity.schema import DataSchema
+    from src.entity.tree_ensemble import CompiledForest
+    from src.pipeline.prediction_pipeline import VehicleBatchData
+
+    raw_df = make_vehicle_frame(3000)
+    batch_data = VehicleBatchData(raw_df, ignore_unknown_columns=True)
+    assert batch_data.validate(), batch_data.errors
+
+    data_transformation = DataTransformation.__new__(DataTransformation)
+    data_transformation._schema_config = DataSchema.get_instance()
+    preprocessing_object = data_transformation.get_data_transformer_object()
+    features = preprocessing_object.fit_transform(batch_data.input_df)
+    forest = RandomForestClassifier(n_estimators=10, max_depth=8, random_state=0).fit(features, raw_df["Response"])
+    return MyModel(preprocessing_object=preprocessing_object, trained_model_object=forest,
+                   compiled_model_object=CompiledForest.from_sklearn(forest))
+
+
+def make_mongomock_vehicle_data(collection):
+    """  VehicleData reading from a mongomock collection's database instead of connecting to MongoDB.  """
+    from src.data_access.vehicle_data import VehicleData
+
+    vehicle_data = VehicleData.__new__(VehicleData)
+    vehicle_data.mongoclient = type("Client", (), {"database": collection.database})()
+    vehicle_data.export_report = None
+    return vehicle_data
+
+
+@pytest.fixture
+def mongomock_collection(monkeypatch):
+    """  An empty in-memory collection in the vehicle database.  """
+    import mongomock
+    from src.constants import DATABASE_NAME
+
+    # pymongo >= 4.11 passes UpdateOne(sort=...) to bulk builders; mongomock 4.3 does not accept it yet
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+    monkeypatch.setattr(mongomock.collection.BulkOperationBuilder, "add_update",
+                        lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs))
+    return mongomock.MongoClient()[DATABASE_NAME]["Vehicle-Data"]
+
+
+@pytest.fixture(scope="session")
+def moto_server_url():
+    """  A moto S3 server on localhost, reachable from spawned processes too.  """
+    import socket
+    from moto.server import ThreadedMotoServer
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    yield f"http://127.0.0.1:{port}"
+    server.stop()
+
+
+@pytest.fixture
+def model_bucket(moto_server_url, monkeypatch):
+    """  A fresh bucket in the moto server, with the S3 client of the code under test pointed at it.  """
+    import uuid
+    import boto3
+    from src.configuration.aws_connection import S3Client
+    from src.constants import AWS_ACCESS_KEY_ID_ENV_KEY, AWS_SECRET_ACCESS_KEY_ENV_KEY, REGION_NAME
+
+    monkeypatch.setenv("AWS_ENDPOINT_URL", moto_server_url)
+    monkeypatch.setenv(AWS_ACCESS_KEY_ID_ENV_KEY, "testing")
+    monkeypatch.setenv(AWS_SECRET_ACCESS_KEY_ENV_KEY, "testing")
+    monkeypatch.setattr(S3Client, "s3_client", None)
+
+    bucket_name = f"models-{uuid.uuid4().hex[:12]}"
+    s3_client = boto3.client("s3", endpoint_url=moto_server_url, region_name=REGION_NAME,
+                             aws_access_key_id="testing", aws_secret_access_key="testing")
+    s3_client.create_bucket(Bucket=bucket_name)
+    return s3_client, bucket_name
+
+
+def upload_model(model_bucket, key: str, model, tmp_path) -> None:
+    """  Uploads `model` to `key` as the pusher does: a pickle, or the mmap format for .vmm keys.  """
+    from src.utils.main_utils import save_object
+
+    s3_client, bucket_name = model_bucket
+    local_path = str(tmp_path / os.path.basename(key))
+    if key.endswith(".vmm"):
+        model.save_mmap(local_path)
+    else:
+        save_object(local_path, model)
+    s3_client.upload_file(local_path, bucket_name, key)
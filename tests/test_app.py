@@ -0,0 +1,176 @@
+import importlib
+import io
+import json
+import re
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.entity.model_cache import ModelCache
+from src.pipeline.prediction_pipeline import VehicleBatchData, VehicleData
+from tests.conftest import make_vehicle_frame
+
+
+class StubModelCache:
+    """  Serves a fixed model in place of the S3 backed ModelCache; the model is unavailable while None.  """
+
+    def __init__(self, model=None, version: str = "stub-v1"):
+        self.model = model
+        self._version = version
+
+    @property
+    def version(self):
+        return None if self.model is None else self._version
+
+    def get_model_and_version(self):
+        if self.model is None:
+            raise ConnectionError("No model in S3 yet")
+        return self.model, self._version
+
+    def get_model(self):
+        return self.get_model_and_version()[0]
+
+    def get_remote_version(self) -> str:
+        return self._version
+
+    def add_swap_listener(self, listener) -> None:
+        pass
+
+
+@pytest.fixture
+def serving_app(vehicle_model, monkeypatch):
+    """  The app module with a stubbed model cache, a thread pool executor and a fresh startup report.  """
+    app_module = importlib.import_module("app")
+    model_cache = StubModelCache(vehicle_model)
+    monkeypatch.setattr(ModelCache, "get_instance", classmethod(lambda cls, **kwargs: model_cache))
+    monkeypatch.setattr(app_module.inference_executor.inference_executor_config, "execution_mode", "thread")
+    monkeypatch.setattr(app_module, "MODEL_WARM_UP_RETRY_SECONDS", 0.05)
+    monkeypatch.setattr(app_module, "startup_report", {**app_module.startup_report, "ready": False, "error": None})
+    return app_module, model_cache
+
+
+def model_input_records(rows: int, seed: int) -> list:
+    batch_data = VehicleBatchData(make_vehicle_frame(rows, seed), ignore_unknown_columns=True)
+    assert batch_data.validate()
+    return batch_data.input_df.to_dict("records")
+
+
+def test_batch_predictions_match_the_single_row_path(serving_app, vehicle_model):
+    app_module, _ = serving_app
+    records = model_input_records(20, seed=6)
+
+    with TestClient(app_module.app) as client:
+        response = client.post("/predict/batch", json={"records": records})
+        columns_response = client.post("/predict/batch", json={"columns": {col: [record[col] for record in records]
+                                                                           for col in records[0]}})
+        form_response = client.post("/", data={col: str(value) for col, value in records[0].items()})
+
+    # The form route builds a one-row frame of the posted strings with VehicleData
+    single_rows = [vehicle_model.predict(VehicleData(**{col: str(value) for col, value in record.items()})
+                                         .get_vehicle_input_data_frame())[0] for record in records]
+    assert response.status_code == 200 and response.json()["count"] == 20
+    assert response.json()["predictions"] == np.asarray(single_rows).astype(int).tolist()
+    assert columns_response.json()["predictions"] == response.json()["predictions"]
+    assert form_response.headers["content-type"].startswith("text/html")
+
+
+@pytest.mark.parametrize("change", ["unknown", "missing"])
+def test_batch_with_unknown_or_missing_column_is_rejected(serving_app, change):
+    app_module, _ = serving_app
+    records = model_input_records(5, seed=7)
+    for record in records:
+        if change == "unknown":
+            record["Colour"] = "red"
+        else:
+            del record["Vintage"]
+
+    with TestClient(app_module.app) as client:
+        response = client.post("/predict/batch", json=records)
+
+    assert response.status_code == 422
+    assert any(("Unknown" if change == "unknown" else "Missing") in error for error in response.json()["errors"])
+
+
+def make_csv(rows: int, seed: int, invalid_rows: tuple = ()) -> tuple:
+    """  A raw dataset CSV with an unknown category in `invalid_rows`, and its DataFrame.  """
+    raw_df = make_vehicle_frame(rows, seed)
+    raw_df.loc[list(invalid_rows), "Vehicle_Damage"] = "Maybe"
+    return raw_df.to_csv(index=False).encode(), raw_df
+
+
+@pytest.mark.parametrize("output_format", ["csv", "ndjson"])
+def test_csv_is_scored_and_streamed_in_chunks(serving_app, vehicle_model, output_format):
+    app_module, _ = serving_app
+    content, raw_df = make_csv(25, seed=8, invalid_rows=(3, 17))
+    valid_rows = raw_df.index.drop([3, 17])
+    valid_data = VehicleBatchData(raw_df.loc[valid_rows], ignore_unknown_columns=True)
+    assert valid_data.validate()
+    expected = pd.Series(pd.NA, index=raw_df.index, dtype="Int64")
+    expected[valid_rows] = vehicle_model.predict(valid_data.input_df).astype(int)
+
+    with TestClient(app_module.app) as client:
+        response = client.post("/predict/csv", params={"output_format": output_format, "chunk_size": 10},
+                               files={"file": ("vehicles.csv", content, "text/csv")})
+
+    assert response.status_code == 200
+    if output_format == "csv":
+        scored = pd.read_csv(io.StringIO(response.text), dtype={"prediction": "Int64"})
+    else:
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[-1]["summary"] | {"seconds": 0, "rows_per_sec": 0} == {
+            "rows": 25, "scored_rows": 23, "invalid_rows": 2, "chunks": 3, "seconds": 0, "rows_per_sec": 0}
+        scored = pd.DataFrame(lines[:-1]).astype({"prediction": "Int64"})
+
+    assert scored["row"].tolist() == list(range(25)) and scored["id"].tolist() == raw_df["id"].tolist()
+    assert scored["prediction"].equals(expected)
+
+
+def test_csv_with_missing_column_is_rejected(serving_app):
+    app_module, _ = serving_app
+    content, _ = make_csv(5, seed=9)
+    content = pd.read_csv(io.BytesIO(content)).drop(columns="Annual_Premium").to_csv(index=False).encode()
+
+    with TestClient(app_module.app) as client:
+        response = client.post("/predict/csv", files={"file": ("vehicles.csv", content, "text/csv")})
+
+    assert response.status_code == 422 and "Annual_Premium" in response.json()["errors"][0]
+
+
+def test_ready_only_after_the_model_is_warmed_up(serving_app):
+    app_module, model_cache = serving_app
+    vehicle_model, model_cache.model = model_cache.model, None
+
+    with TestClient(app_module.app) as client:
+        response = client.get("/ready")
+        assert response.status_code == 503 and response.json()["ready"] is False
+
+        # Warm-up keeps retrying until the model can be loaded
+        model_cache.model = vehicle_model
+        deadline = time.monotonic() + 10
+        while response.status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.05)
+            response = client.get("/ready")
+
+    assert response.status_code == 200
+    assert response.json()["model_version"] == "stub-v1" and response.json()["error"] is None
+
+
+def test_metrics_are_rendered_in_the_prometheus_text_format(serving_app):
+    app_module, _ = serving_app
+    sample_line = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_]\w*="(\\.|[^"\\])*",?)*\})? \S+$')
+
+    with TestClient(app_module.app) as client:
+        client.post("/predict/batch", json=model_input_records(3, seed=10))
+        response = client.get("/metrics")
+
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert all(line.startswith("# HELP ") or line.startswith("# TYPE ") or sample_line.match(line) for line in lines), \
+        [line for line in lines if not line.startswith("#") and not sample_line.match(line)]
+    assert "# TYPE vehicle_stage_duration_seconds histogram" in lines
+    assert any(line.startswith('vehicle_requests_total{method="POST",route="/predict/batch",status="200"} ')
+               for line in lines)
+    assert "# TYPE vehicle_micro_batcher_queue_depth gauge" in lines
@@ -0,0 +1,58 @@
+import pytest
+
+from src.entity.config_entity import BatchScoringConfig
+from src.pipeline.batch_scoring_pipeline import BatchScoringPipeline
+from src.pipeline.prediction_pipeline import VehicleBatchData
+from tests.conftest import make_vehicle_documents
+
+
+@pytest.fixture
+def collection(mongomock_collection):
+    mongomock_collection.insert_many(make_vehicle_documents(250, seed=1))
+    return mongomock_collection
+
+
+def run_batch_scoring(collection, vehicle_model, batch_size: int = 100):
+    pipeline = BatchScoringPipeline(BatchScoringConfig(batch_size=batch_size, max_queued_batches=2),
+                                    collection=collection, model_loader=lambda: (vehicle_model, "v1"))
+    return pipeline.run_pipeline()
+
+
+def test_scores_every_document_with_the_model(collection, vehicle_model):
+    summary = run_batch_scoring(collection, vehicle_model)
+
+    assert (summary.documents, summary.scored_documents, summary.batches) == (250, 250, 3)
+    documents = list(collection.find({}, sort=[("_id", 1)]))
+    batch_data = VehicleBatchData(documents, ignore_unknown_columns=True)
+    assert batch_data.validate()
+    expected = vehicle_model.predict(batch_data.input_df).tolist()
+    assert [document["prediction"] for document in documents] == expected
+    assert {document["model_version"] for document in documents} == {"v1"}
+
+
+def test_field_missing_from_a_whole_batch_only_invalidates_its_rows(collection, vehicle_model):
+    first_batch_ids = [document["_id"] for document in collection.find({}, sort=[("_id", 1)], limit=100)]
+    collection.update_many({"_id": {"$in": first_batch_ids}}, {"$unset": {"Vehicle_Age": ""}})
+
+    summary = run_batch_scoring(collection, vehicle_model)
+
+    assert (summary.documents, summary.scored_documents, summary.invalid_documents) == (250, 150, 100)
+    assert collection.count_documents({"_id": {"$in": first_batch_ids}, "prediction": None}) == 100
+
+
+def test_batch_failing_validation_is_skipped_not_fatal(collection, vehicle_model, monkeypatch):
+    validate = VehicleBatchData.validate
+    calls = []
+
+    def fail_second_batch(self):
+        calls.append(None)
+        if len(calls) == 2:
+            self.errors = ["Batch contains no rows"]
+            return False
+        return validate(self)
+
+    monkeypatch.setattr(VehicleBatchData, "validate", fail_second_batch)
+    summary = run_batch_scoring(collection, vehicle_model)
+
+    assert (summary.documents, summary.invalid_batches, summary.invalid_documents) == (250, 1, 100)
+    assert collection.count_documents({"prediction": None, "model_version": "v1"}) == 100
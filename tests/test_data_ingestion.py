@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from bson import ObjectId
+
+from src.components.data_ingestion import DataIngestion
+from src.entity.config_entity import DataIngestionConfig
+from src.utils.main_utils import save_dataframe
+
+
+def write_partitions(directory, frames, first_index=0):
+    file_paths = []
+    for i, frame in enumerate(frames, start=first_index):
+        file_paths.append(str(directory / f"part-{i:05d}.parquet"))
+        save_dataframe(file_paths[-1], frame)
+    return file_paths
+
+
+def split(tmp_path, name, file_paths, chunk_size=1000):
+    config = DataIngestionConfig(training_file_path=str(tmp_path / name / "train.parquet"),
+                                 testing_file_path=str(tmp_path / name / "test.parquet"),
+                                 train_test_split_ratio=0.25, split_key_column="_id", split_chunk_size=chunk_size)
+    DataIngestion(config).train_test_split_data(file_paths)
+    return pd.read_parquet(config.training_file_path), pd.read_parquet(config.testing_file_path)
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"_id": [str(ObjectId()) for _ in range(10000)],
+                         "Age": rng.integers(20, 86, 10000).astype(np.int8),
+                         "Annual_Premium": rng.integers(2630, 100000, 10000).astype(np.float32)})
+
+
+def test_split_is_a_partition_close_to_the_ratio(tmp_path, frame):
+    train, test = split(tmp_path, "run", write_partitions(tmp_path, [frame]))
+
+    assert set(train["_id"]).isdisjoint(test["_id"])
+    assert len(train) + len(test) == len(frame)
+    assert abs(len(test) / len(frame) - 0.25) < 0.02
+
+
+def test_split_does_not_depend_on_chunking_or_partitioning(tmp_path, frame):
+    _, test = split(tmp_path, "one", write_partitions(tmp_path, [frame]), chunk_size=10000)
+    partitions = write_partitions(tmp_path, [frame.iloc[:3000], frame.iloc[3000:7000], frame.iloc[7000:]])
+    _, test_chunked = split(tmp_path, "three", partitions, chunk_size=512)
+
+    assert set(test_chunked["_id"]) == set(test["_id"])
+
+
+def test_appended_records_never_move_existing_records(tmp_path, frame):
+    first = write_partitions(tmp_path, [frame.iloc[:6000]])
+    train_before, test_before = split(tmp_path, "before", first)
+    train_after, test_after = split(tmp_path, "after", first + write_partitions(tmp_path, [frame.iloc[6000:]], 1))
+
+    assert set(test_before["_id"]) <= set(test_after["_id"])
+    assert set(train_before["_id"]) <= set(train_after["_id"])
+
+
+def test_partition_dtypes_are_unified_exactly(tmp_path, frame):
+    # float32 in one partition, int32 beyond float32 precision in the other: float64 holds both exactly
+    wide = frame.iloc[5000:].astype({"Annual_Premium": np.int32})
+    wide.loc[wide.index[0], "Annual_Premium"] = 2**24 + 1
+    train, test = split(tmp_path, "run", write_partitions(tmp_path, [frame.iloc[:5000], wide]))
+
+    both = pd.concat([train, test]).set_index("_id").loc[frame["_id"]]
+    expected = pd.concat([frame.iloc[:5000], wide])["Annual_Premium"].astype(np.float64)
+    assert both["Annual_Premium"].dtype == np.float64
+    assert both["Annual_Premium"].tolist() == expected.tolist()
@@ -0,0 +1,45 @@
+import os
+
+from src.data_access.dataset_snapshot import DatasetSnapshotStore
+from src.entity.artifact_entity import DataIngestionArtifact, DataTransformationArtifact, DataValidationArtifact
+from src.entity.config_entity import DataIngestionConfig
+from tests.conftest import make_mongomock_vehicle_data, make_vehicle_documents
+
+
+def make_artifacts(run_dir) -> tuple:
+    """  Data stage artifacts of one run, with a file behind every path.  """
+    paths = {name: str(run_dir / name) for name in ("train.parquet", "test.parquet", "report.yaml",
+                                                    "preprocessing.pkl", "train.npy", "test.npy")}
+    for name, path in paths.items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file_obj:
+            file_obj.write(f"{run_dir.name}/{name}")
+    return (DataIngestionArtifact(paths["train.parquet"], paths["test.parquet"]),
+            DataValidationArtifact(True, "", paths["report.yaml"]),
+            DataTransformationArtifact(paths["preprocessing.pkl"], paths["train.npy"], paths["test.npy"]))
+
+
+def test_fingerprint_covers_libraries_and_settings(mongomock_collection):
+    mongomock_collection.insert_many(make_vehicle_documents(50))
+    vehicle_data = make_mongomock_vehicle_data(mongomock_collection)
+    store = DatasetSnapshotStore("unused", sample_size=4)
+
+    fingerprint = store.compute_fingerprint(vehicle_data, DataIngestionConfig(watermark_safety_lag_seconds=300.0))
+    assert set(fingerprint["libraries"]) == {"numpy", "pandas", "pyarrow", "scikit-learn"}
+    assert fingerprint["collection"]["count"] == 50
+    assert store.get_key(fingerprint) != store.get_key(
+        store.compute_fingerprint(vehicle_data, DataIngestionConfig(watermark_safety_lag_seconds=60.0)))
+
+
+def test_only_the_most_recently_used_snapshots_are_kept(tmp_path):
+    store = DatasetSnapshotStore(str(tmp_path / "snapshots"), keep=2)
+    for i, key in enumerate(("a", "b")):
+        store.save(key, {}, make_artifacts(tmp_path / f"run-{key}"))
+        os.utime(os.path.join(store.snapshot_dir, key, store.SNAPSHOT_FILE_NAME), (i, i))
+
+    # Reusing "a" makes "b" the least recently used one
+    assert store.load("a")[0].trained_file_path == os.path.join(store.snapshot_dir, "a", "train.parquet")
+    store.save("c", {}, make_artifacts(tmp_path / "run-c"))
+
+    assert sorted(os.listdir(store.snapshot_dir)) == ["a", "c"]
+    assert store.load("b") is None
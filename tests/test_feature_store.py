@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+from src.data_access.feature_store import PartitionedFeatureStore
+from tests.conftest import make_mongomock_vehicle_data, make_vehicle_documents
+
+
+def insert_documents(collection, rows: int, minutes_ago: float, seed: int) -> set:
+    """  Inserts documents whose ObjectIds were stamped `minutes_ago` (as by a writer with that clock).  """
+    stamped_at = datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)
+    documents = make_vehicle_documents(rows, seed=seed)
+    for document in documents:
+        # Same timestamp, unique suffix, like ObjectIds generated within one second
+        document["_id"] = ObjectId(ObjectId.from_datetime(stamped_at).binary[:4] + ObjectId().binary[4:])
+    collection.insert_many(documents)
+    return {str(document["_id"]) for document in documents}
+
+
+@pytest.fixture
+def vehicle_data(mongomock_collection):
+    return make_mongomock_vehicle_data(mongomock_collection)
+
+
+def ingest(store_dir, vehicle_data, safety_lag_seconds: float) -> dict:
+    store = PartitionedFeatureStore(str(store_dir), safety_lag_seconds=safety_lag_seconds)
+    return store.ingest(vehicle_data, vehicle_data.get_collection("Vehicle-Data").name, batch_size=50, parallelism=3)
+
+
+def stored_ids(store_dir) -> list:
+    return PartitionedFeatureStore(str(store_dir)).read_all(columns=["_id"])["_id"].tolist()
+
+
+def test_reingest_appends_only_new_documents(tmp_path, vehicle_data, mongomock_collection):
+    first = insert_documents(mongomock_collection, 300, minutes_ago=120, seed=1)
+    # As run an hour ago with a one minute lag
+    assert ingest(tmp_path, vehicle_data, safety_lag_seconds=3660)["new_rows"] == 300
+
+    second = insert_documents(mongomock_collection, 200, minutes_ago=30, seed=2)
+    summary = ingest(tmp_path, vehicle_data, safety_lag_seconds=60)
+    assert (summary["new_rows"], summary["partitions"], summary["total_rows"]) == (200, 2, 500)
+
+    # Nothing new: the watermark may move, but no empty partition is added
+    assert ingest(tmp_path, vehicle_data, safety_lag_seconds=60)["partitions"] == 2
+    ids = stored_ids(tmp_path)
+    assert len(ids) == len(set(ids)) and set(ids) == first | second
+
+
+def test_documents_within_the_safety_lag_wait_for_a_later_run(tmp_path, vehicle_data, mongomock_collection):
+    old = insert_documents(mongomock_collection, 100, minutes_ago=60, seed=1)
+    # A writer with a correct clock and one whose clock is 3 minutes behind, both within the lag
+    recent = insert_documents(mongomock_collection, 10, minutes_ago=1, seed=2)
+    assert ingest(tmp_path, vehicle_data, safety_lag_seconds=600)["new_rows"] == 100
+
+    skewed = insert_documents(mongomock_collection, 10, minutes_ago=3, seed=3)
+    assert ingest(tmp_path, vehicle_data, safety_lag_seconds=600)["new_rows"] == 0
+
+    # Once the lag has passed, both are ingested even though the skewed ones sort before the others
+    assert ingest(tmp_path, vehicle_data, safety_lag_seconds=0)["new_rows"] == 20
+    assert set(stored_ids(tmp_path)) == old | recent | skewed
+
+
+def test_watermark_field_must_hold_insertion_times(tmp_path):
+    store = PartitionedFeatureStore(str(tmp_path), watermark_field="id")
+    now = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+
+    assert store.get_upper_bound(ObjectId(), now=now) == ObjectId.from_datetime(now - timedelta(minutes=5))
+    assert store.get_upper_bound(datetime(2026, 1, 1), now=now) == datetime(2026, 1, 1, 11, 55)
+    with pytest.raises(ValueError):
+        store.get_upper_bound(42, now=now)
@@ -0,0 +1,69 @@
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+from src.components.model_trainer import ModelTrainer
+from src.entity.artifact_entity import DataIngestionArtifact
+from src.entity.fused_preprocessor import FusedPreprocessor
+from src.exception import MyException
+from src.utils.main_utils import save_dataframe
+from tests.conftest import make_vehicle_frame
+
+
+def make_features(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"Age": rng.integers(20, 86, rows).astype(float),
+                         "Annual_Premium": rng.uniform(2630, 100000, rows),
+                         "Vintage": rng.integers(10, 300, rows).astype(float),
+                         "Region_Code": rng.integers(0, 53, rows).astype(float)})
+
+
+def fit_pipeline(transformers: list, remainder: str = "passthrough") -> Pipeline:
+    column_transformer = ColumnTransformer(transformers=transformers, remainder=remainder)
+    return Pipeline(steps=[("Preprocessor", column_transformer)]).fit(make_features(500))
+
+
+def test_min_max_and_standard_scaling_match_sklearn():
+    pipeline = fit_pipeline([("StandardScaler", StandardScaler(), ["Age", "Vintage"]),
+                             ("MinMaxScaler", MinMaxScaler(), ["Annual_Premium"])])
+    features = make_features(200, seed=1)
+
+    assert np.array_equal(FusedPreprocessor.from_pipeline(pipeline).transform(features), pipeline.transform(features))
+
+
+def test_passthrough_only_pipeline_keeps_the_values():
+    pipeline = fit_pipeline([])
+    features = make_features(200, seed=1)
+
+    fused = FusedPreprocessor.from_pipeline(pipeline)
+    assert np.array_equal(fused.transform(features), pipeline.transform(features))
+    assert np.array_equal(fused.transform(features), features.to_numpy())
+
+
+def test_clipping_min_max_scaler_is_rejected():
+    pipeline = fit_pipeline([("MinMaxScaler", MinMaxScaler(clip=True), ["Annual_Premium"])])
+
+    with pytest.raises(MyException):
+        FusedPreprocessor.from_pipeline(pipeline)
+
+
+def test_trainer_drops_fused_preprocessing_that_differs_on_test_data(vehicle_model, tmp_path):
+    test_df = make_vehicle_frame(300, seed=2).drop(columns="id")
+    test_df.insert(0, "_id", [f"doc-{i}" for i in range(len(test_df))])
+    save_dataframe(str(tmp_path / "test.parquet"), test_df)
+    model_trainer = ModelTrainer(None, None, data_ingestion_artifact=DataIngestionArtifact(
+        trained_file_path=str(tmp_path / "train.parquet"), test_file_path=str(tmp_path / "test.parquet")))
+
+    verified_model = copy.deepcopy(vehicle_model)
+    model_trainer.verify_fused_preprocessing(verified_model)
+    assert verified_model.fused_preprocessing_object is not None
+
+    broken_model = copy.deepcopy(vehicle_model)
+    broken_model.fused_preprocessing_object.add = broken_model.fused_preprocessing_object.add + 1e-9
+    model_trainer.verify_fused_preprocessing(broken_model)
+    assert broken_model.fused_preprocessing_object is None
@@ -0,0 +1,48 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.entity.config_entity import InferenceExecutorConfig, VehiclePredictorConfig
+from src.exception import MyException
+from src.pipeline.inference_executor import InferenceExecutor
+from src.pipeline.prediction_pipeline import VehicleBatchData
+from tests.conftest import make_vehicle_frame, upload_model
+
+
+def make_executor(mode: str, bucket_name: str) -> InferenceExecutor:
+    return InferenceExecutor(InferenceExecutorConfig(execution_mode=mode, pool_size=2),
+                             VehiclePredictorConfig(model_file_path="model.pkl", model_bucket_name=bucket_name,
+                                                    result_cache_enabled=False))
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_start_warm_up_predict_and_shutdown(mode, model_bucket, vehicle_model, tmp_path):
+    batch_data = VehicleBatchData(make_vehicle_frame(300, seed=4), ignore_unknown_columns=True)
+    assert batch_data.validate()
+    features = batch_data.input_df
+    executor = make_executor(mode, model_bucket[1])
+
+    async def serve():
+        executor.start()
+        try:
+            # No model in S3 yet: warm-up fails and can be retried, startup itself does not
+            with pytest.raises(MyException):
+                await executor.warm_up()
+            upload_model(model_bucket, "model.pkl", vehicle_model, tmp_path)
+            timings = await executor.warm_up()
+            return timings, await asyncio.gather(*(executor.predict(features.iloc[i:i + 100]) for i in (0, 100, 200)))
+        finally:
+            executor.shutdown()
+
+    timings, predictions = asyncio.run(serve())
+
+    assert timings["model_version"] and "pid" not in timings
+    assert np.array_equal(np.concatenate(predictions), vehicle_model.predict(features))
+    with pytest.raises(MyException):
+        asyncio.run(executor.predict(features))
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(MyException):
+        make_executor("gpu", "unused").start()
@@ -0,0 +1,66 @@
+import json
+import logging
+import os
+import sys
+import uuid
+
+import pytest
+
+import src.logger as logger_module
+from src.logger import JsonFormatter, SamplingFilter, parse_sample_rates
+
+
+def make_record(name: str, level: int, pathname: str = "/src/app_module.py", exc_info=None) -> logging.LogRecord:
+    return logging.LogRecord(name, level, pathname, 42, "scored %d rows", (10,), exc_info, func="score")
+
+
+def test_sampling_by_logger_or_module_name_keeps_warnings():
+    sampling_filter = SamplingFilter(parse_sample_rates("noisy=0, estimator=0 ,kept=1"))
+
+    assert not sampling_filter.filter(make_record("noisy", logging.INFO))
+    assert not sampling_filter.filter(make_record("root", logging.DEBUG, pathname="/src/entity/estimator.py"))
+    assert sampling_filter.filter(make_record("kept", logging.INFO))
+    assert sampling_filter.filter(make_record("other", logging.INFO))
+    assert sampling_filter.filter(make_record("noisy", logging.WARNING))
+    assert sampling_filter.filter(make_record("root", logging.ERROR, pathname="/src/entity/estimator.py"))
+
+
+def test_json_formatter_writes_one_object_per_record():
+    try:
+        raise ValueError("bad row")
+    except ValueError:
+        record = make_record("prediction", logging.ERROR, exc_info=sys.exc_info())
+
+    line = JsonFormatter().format(record)
+    log_entry = json.loads(line)
+
+    assert "\n" not in line
+    assert {key: log_entry[key] for key in ("level", "logger", "module", "function", "line", "message")} == {
+        "level": "ERROR", "logger": "prediction", "module": "app_module", "function": "score", "line": 42,
+        "message": "scored 10 rows"}
+    assert log_entry["timestamp"] and "ValueError: bad row" in log_entry["exception"]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is POSIX only")
+def test_forked_child_logs_through_a_listener_of_its_own():
+    if not logger_module._log_listeners:
+        pytest.skip("The async logging backend is disabled")
+    parent_listener = logger_module._log_listeners[0]
+    message = f"forked child {uuid.uuid4().hex}"
+
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 1
+        try:
+            child_listener = logger_module._log_listeners[0]
+            if child_listener is not parent_listener and child_listener._thread.is_alive():
+                logging.info(message)
+                logger_module.stop_log_listener()
+                exit_code = 0
+        finally:
+            os._exit(exit_code)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    with open(logger_module.log_file_path) as log_file:
+        assert message in log_file.read()
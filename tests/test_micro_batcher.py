@@ -0,0 +1,66 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.entity.config_entity import MicroBatcherConfig
+from src.exception import MyException
+from src.pipeline.micro_batcher import PredictionMicroBatcher
+
+
+async def predict_age(dataframe: pd.DataFrame) -> np.ndarray:
+    if (dataframe["Age"] < 0).any():
+        raise ValueError("Age must not be negative")
+    return dataframe["Age"].to_numpy() * 10
+
+
+def run_requests(frames):
+    async def main():
+        batcher = PredictionMicroBatcher(predict_age, MicroBatcherConfig(max_batch_size=100, max_wait_ms=50,
+                                                                         max_queue_size=100, max_concurrent_batches=1))
+        await batcher.start()
+        try:
+            results = await asyncio.gather(*(batcher.predict(frame) for frame in frames), return_exceptions=True)
+        finally:
+            await batcher.stop()
+        return results, batcher.get_metrics()
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_share_one_batch():
+    results, metrics = run_requests([pd.DataFrame({"Age": [age, age + 1]}) for age in (20, 30, 40)])
+
+    assert [result.tolist() for result in results] == [[200, 210], [300, 310], [400, 410]]
+    assert (metrics["batches_total"], metrics["requests_total"], metrics["batch_fallbacks_total"]) == (1, 3, 0)
+
+
+def test_malformed_request_only_fails_its_own_caller():
+    results, metrics = run_requests([pd.DataFrame({"Age": [20]}), pd.DataFrame({"Age": [-1]}),
+                                     pd.DataFrame({"Age": [40, 50]})])
+
+    assert results[0].tolist() == [200] and results[2].tolist() == [400, 500]
+    assert isinstance(results[1], MyException) and "Age must not be negative" in str(results[1])
+    assert (metrics["batches_total"], metrics["batch_fallbacks_total"]) == (1, 1)
+
+
+def test_predict_requires_a_running_batcher():
+    with pytest.raises(MyException):
+        asyncio.run(PredictionMicroBatcher(predict_age).predict(pd.DataFrame({"Age": [20]})))
+
+
+def test_stop_fails_requests_of_the_batch_being_collected():
+    async def main():
+        batcher = PredictionMicroBatcher(predict_age, MicroBatcherConfig(max_batch_size=100, max_wait_ms=10000,
+                                                                         max_queue_size=100, max_concurrent_batches=1))
+        await batcher.start()
+        requests = [asyncio.create_task(batcher.predict(pd.DataFrame({"Age": [age]}))) for age in (20, 30)]
+        # The consumer has taken both requests into the batch it is still collecting
+        await asyncio.sleep(0.1)
+        assert batcher._queue.empty()
+        await batcher.stop()
+        return await asyncio.wait_for(asyncio.gather(*requests, return_exceptions=True), timeout=5)
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, MyException) and "stopped" in str(result) for result in results)
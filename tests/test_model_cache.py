@@ -0,0 +1,90 @@
+import threading
+
+from src.entity.model_cache import ModelCache
+
+
+class FakeEstimator:
+    """  Stands in for VehicleDataEstimator: the S3 object version and its model are set by the test.  """
+
+    def __init__(self, version: str):
+        self.version = version
+        self.fail = False
+        self.loads = 0
+
+    def get_model_version(self) -> str:
+        if self.fail:
+            raise ConnectionError("S3 is unavailable")
+        return self.version
+
+    def load_model_with_version(self):
+        self.loads += 1
+        return f"model-{self.version}", self.version
+
+
+def make_cache(estimator: FakeEstimator) -> ModelCache:
+    cache = ModelCache(bucket_name="bucket", model_path="model.pkl", revalidate_interval=0)
+    cache._estimator = estimator
+    return cache
+
+
+def revalidate(cache: ModelCache) -> tuple:
+    """  Serves one request, then waits for the revalidation it scheduled to finish.  """
+    entry = cache.get_model_and_version()
+    with cache._refresh_lock:
+        pass
+    return entry
+
+
+def test_unchanged_version_is_not_reloaded():
+    estimator = FakeEstimator("v1")
+    cache = make_cache(estimator)
+
+    assert cache.get_model_and_version() == ("model-v1", "v1")
+    revalidate(cache)
+    revalidate(cache)
+
+    assert estimator.loads == 1 and cache.version == "v1"
+
+
+def test_new_version_is_swapped_in_and_listeners_are_called():
+    estimator = FakeEstimator("v1")
+    cache = make_cache(estimator)
+    swapped = []
+    cache.add_swap_listener(swapped.append)
+    cache.add_swap_listener(swapped.append)
+
+    cache.get_model_and_version()
+    estimator.version = "v2"
+    # The request that notices the change is still served the model it started with
+    assert revalidate(cache) == ("model-v1", "v1")
+
+    assert cache.get_model_and_version() == ("model-v2", "v2")
+    assert swapped == ["v1", "v2"]
+
+
+def test_cached_model_is_kept_when_revalidation_fails():
+    estimator = FakeEstimator("v1")
+    cache = make_cache(estimator)
+    cache.get_model_and_version()
+
+    estimator.fail = True
+    revalidate(cache)
+    assert cache.get_model_and_version() == ("model-v1", "v1")
+
+    estimator.fail, estimator.version = False, "v2"
+    revalidate(cache)
+    assert cache.version == "v2"
+
+
+def test_revalidation_lock_is_released_when_the_thread_cannot_start(monkeypatch):
+    cache = make_cache(FakeEstimator("v1"))
+    cache.get_model_and_version()
+
+    def fail_to_start(self):
+        raise RuntimeError("can't start new thread")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(threading.Thread, "start", fail_to_start)
+        assert cache.get_model_and_version() == ("model-v1", "v1")
+
+    assert not cache._refresh_lock.locked()
@@ -0,0 +1,58 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.components.model_compaction import ModelCompaction
+from src.entity.config_entity import ModelCompactionConfig
+from src.entity.tree_ensemble import CompiledForest
+
+
+def make_array(rows: int, seed: int) -> np.ndarray:
+    """  Transformed features with the binary target as the last column, like the stored arrays.  """
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, 5)).round(2)
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=rows) > 0).astype(int)
+    return np.column_stack([X, y])
+
+
+def make_compaction(max_f1_drop: float = 0.01) -> ModelCompaction:
+    return ModelCompaction(None, None, ModelCompactionConfig(max_f1_drop=max_f1_drop, tree_fractions=(0.2, 0.5)))
+
+
+def fit_forest(train: np.ndarray) -> RandomForestClassifier:
+    return RandomForestClassifier(n_estimators=40, oob_score=True, random_state=0).fit(train[:, :-1], train[:, -1])
+
+
+def test_out_of_bag_predictions_match_sklearn():
+    train = make_array(2000, seed=0)
+    forest = fit_forest(train)
+    compiled = CompiledForest.from_sklearn(forest)
+    compaction = make_compaction()
+
+    out_of_bag = compaction.get_out_of_bag_mask(forest, len(train))
+    y_pred, covered = compaction.predict_out_of_bag(compiled, compiled.apply(train[:, :-1]), out_of_bag,
+                                                    np.arange(compiled.n_trees))
+
+    assert covered.all()
+    assert np.array_equal(y_pred, forest.classes_.take(np.argmax(forest.oob_decision_function_, axis=1)))
+
+
+def test_tree_selection_never_looks_at_the_test_labels():
+    train, test = make_array(2000, seed=0), make_array(500, seed=1)
+    forest = fit_forest(train)
+    compiled = CompiledForest.from_sklearn(forest)
+    shuffled_test = test.copy()
+    shuffled_test[:, -1] = np.random.default_rng(2).permutation(test[:, -1])
+
+    compacted = make_compaction().compact_forest(compiled, forest, train=train, test=test)
+    assert compacted.n_trees < compiled.n_trees
+    assert np.array_equal(make_compaction().compact_forest(compiled, forest, train=train, test=shuffled_test).roots,
+                          compacted.roots)
+
+
+def test_forest_without_out_of_bag_rows_keeps_all_trees():
+    train, test = make_array(1000, seed=0), make_array(200, seed=1)
+    forest = RandomForestClassifier(n_estimators=10, bootstrap=False, random_state=0).fit(train[:, :-1], train[:, -1])
+
+    compacted = make_compaction(max_f1_drop=1.0).compact_forest(CompiledForest.from_sklearn(forest), forest,
+                                                                train=train, test=test)
+    assert compacted.n_trees == 10
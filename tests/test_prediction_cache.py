@@ -0,0 +1,46 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.entity.model_cache import ModelCache
+from src.pipeline.prediction_cache import PredictionResultCache
+
+
+class CountingModel:
+    def __init__(self):
+        self.rows_predicted = 0
+
+    def predict(self, dataframe: pd.DataFrame) -> np.ndarray:
+        self.rows_predicted += len(dataframe)
+        return dataframe["Age"].fillna(0).to_numpy() > 40
+
+
+def test_rows_with_missing_values_are_served_from_the_cache():
+    cache = PredictionResultCache(max_size=100, ttl_seconds=0)
+    model = CountingModel()
+    dataframe = pd.DataFrame({"Age": [30.0, np.nan, 50.0], "Vintage": [np.nan, 10.0, np.nan]})
+
+    first = cache.predict(model, "v1", dataframe, columns=["Age", "Vintage"])
+    second = cache.predict(model, "v1", dataframe, columns=["Age", "Vintage"])
+
+    assert np.array_equal(first, second) and model.rows_predicted == 3
+    assert cache.get_metrics()["hits"] == 3
+
+
+def test_swap_listener_is_registered_once_across_threads():
+    cache = PredictionResultCache(max_size=100, ttl_seconds=0)
+    model_cache = ModelCache(bucket_name="bucket", model_path="model.pkl", revalidate_interval=60)
+    barrier = threading.Barrier(8)
+
+    def bind():
+        barrier.wait()
+        cache.bind(model_cache)
+
+    threads = [threading.Thread(target=bind) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert model_cache._swap_listeners == [cache.clear]
@@ -0,0 +1,42 @@
+import os
+import time
+
+from src.entity.config_entity import PreforkServerConfig
+from src.pipeline.prefork_server import PreforkServer
+
+
+def make_server(monkeypatch, exited: list) -> PreforkServer:
+    """  A master with workers 1, 2 and 3 that sees `exited` exit, without forking anything.  """
+    server = PreforkServer.__new__(PreforkServer)
+    server.prefork_server_config = PreforkServerConfig()
+    server._workers = {pid: time.monotonic() for pid in (1, 2, 3)}
+    server._pending_signals = []
+    server._stopping = False
+    server.spawned = []
+
+    def spawn_worker():
+        pid = 100 + len(server.spawned)
+        server._workers[pid] = time.monotonic()
+        server.spawned.append(pid)
+        return pid
+
+    statuses = [(pid, 0) for pid in exited]
+    monkeypatch.setattr(server, "_spawn_worker", spawn_worker)
+    monkeypatch.setattr(os, "waitpid", lambda pid, options: statuses.pop(0) if statuses else (0, 0))
+    return server
+
+
+def test_worker_exiting_during_a_roll_is_replaced(monkeypatch):
+    # Workers 1 and 2 are being stopped; worker 3 hits max_requests at the same time
+    server = make_server(monkeypatch, exited=[1, 3, 2])
+    server._reap_workers(stopping_pids=[1, 2])
+
+    assert server.spawned == [100] and sorted(server._workers) == [100]
+
+
+def test_no_worker_is_replaced_while_stopping(monkeypatch):
+    server = make_server(monkeypatch, exited=[3])
+    server._stopping = True
+    server._reap_workers()
+
+    assert server.spawned == [] and sorted(server._workers) == [1, 2]
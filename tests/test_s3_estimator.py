@@ -0,0 +1,38 @@
+import copy
+import os
+
+import numpy as np
+
+from src.entity.s3_estimator import VehicleDataEstimator
+from src.pipeline.prediction_pipeline import VehicleBatchData
+from tests.conftest import make_vehicle_frame, upload_model
+
+
+def test_mmap_model_is_cached_per_version_and_falls_back_to_the_pickle(model_bucket, vehicle_model, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr("src.entity.s3_estimator.MODEL_MMAP_CACHE_DIR", str(cache_dir))
+    batch_data = VehicleBatchData(make_vehicle_frame(200, seed=5), ignore_unknown_columns=True)
+    assert batch_data.validate()
+    features = batch_data.input_df
+    s3_client, bucket_name = model_bucket
+    estimator = VehicleDataEstimator(bucket_name=bucket_name, model_path="model.vmm")
+
+    upload_model(model_bucket, "model.pkl", vehicle_model, tmp_path)
+    upload_model(model_bucket, "model.vmm", vehicle_model, tmp_path)
+    model, version = estimator.load_model_with_version()
+    assert np.array_equal(model.predict(features), vehicle_model.predict(features))
+    assert os.listdir(cache_dir) == [os.path.basename(estimator._mmap_cache_path(version))]
+
+    # A new push replaces the cached file of the previous version
+    new_model = copy.deepcopy(vehicle_model)
+    new_model.fused_preprocessing_object.add = new_model.fused_preprocessing_object.add + 1e-12
+    upload_model(model_bucket, "model.vmm", new_model, tmp_path)
+    _, new_version = estimator.load_model_with_version()
+    assert new_version != version
+    assert os.listdir(cache_dir) == [os.path.basename(estimator._mmap_cache_path(new_version))]
+
+    # Without the mmap model (export failed in the pusher) the pickle next to it is served
+    s3_client.delete_object(Bucket=bucket_name, Key="model.vmm")
+    model, pickle_version = estimator.load_model_with_version()
+    assert pickle_version == estimator.get_model_version() != new_version
+    assert np.array_equal(model.predict(features), vehicle_model.predict(features))
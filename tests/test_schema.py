@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.entity.schema import DataSchema
+
+
+@pytest.mark.parametrize("low, high, dtype", [
+    (-128, 127, np.int8), (-129, 127, np.int16), (0, 128, np.int16),
+    (-32768, 32767, np.int16), (0, 32768, np.int32),
+    (-2 ** 31, 2 ** 31 - 1, np.int32), (0, 2 ** 31, np.int64), (-2 ** 31 - 1, 0, np.int64),
+])
+def test_int_columns_take_the_smallest_int_dtype_of_their_range(low, high, dtype):
+    assert DataSchema.smallest_dtype(np.array([low, high], dtype=np.int64), "int") == dtype
+    # Whole numbers stored as floats (e.g. read from CSV) are narrowed the same way
+    assert DataSchema.smallest_dtype(np.array([low, high], dtype=np.float64), "int") == dtype
+
+
+def test_int_columns_with_missing_or_fractional_values_stay_float():
+    assert DataSchema.smallest_dtype(np.array([1.0, np.nan, 3.0]), "int") == np.float32
+    assert DataSchema.smallest_dtype(np.array([1.0, 2.5]), "int") == np.float32
+    assert DataSchema.smallest_dtype(np.array([1.0, 2 ** 24 + 1.0]), "int") == np.int32
+    assert DataSchema.smallest_dtype(np.array([np.nan, 2 ** 24 + 1.0]), "int") == np.float64
+
+
+def test_float32_only_when_every_value_round_trips():
+    assert DataSchema.smallest_dtype(np.array([2630.0, 0.5, np.nan, 40454.25]), "float") == np.float32
+    assert DataSchema.smallest_dtype(np.array([2630.0, 0.1]), "float") == np.float64
+    assert DataSchema.smallest_dtype(np.array([1e39]), "float") == np.float64
+    assert DataSchema.smallest_dtype(np.array([2.0 ** 24 + 1]), "float") == np.float64
+
+
+def test_compact_sorts_categories_and_widen_floats_is_exact():
+    schema = DataSchema({"columns": [{"Vehicle_Age": "category"}, {"Age": "int"}, {"Annual_Premium": "float"}],
+                         "prediction_columns": []})
+    annual_premium = np.array([2630.0, 40454.5, 33536.25])
+    df = pd.DataFrame({"Vehicle_Age": ["> 2 Years", "< 1 Year", "1-2 Year"], "Age": [44, 76, 47],
+                       "Annual_Premium": annual_premium, "id": [1, 2, 3]})
+
+    schema.compact(df)
+
+    assert df["Vehicle_Age"].cat.categories.to_list() == ["1-2 Year", "< 1 Year", "> 2 Years"]
+    assert pd.get_dummies(df["Vehicle_Age"], drop_first=True).columns.to_list() == ["< 1 Year", "> 2 Years"]
+    assert (df["Age"].dtype, df["Annual_Premium"].dtype, df["id"].dtype) == (np.int8, np.float32, np.int64)
+
+    widened = DataSchema.widen_floats(df)
+    assert widened["Annual_Premium"].dtype == np.float64 and widened["Age"].dtype == np.int8
+    assert np.array_equal(widened["Annual_Premium"].to_numpy(), annual_premium)
@@ -0,0 +1,52 @@
+import queue
+from datetime import datetime
+
+from src.entity.config_entity import TrainingJobConfig
+from src.pipeline.training_jobs import JOB_STAGE, TrainingJob, TrainingJobManager
+
+
+class ExitedProcess:
+    exitcode = 0
+
+    def is_alive(self) -> bool:
+        return False
+
+    def join(self) -> None:
+        pass
+
+
+class LateQueue:
+    """  A progress queue whose last events only arrive after the process was seen to exit.  """
+
+    def __init__(self, events):
+        self.events = list(events)
+
+    def get(self, timeout=None):
+        raise queue.Empty
+
+    def get_nowait(self):
+        if not self.events:
+            raise queue.Empty
+        return self.events.pop(0)
+
+
+def test_events_sent_before_exit_are_applied():
+    manager = TrainingJobManager()
+    job = TrainingJob(job_id="job")
+    now = datetime.now().isoformat()
+    events = [("job", JOB_STAGE, "running", now, None), ("job", "start_model_pusher", "succeeded", now, None),
+              ("job", JOB_STAGE, "succeeded", now, None)]
+
+    manager._monitor(job, ExitedProcess(), LateQueue(events))
+
+    assert (job.status, job.error, job.stages["start_model_pusher"]) == ("succeeded", None, "succeeded")
+
+
+def test_only_the_latest_finished_jobs_are_kept():
+    manager = TrainingJobManager(TrainingJobConfig(history_size=2))
+    for job_id, status in [("a", "succeeded"), ("b", "failed"), ("c", "running"), ("d", "succeeded")]:
+        manager._jobs[job_id] = TrainingJob(job_id=job_id, status=status)
+
+    manager._evict_finished_jobs()
+
+    assert list(manager._jobs) == ["b", "c", "d"]
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.entity.estimator import MyModel
+from src.entity.tree_ensemble import CompiledForest
+from src.pipeline.prediction_pipeline import VehicleBatchData
+from tests.conftest import make_vehicle_frame
+
+
+def make_data(rows: int, seed: int = 0, missing: float = 0.0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, 6)).round(2)
+    y = (X[:, 0] + X[:, 1] * X[:, 2] > 0).astype(int) + (X[:, 3] > 1)
+    if missing:
+        X[rng.random(X.shape) < missing] = np.nan
+    return X, y
+
+
+@pytest.mark.parametrize("params", [dict(n_estimators=25, max_depth=None),
+                                    dict(n_estimators=10, max_depth=4, min_samples_leaf=5),
+                                    dict(n_estimators=1, max_depth=1)])
+def test_predictions_are_bit_identical_to_sklearn(params):
+    X, y = make_data(3000)
+    forest = RandomForestClassifier(random_state=0, **params).fit(X, y)
+    compiled = CompiledForest.from_sklearn(forest)
+
+    # More rows than CHUNK_SIZE, and values exactly on the split thresholds
+    X_test = np.vstack([make_data(2 * CompiledForest.CHUNK_SIZE + 7, seed=1)[0],
+                        np.resize(compiled.threshold[np.isfinite(compiled.threshold)], (50, 6))])
+    assert np.array_equal(compiled.predict_proba(X_test), forest.predict_proba(X_test))
+    assert np.array_equal(compiled.predict(X_test), forest.predict(X_test))
+
+
+def test_missing_values_follow_the_learned_direction():
+    X, y = make_data(3000, missing=0.1)
+    forest = RandomForestClassifier(n_estimators=15, random_state=0).fit(X, y)
+    compiled = CompiledForest.from_sklearn(forest)
+
+    X_test = make_data(1000, seed=2, missing=0.2)[0]
+    assert np.array_equal(compiled.predict_proba(X_test), forest.predict_proba(X_test))
+
+
+def test_array_round_trip_keeps_predictions():
+    X, y = make_data(2000)
+    compiled = CompiledForest.from_sklearn(RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y))
+    arrays, metadata = compiled.get_arrays()
+
+    assert np.array_equal(CompiledForest.from_arrays(arrays, metadata).predict_proba(X), compiled.predict_proba(X))
+
+
+def test_model_paths_agree(vehicle_model, tmp_path):
+    batch_data = VehicleBatchData(make_vehicle_frame(500, seed=3), ignore_unknown_columns=True)
+    assert batch_data.validate()
+    features = batch_data.input_df
+    expected = vehicle_model.trained_model_object.predict(vehicle_model.transform(features, use_fast_path=False))
+
+    assert vehicle_model.check_fast_path(features)
+    assert np.array_equal(vehicle_model.predict(features), expected)
+    assert np.array_equal(vehicle_model.predict_array(features.to_numpy(np.float64)), expected)
+
+    vehicle_model.save_mmap(str(tmp_path / "model.vmm"))
+    assert np.array_equal(MyModel.load_mmap(str(tmp_path / "model.vmm")).predict(features), expected)
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+from bson import ObjectId
+
+from src.data_access.vehicle_data import VehicleData
+from tests.conftest import make_mongomock_vehicle_data, make_vehicle_documents
+
+
+@pytest.fixture
+def mixed_id_collection(mongomock_collection, monkeypatch):
+    documents = make_vehicle_documents(300)
+    for i, document in enumerate(documents):
+        # A few documents written by a loader that used integer _ids
+        document["_id"] = i if i % 100 == 0 else ObjectId()
+    mongomock_collection.insert_many(documents)
+
+    # Boundaries as sampled when no integer _id makes it into the $sample
+    object_ids = sorted(document["_id"] for document in documents if isinstance(document["_id"], ObjectId))
+    monkeypatch.setattr(VehicleData, "get_id_partitions", staticmethod(
+        lambda collection, parallelism, query=None: [(None, object_ids[100]), (object_ids[100], object_ids[200]),
+                                                     (object_ids[200], None)]))
+    return mongomock_collection
+
+
+def test_mixed_id_types_fall_back_to_a_complete_export(mixed_id_collection):
+    vehicle_data = make_mongomock_vehicle_data(mixed_id_collection)
+    df = vehicle_data.export_collection_as_dataframe(mixed_id_collection.name, parallelism=3)
+
+    assert len(df) == 300 and df["_id"].is_unique
+    assert {"0", "100", "200"} <= set(df["_id"])
+
+
+def test_mixed_id_types_leave_no_partial_partition_files(mixed_id_collection, tmp_path):
+    vehicle_data = make_mongomock_vehicle_data(mixed_id_collection)
+    file_paths = vehicle_data.export_collection_as_partitions(mixed_id_collection.name, str(tmp_path), parallelism=3)
+
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(path) for path in file_paths] == ["part-00000.parquet"]
+    assert vehicle_data.export_report["rows"] == 300
+
+
+def test_export_maps_projected_fields_back_to_their_columns(mongomock_collection):
+    documents = make_vehicle_documents(200)
+    documents[0]["Annual_Premium"] = "na"
+    mongomock_collection.insert_many(documents)
+    vehicle_data = make_mongomock_vehicle_data(mongomock_collection)
+
+    export_columns = VehicleData.get_export_columns()
+    projection = VehicleData.build_export_pipeline(export_columns)[-1]["$project"]
+    assert list(projection) == list(VehicleData.get_export_field_names(export_columns).values())
+
+    df = vehicle_data.export_collection_as_dataframe(mongomock_collection.name, parallelism=2)
+    expected = {str(document["_id"]): document for document in documents}
+    assert list(df.columns) == ["_id", *export_columns]
+    for row in df.sample(20, random_state=0).itertuples(index=False):
+        document = expected[row._0]
+        assert (row.Age, row.Vehicle_Age, row.Response) == (document["Age"], document["Vehicle_Age"], document["Response"])
+    assert df.loc[df["_id"] == str(documents[0]["_id"]), "Annual_Premium"].isna().all()